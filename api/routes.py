@@ -1,30 +1,72 @@
-from flask import request, jsonify
-from config.settings import MAX_LINKS_DEFAULT, SCRIPT_VERSION, logger
-from services.domain_service import get_root_domain
-from services.scraper_service import analyze_links_parallel, process_scraping_results
-from formatters.response_formatter import format_scraping_response, format_error_response
-from utils.scrapers.link_scraper import link_scraper, is_valid_url
-from utils.scrapers.user_agent import get_user_agent_headers
+import json
+from flask import request, jsonify, Response, g
+from config.settings import SCRIPT_VERSION, logger
+from services.scrape_pipeline import ScrapeError, ResultPending, parse_scrape_options, cached_scrape
+from services.result_cache import get_result_cache
+from services.batch_service import parse_batch_request, run_batch
+from services.job_queue import get_job_queue
+from services.scrape_stream import STREAM_FORMATS, stream_scrape
+from utils.scrapers.health_checker import get_health_sampler
+from utils.metrics import REQUESTS_IN_FLIGHT, get_metrics_registry
+from formatters.response_formatter import format_error_response, format_stream_event
 import time
 
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
 def register_routes(app):
+    @app.before_request
+    def track_request_start():
+        # Requêtes en cours par endpoint
+        g.in_flight = REQUESTS_IN_FLIGHT.labels(request.endpoint or 'unknown')
+        g.in_flight.inc()
+
+    @app.teardown_request
+    def track_request_end(error=None):
+        in_flight = g.pop('in_flight', None)
+        if in_flight is not None:
+            in_flight.dec()
+
     @app.route('/health')
     def health_check():
-        """Endpoint pour le healthcheck Coolify"""
-        from utils.scrapers.health_checker import get_system_health
-        
-        health_status = get_system_health()
-        
-        # Vérifie si le système est en bonne santé
-        components = health_status["components"]
-        if (components["scraper_service"]["status"] == "unhealthy" or
-            components["system"]["memory"]["percent"] > 90 or
-            components["system"]["cpu"]["percent"] > 90):
+        """Endpoint pour le healthcheck Coolify, équivalent de /readyz"""
+        if not get_health_sampler().ready():
             return "Service Unavailable", 503
-            
+
         # Retourne exactement ce que Coolify attend
         return "OK", 200
 
+    @app.route('/livez')
+    def liveness():
+        """Vivacité du worker, depuis l'instantané de la sonde de santé"""
+        if not get_health_sampler().live():
+            return "Service Unavailable", 503
+        return "OK", 200
+
+    @app.route('/readyz')
+    def readiness():
+        """Disponibilité du worker et détail du dernier relevé (CPU, mémoire, moteur de crawl)"""
+        sampler = get_health_sampler()
+        return jsonify(sampler.snapshot()), 200 if sampler.ready() else 503
+
+    @app.route('/metrics')
+    def metrics():
+        """Métriques au format texte Prometheus, agrégées sur tous les workers gunicorn"""
+        return Response(get_metrics_registry().render(), content_type=METRICS_CONTENT_TYPE)
+
+    @app.route('/cache/stats')
+    def cache_stats():
+        """Compteurs des caches de pages, de résultats et de numéros pour les dimensionner"""
+        from utils.scrapers.page_cache import get_page_cache
+        from utils.extractors.phone_extractor import phone_cache_stats
+
+        page_cache = get_page_cache()
+        result_cache = get_result_cache()
+        return jsonify({
+            "pages": {"enabled": True, **page_cache.stats()} if page_cache else {"enabled": False},
+            "results": {"enabled": True, **result_cache.stats()} if result_cache else {"enabled": False},
+            "phones": phone_cache_stats(),
+        })
+
     @app.route('/scrape', methods=['GET'])
     def scrape():
         start_time = time.time()
@@ -33,63 +75,73 @@ def register_routes(app):
             return jsonify({'error': 'URL parameter is required'}), 400
 
         try:
-            headers = get_user_agent_headers()
-            include_emails = request.args.get('include_emails', 'true').lower() == 'true'
-            include_phones = request.args.get('include_phones', 'true').lower() == 'true'
-            include_social_links = request.args.get('include_social_links', 'true').lower() == 'true'
-            include_unique_links = request.args.get('include_unique_links', 'true').lower() == 'true'
-            
-            max_link = request.args.get('max_link')
-            max_link = int(max_link) if max_link else MAX_LINKS_DEFAULT
-
-            logger.info(f"Starting scrape for URL: {url} with max_link: {max_link}")
-            
-            # Récupérer les liens du domaine et tous les liens
-            domain_links, all_links, error = link_scraper(url, headers, max_link)
-            if error:
-                logger.error(f"Error scraping links: {error}")
-                return jsonify(format_error_response(error)), 500
-
-            root_domain = get_root_domain(url, headers)
-            emails, phones, social_links = {}, {}, {}
-            visited_links = set()
-
-            if include_unique_links and not (include_emails or include_phones or include_social_links):
-                # Si on veut uniquement les liens uniques, pas besoin d'analyse supplémentaire
-                valid_links = [link for link in domain_links if is_valid_url(link)]
-                visited_links.update(valid_links)
-            else:
-                if include_emails or include_phones or include_unique_links:
-                    # Analyser seulement les liens du domaine pour les emails et téléphones
-                    results = analyze_links_parallel(domain_links, headers, root_domain)
-                    emails, phones, social_links, visited_links = process_scraping_results(
-                        results,
-                        domain_links,
-                        all_links,  # Passer tous les liens pour l'extraction des réseaux sociaux
-                        include_emails,
-                        include_phones,
-                        include_social_links
-                    )
-
-            result = format_scraping_response(
-                url=url,
-                root_domain=root_domain,
-                visited_links=visited_links,
-                emails=emails,
-                phones=phones,
-                social_links=social_links,
-                include_emails=include_emails,
-                include_phones=include_phones,
-                include_social_links=include_social_links,
-                include_unique_links=include_unique_links,
-                start_time=start_time
-            )
-
-            logger.info(f"Completed scraping for URL: {url}")
-            return jsonify(result)
+            options = parse_scrape_options(request.args)
+        except ValueError as e:
+            return jsonify(format_error_response(f"Invalid parameter: {str(e)}")), 400
+
+        # Mode flux : un événement par page, par nouvel email/téléphone/réseau social, puis le résumé
+        stream_format = request.args.get('stream')
+        if stream_format:
+            if stream_format not in STREAM_FORMATS:
+                return jsonify(format_error_response(
+                    f"Invalid parameter: stream must be one of {', '.join(STREAM_FORMATS)}"
+                )), 400
+
+            def generate():
+                for event, data in stream_scrape(url, options, start_time):
+                    yield format_stream_event(event, data, stream_format)
 
+            mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+            return Response(generate(), mimetype=mimetype, headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+        try:
+            return jsonify(cached_scrape(url, options, start_time))
+        except ResultPending as e:
+            # Scraping identique en cours dans un autre worker : le client réessaie plus tard
+            return jsonify(format_error_response(str(e), status="PENDING")), 202, {'Retry-After': str(e.retry_after)}
+        except ScrapeError as e:
+            return jsonify(format_error_response(str(e))), 500
         except Exception as e:
             logger.error(f"Unexpected error processing URL {url}: {str(e)}")
             return jsonify(format_error_response(f"An unexpected error occurred: {str(e)}")), 500
 
+    @app.route('/scrape/batch', methods=['POST'])
+    def scrape_batch():
+        """Scrape plusieurs URLs en un appel, chaque résultat est envoyé (NDJSON) dès qu'il est prêt"""
+        try:
+            items = parse_batch_request(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify(format_error_response(f"Invalid parameter: {str(e)}")), 400
+
+        def generate():
+            for line in run_batch(items):
+                yield json.dumps(line) + '\n'
+
+        return Response(generate(), mimetype='application/x-ndjson')
+
+    @app.route('/jobs', methods=['POST'])
+    def create_job():
+        """Met un scraping en file et retourne immédiatement l'identifiant du job"""
+        args = request.get_json(silent=True) or request.args
+        url = args.get('url')
+        if not url:
+            return jsonify({'error': 'URL parameter is required'}), 400
+
+        try:
+            options = parse_scrape_options(args)
+        except (TypeError, ValueError) as e:
+            return jsonify(format_error_response(f"Invalid parameter: {str(e)}")), 400
+
+        job_id = get_job_queue().enqueue(url, options)
+        logger.info(f"Queued job {job_id} for URL: {url}")
+        return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        """Statut, avancement (pages analysées / budget) et résultat d'un job"""
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return jsonify(format_error_response(f"Unknown job: {job_id}")), 404
+        return jsonify(job)
+
     return app
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+Pages synthétiques réalistes pour la suite de benchmarks, générées à partir d'une
+graine (mêmes octets à chaque exécution, aucun accès réseau) :
+- product_listing: grille de fiches produit (prix, références, dates) avec en-tête et pied de page
+- footer_heavy: contenu court, pied de page chargé (menus, adresses, téléphones, emails, réseaux)
+- link_heavy: 10 000 liens (catalogue, sous-domaines, liens externes, partage, profils sociaux)
+- jsonld_heavy: une fiche Product JSON-LD par produit, Organization et BreadcrumbList
+
+et des entrées déjà extraites, pour mesurer un extracteur seul à grande échelle (INPUTS) :
+- text_page: ~1 Mo de texte visible, des '@' isolés et un email tous les ~2 Ko
+- product_text: ~512 Ko de fiches produit en texte (prix, références, dates), quelques numéros
+- shop_urls: 50 000 URLs d'une boutique (catalogue, pages, sous-domaines, liens externes)
+- site_links: 10 000 liens (pages du site, boutons de partage, profils sociaux à la fin)
+"""
+import json
+import random
+
+ROOT_DOMAIN = "example.com"
+BASE_URL = f"https://{ROOT_DOMAIN}/"
+
+WORDS = (
+    "livraison", "gratuite", "produit", "panier", "contact", "service", "client", "commande",
+    "retour", "qualité", "prix", "promo", "nouveau", "collection", "taille", "couleur", "stock",
+)
+PHONES = ("01 23 45 67 89", "+33 4 72 00 00 00", "09.70.80.90.00", "+33 (0)1 42 68 53 00")
+EMAILS = ("contact@example.com", "sav@example.fr", "presse@example.com", "pro@shop.example.com")
+SOCIAL_PROFILES = (
+    "https://www.facebook.com/example", "https://instagram.com/example", "https://twitter.com/example",
+    "https://www.tiktok.com/@example", "https://www.linkedin.com/company/example",
+    "https://www.youtube.com/@example", "https://pinterest.fr/example",
+)
+SHARE_LINKS = (
+    "https://www.facebook.com/sharer/sharer.php?u=https://example.com/products/{}",
+    "https://twitter.com/intent/tweet?url=https://example.com/products/{}",
+    "https://pinterest.com/pin/create/button/?url=https://example.com/products/{}",
+)
+SECTIONS = ('products', 'products', 'products', 'collections', 'blogs/news', 'pages', 'policies', 'cart', 'account')
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def _header(rng):
+    links = ''.join(f'<li><a href="/collections/{name}">{name.title()}</a></li>'
+                    for name in ('femme', 'homme', 'enfant', 'maison', 'soldes', 'nouveautes'))
+    return f'<header><nav><a href="/">Accueil</a><ul>{links}</ul><a href="/cart">Panier</a></nav></header>'
+
+def _footer(rng, columns=4, links_per_column=12):
+    parts = ['<footer>']
+    for column in range(columns):
+        items = ''.join(f'<li><a href="/pages/{rng.choice(WORDS)}-{column}-{index}">{_sentence(rng, 2)}</a></li>'
+                        for index in range(links_per_column))
+        parts.append(f'<div class="col"><h4>{_sentence(rng, 2)}</h4><ul>{items}</ul></div>')
+    parts.append('<ul class="social">' + ''.join(f'<li><a href="{url}">{url.split("/")[2]}</a></li>'
+                                                 for url in SOCIAL_PROFILES) + '</ul>')
+    parts.append(f'<p>Service client : <a href="tel:{PHONES[0].replace(" ", "")}">{PHONES[0]}</a> - '
+                 f'<a href="mailto:{EMAILS[0]}">{EMAILS[0]}</a></p>')
+    parts.append('<a href="/policies/privacy-policy">Confidentialité</a><a href="/policies/terms-of-service">CGV</a>')
+    parts.append('</footer>')
+    return ''.join(parts)
+
+def _page(title, body, head=''):
+    return (f'<!DOCTYPE html><html lang="fr"><head><meta charset="utf-8"><title>{title}</title>'
+            f'<meta name="description" content="{title}">{head}<style>.card{{display:flex}}</style></head>'
+            f'<body>{body}<script>window.dataLayer=[];</script></body></html>')
+
+def product_listing(products=1500, seed=42):
+    """
+    Grille de produits : chaque fiche a un lien, une référence, un prix, une promotion
+    et une date ; un numéro et un email toutes les ~150 fiches.
+    """
+    rng = random.Random(seed)
+    cards = []
+    for index in range(products):
+        extra = ''
+        if index % 150 == 75:
+            extra = f'<p>Questions ? {rng.choice(PHONES)} ou {rng.choice(EMAILS)}</p>'
+        cards.append(
+            f'<div class="card"><a href="/products/item-{index}"><img src="/cdn/{index}.jpg" alt="">'
+            f'<h3>{_sentence(rng, 4)}</h3></a>'
+            f'<p>Réf. SKU-{rng.randint(0, 99999):05d} taille {rng.randint(36, 46)} '
+            f'{rng.randint(5, 300)},{rng.randint(0, 99):02d} € -{rng.randint(5, 70)}% '
+            f'livré le {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024</p>{extra}</div>'
+        )
+    body = f'{_header(rng)}<main><h1>Collection</h1>{"".join(cards)}</main>{_footer(rng)}'
+    return _page("Collection - Example", body)
+
+def footer_heavy(seed=42):
+    """
+    Page de contenu court (mentions, à propos) dont l'essentiel est le pied de page :
+    colonnes de liens, magasins avec adresse et téléphone, emails en clair et obfusqués.
+    """
+    rng = random.Random(seed)
+    stores = ''.join(
+        f'<div class="store"><h5>Boutique {index}</h5><p>{rng.randint(1, 200)} rue {rng.choice(WORDS)}, '
+        f'{rng.randint(10, 95)}000 Ville</p><p>Tél. {rng.choice(PHONES)}</p>'
+        f'<p>{rng.choice(("contact [at] example (dot) com", "sav(at)example.fr", EMAILS[index % len(EMAILS)]))}</p></div>'
+        for index in range(60)
+    )
+    content = ''.join(f'<p>{_sentence(rng, 30)}</p>' for _ in range(5))
+    body = (f'{_header(rng)}<main><h1>À propos</h1>{content}</main>'
+            f'{_footer(rng, columns=8, links_per_column=40)}<footer class="stores">{stores}</footer>')
+    return _page("À propos - Example", body)
+
+def link_heavy(links=10000, seed=42):
+    """
+    Plan du site / méga-menu : 10 000 liens, surtout le catalogue, des sous-domaines,
+    des liens externes, des boutons de partage et quelques profils sociaux.
+    """
+    rng = random.Random(seed)
+    anchors = []
+    for index in range(links):
+        draw = rng.random()
+        if draw < 0.80:
+            href = f"/{rng.choice(SECTIONS)}/item-{index}?variant={index % 7}"
+        elif draw < 0.88:
+            href = f"https://shop.{ROOT_DOMAIN}/{rng.choice(SECTIONS)}/item-{index}"
+        elif draw < 0.95:
+            href = f"https://cdn{index % 5}.other.com/assets/{index}.html"
+        elif draw < 0.99:
+            href = rng.choice(SHARE_LINKS).format(index)
+        else:
+            href = rng.choice(SOCIAL_PROFILES)
+        anchors.append(f'<li><a href="{href}">{_sentence(rng, 3)}</a></li>')
+    body = f'{_header(rng)}<main><ul>{"".join(anchors)}</ul></main>{_footer(rng)}'
+    return _page("Plan du site - Example", body)
+
+def jsonld_heavy(products=300, seed=42):
+    """
+    Catalogue décrit en JSON-LD : Organization (contactPoint, sameAs), BreadcrumbList
+    et un bloc Product (offres, avis, vendeur avec téléphone/email) par produit.
+    """
+    rng = random.Random(seed)
+    blocks = [{
+        "@context": "https://schema.org", "@type": "Organization", "name": "Example", "url": BASE_URL,
+        "sameAs": list(SOCIAL_PROFILES),
+        "contactPoint": [{"@type": "ContactPoint", "telephone": phone, "email": email, "contactType": "customer service"}
+                         for phone, email in zip(PHONES, EMAILS)],
+    }, {
+        "@context": "https://schema.org", "@type": "BreadcrumbList",
+        "itemListElement": [{"@type": "ListItem", "position": position, "name": name, "item": f"{BASE_URL}{name}"}
+                            for position, name in enumerate(("femme", "chaussures", "baskets"), 1)],
+    }]
+    for index in range(products):
+        blocks.append({
+            "@context": "https://schema.org", "@type": "Product", "name": _sentence(rng, 4), "sku": f"SKU-{index:05d}",
+            "description": _sentence(rng, 25), "image": [f"{BASE_URL}cdn/{index}-{view}.jpg" for view in range(4)],
+            "offers": {"@type": "Offer", "price": f"{rng.randint(5, 300)}.{rng.randint(0, 99):02d}", "priceCurrency": "EUR",
+                       "availability": "https://schema.org/InStock",
+                       "seller": {"@type": "Organization", "name": "Example",
+                                  "telephone": rng.choice(PHONES) if index % 20 == 0 else None,
+                                  "email": rng.choice(EMAILS) if index % 25 == 0 else None}},
+            "aggregateRating": {"@type": "AggregateRating", "ratingValue": rng.randint(1, 5), "reviewCount": rng.randint(0, 500)},
+        })
+    head = ''.join(f'<script type="application/ld+json">{json.dumps(block, ensure_ascii=False)}</script>' for block in blocks)
+    body = f'{_header(rng)}<main><h1>Baskets</h1><p>{_sentence(rng, 40)}</p></main>{_footer(rng)}'
+    return _page("Baskets - Example", body, head)
+
+FIXTURES = {
+    "product_listing": product_listing,
+    "footer_heavy": footer_heavy,
+    "link_heavy": link_heavy,
+    "jsonld_heavy": jsonld_heavy,
+}
+
+def text_page(size=1024 * 1024, seed=42):
+    """
+    Texte visible réaliste : des mots, des '@' hors email (@media, user-agent...) et un email tous les ~2 Ko.
+    """
+    rng = random.Random(seed)
+    words = WORDS + ("v2.0", "user-agent", "12,90€", "@media", "20%")
+    parts, length = [], 0
+    while length < size:
+        word = rng.choice(EMAILS) if rng.random() < 0.003 else rng.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    return ' '.join(parts)
+
+def product_text(size=512 * 1024, seed=42):
+    """
+    Fiches produit en texte : référence, taille, prix, promotion, date de livraison ; un numéro
+    de service client toutes les ~200 fiches.
+    """
+    rng = random.Random(seed)
+    lines, length, index = [], 0, 0
+    while length < size:
+        index += 1
+        line = (
+            f"Réf. SKU-{rng.randint(0, 99999):05d} Chaussures taille {rng.randint(36, 46)} "
+            f"{rng.randint(5, 300)},{rng.randint(0, 99):02d} € -{rng.randint(5, 70)}% "
+            f"livré le {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024"
+        )
+        if index % 200 == 0:
+            line += f" Service client : {rng.choice(PHONES)}"
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines)
+
+def shop_urls(count=50000, seed=42):
+    """
+    URLs d'un gros site : surtout le catalogue, quelques pages, sous-domaines et liens externes.
+    """
+    rng = random.Random(seed)
+    urls = []
+    for index in range(count):
+        draw = rng.random()
+        if draw < 0.85:
+            urls.append(f"https://{ROOT_DOMAIN}/{rng.choice(SECTIONS)}/item-{index}?variant={index % 7}")
+        elif draw < 0.92:
+            urls.append(f"https://shop.{ROOT_DOMAIN}/{rng.choice(SECTIONS)}/item-{index}")
+        elif draw < 0.99:
+            urls.append(f"https://cdn{index % 5}.other.com/assets/{index}.js")
+        else:
+            urls.append(BASE_URL)
+    return urls
+
+def site_links(count=10000, seed=42):
+    """
+    Liens d'un gros site : 90 % de pages du site, 10 % de boutons de partage, les profils à la fin.
+    """
+    rng = random.Random(seed)
+    links = []
+    for index in range(count - len(SOCIAL_PROFILES)):
+        if rng.random() < 0.9:
+            links.append(f"https://www.{ROOT_DOMAIN}/{rng.choice(SECTIONS)}/item-{index}")
+        else:
+            links.append(rng.choice(SHARE_LINKS).format(index))
+    return links + list(SOCIAL_PROFILES)
+
+INPUTS = {
+    "text_page": text_page,
+    "product_text": product_text,
+    "shop_urls": shop_urls,
+    "site_links": site_links,
+}
@@ -0,0 +1,96 @@
+"""
+Implémentations remplacées des extracteurs optimisés, conservées comme référence pour
+les comparaisons ancien/nouveau de la suite (benchmarks/suite.py, COMPARISONS) :
+mêmes résultats exigés, gain de vitesse suivi dans baseline.json.
+Ne pas optimiser : elles mesurent le point de départ.
+"""
+import re
+from urllib.parse import urlsplit
+import phonenumbers
+from phonenumbers import PhoneNumberMatcher
+from email_validator import validate_email, EmailNotValidError
+from utils.extractors import email_extractor
+from utils.extractors.email_extractor import EMAIL_PATTERN, is_valid_tld
+
+def extract_emails_html(html_content):
+    """
+    Pattern non compilé passé à re.findall sur tout le texte, validation sans cache, log par email.
+    """
+    emails = set()
+    for email in re.findall(EMAIL_PATTERN.pattern, html_content, re.IGNORECASE):
+        try:
+            email = email.strip().rstrip('.').lower()
+            if not is_valid_tld(email):
+                continue
+            valid = validate_email(email, check_deliverability=False, test_environment=True)
+        except EmailNotValidError:
+            continue
+        emails.add(valid.normalized.lower())
+        email_extractor.logger.info(f"Email extrait : {valid.normalized.lower()}")
+    return emails
+
+def find_phones(text, country_code):
+    """
+    PhoneNumberMatcher sur tout le texte, sans préfiltre ; numéros en E.164.
+    """
+    return {phonenumbers.format_number(match.number, phonenumbers.PhoneNumberFormat.E164)
+            for match in PhoneNumberMatcher(text, country_code)}
+
+def extract_social_links(unique_links):
+    """
+    Neuf regex compilées à chaque appel, essayées sur chaque lien ; premier lien trouvé par plateforme.
+    """
+    social_links = {platform: None for platform in (
+        "facebook", "instagram", "twitter", "tiktok", "linkedin", "youtube", "pinterest", "github", "snapchat"
+    )}
+    patterns = {
+        "facebook": re.compile(r"https?://(www\.)?(facebook|fb)\.com/([^/\s]+)/?"),
+        "instagram": re.compile(r"https?://(www\.)?instagram\.[^/]+/([^/\s]+)/?"),
+        "twitter": re.compile(r"https?://(www\.)?(twitter|x)\.[^/]+/([^/\s]+)/?"),
+        "tiktok": re.compile(r"https?://(www\.)?tiktok\.com/(@[^/\s]+|[^/\s]+)/?"),
+        "linkedin": re.compile(r"https?://(www\.)?linkedin\.[^/]+/(company/[^/\s]+|in/[^/\s]+)/?"),
+        "youtube": re.compile(r"https?://(www\.)?(youtube\.com|youtu\.be)/(channel/|user/|c/|@)?([^/\s]+)/?"),
+        "pinterest": re.compile(r"https?://(www\.)?pinterest\.[^/]+/([^/\s]+)/?"),
+        "github": re.compile(r"https?://(www\.)?github\.com/([^/\s]+)/?"),
+        "snapchat": re.compile(r"https?://(www\.)?snapchat\.com/(add/|@)?([^/\s]+)/?")
+    }
+    for link in unique_links:
+        if not link:
+            continue
+        link = link.strip().lower()
+        for platform, pattern in patterns.items():
+            if social_links[platform]:
+                continue
+            if pattern.search(link):
+                social_links[platform] = link
+    return social_links
+
+CLASSIFY_PREFIXES = (
+    ("Pages", ("pages", "page")),
+    ("Policies", ("policies", "policy")),
+    ("Blogs", ("blogs", "blog")),
+    ("Collections", ("collections", "collection")),
+    ("Products", ("products", "product")),
+)
+
+def classify_links(urls, root_domain):
+    """
+    urlsplit puis comparaison du premier segment du chemin à chaque catégorie (chaîne de if/elif).
+    """
+    categories = {"Home": [], **{name: [] for name, _ in CLASSIFY_PREFIXES}, "Others": []}
+    for url in urls:
+        parsed = urlsplit(url)
+        path = parsed.path.lower()
+        if path.endswith("/"):
+            path = path[:-1]
+        if parsed.netloc == root_domain and path == "":
+            categories["Home"].append(url)
+            continue
+        if not parsed.netloc.endswith(root_domain):
+            categories["Others"].append(url)
+            continue
+        segments = path.split("/")
+        first = segments[1] if segments[0] == "" and len(segments) > 1 else segments[0]
+        category = next((name for name, prefixes in CLASSIFY_PREFIXES if first in prefixes), "Others")
+        categories[category].append(url)
+    return categories
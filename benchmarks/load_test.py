@@ -0,0 +1,286 @@
+"""
+Test de charge de bout en bout : démarre la ferme de sites (benchmarks/origin_farm.py),
+lance l'application sous gunicorn (même commande que le Dockerfile) et envoie des
+requêtes /scrape concurrentes sur les sites de la ferme.
+Rapporte débit, latences p50/p95/p99, taux d'erreur et RSS de chaque worker gunicorn.
+Avec la même graine, les sites servis et l'ordre des requêtes sont identiques : deux
+exécutions ne diffèrent que par la configuration du serveur ou la version du code.
+
+    python -m benchmarks.load_test --workers 4 --requests 200 --concurrency 8 --seed 1
+    python -m benchmarks.load_test --workers 8 --env PARSE_WORKERS=2 --output run-w8.json
+    python -m benchmarks.load_test --target http://localhost:5000 --server-pid 1234  # serveur déjà lancé
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import aiohttp
+import psutil
+from benchmarks.origin_farm import add_farm_arguments, farm_from_arguments
+from config.settings import SCRIPT_VERSION
+
+STARTUP_TIMEOUT = 60
+DEFAULT_PARAMS = {"max_link": "20", "refresh": "true", "max_age": "0"}
+RSS_SAMPLE_INTERVAL = 0.5
+
+def percentile(values, fraction):
+    """
+    Percentile au rang le plus proche d'une liste triée (None si vide).
+    """
+    if not values:
+        return None
+    rank = max(1, min(len(values), math.ceil(fraction * len(values))))
+    return values[rank - 1]
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class ServerProcess:
+    """
+    Application sous gunicorn sur un port libre de 127.0.0.1, avec des dossiers de cache,
+    de jobs et de métriques neufs (caches froids à chaque exécution).
+    """
+    def __init__(self, workers, timeout, env=None, log_path=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.log_path = log_path
+        self.port = free_port()
+        self._directory = tempfile.TemporaryDirectory(prefix='contact-scraper-load-')
+        self.env = {
+            **os.environ,
+            "WORKERS": str(workers),
+            "PAGE_CACHE_DIR": os.path.join(self._directory.name, 'cache'),
+            "JOB_QUEUE_PATH": os.path.join(self._directory.name, 'jobs', 'jobs.sqlite3'),
+            "METRICS_DIR": os.path.join(self._directory.name, 'metrics'),
+            "LOG_LEVEL": "WARNING",
+            **(env or {}),
+        }
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        command = [
+            sys.executable, '-m', 'gunicorn', '--workers', str(self.workers), '--timeout', str(self.timeout),
+            '--bind', f"127.0.0.1:{self.port}", 'main:app',
+        ]
+        # Journaux du serveur hors du rapport (fichier avec --server-log)
+        log = open(self.log_path, 'w') if self.log_path else subprocess.DEVNULL
+        self.process = subprocess.Popen(
+            command, env=self.env, stdout=log, stderr=log,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        if self.log_path:
+            log.close()
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {self.process.returncode}")
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), timeout=1):
+                    return self
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"gunicorn not listening after {STARTUP_TIMEOUT}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._directory.cleanup()
+
+class RssSampler:
+    """
+    RSS des workers (enfants du processus maître) relevée toutes les RSS_SAMPLE_INTERVAL secondes :
+    max et dernière valeur par pid.
+    """
+    def __init__(self, pid):
+        self.master = psutil.Process(pid)
+        self.workers = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.report()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(RSS_SAMPLE_INTERVAL)
+
+    def sample(self):
+        try:
+            processes = self.master.children() or [self.master]
+        except psutil.Error:
+            return
+        for process in processes:
+            try:
+                rss = process.memory_info().rss
+            except psutil.Error:
+                continue
+            worker = self.workers.setdefault(process.pid, {"pid": process.pid, "max_rss_mb": 0.0, "rss_mb": 0.0})
+            worker["rss_mb"] = round(rss / (1024 * 1024), 1)
+            worker["max_rss_mb"] = max(worker["max_rss_mb"], worker["rss_mb"])
+
+    def report(self):
+        return sorted(self.workers.values(), key=lambda worker: worker["pid"])
+
+def request_plan(site_urls, total, seed):
+    """
+    Ordre des sites scrapés : chaque site à tour de rôle, mélangé par la graine.
+    """
+    rng = random.Random(seed)
+    plan = [site_urls[index % len(site_urls)] for index in range(total)]
+    rng.shuffle(plan)
+    return plan
+
+async def drive(target, plan, concurrency, params, client_timeout):
+    """
+    Envoie les requêtes du plan, au plus concurrency à la fois (boucle fermée).
+    Retourne [(statut ou type d'erreur, durée en secondes)].
+    """
+    queue = asyncio.Queue()
+    for url in plan:
+        queue.put_nowait(url)
+    results = []
+    timeout = aiohttp.ClientTimeout(total=client_timeout)
+
+    async def worker(session):
+        while not queue.empty():
+            url = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                async with session.get(f"{target}/scrape", params={"url": url, **params}) as response:
+                    await response.read()
+                    outcome = response.status
+            except asyncio.TimeoutError:
+                outcome = 'timeout'
+            except aiohttp.ClientError as e:
+                outcome = type(e).__name__
+            results.append((outcome, time.perf_counter() - start))
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    return results
+
+def summarize(results, elapsed):
+    durations = sorted(duration for _, duration in results)
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[str(outcome)] = outcomes.get(str(outcome), 0) + 1
+    errors = sum(count for outcome, count in outcomes.items() if outcome != '200')
+    return {
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(results) / elapsed, 3) if elapsed else None,
+        "latency_s": {
+            name: round(value, 3) if value is not None else None
+            for name, value in (("p50", percentile(durations, 0.50)), ("p95", percentile(durations, 0.95)),
+                                ("p99", percentile(durations, 0.99)), ("max", durations[-1] if durations else None))
+        },
+        "error_rate": round(errors / len(results), 4) if results else None,
+        "outcomes": outcomes,
+    }
+
+def _key_values(values):
+    pairs = {}
+    for value in values:
+        key, separator, item = value.partition('=')
+        if not separator:
+            raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {value}")
+        pairs[key] = item
+    return pairs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge de /scrape sur une ferme de sites locale.")
+    group = parser.add_argument_group("server")
+    group.add_argument('--target', help="URL d'un serveur déjà lancé (sinon gunicorn est démarré)")
+    group.add_argument('--server-pid', type=int, help="pid du maître gunicorn de --target, pour la RSS des workers")
+    group.add_argument('--workers', type=int, default=4, help="workers gunicorn (WORKERS)")
+    group.add_argument('--timeout', type=int, default=300, help="timeout gunicorn (secondes)")
+    group.add_argument('--env', action='append', default=[], metavar='KEY=VALUE', help="variable d'environnement du serveur")
+    group.add_argument('--server-log', help="fichier des journaux de gunicorn (ignorés par défaut)")
+    group = parser.add_argument_group("load")
+    group.add_argument('--requests', type=int, default=100, help="nombre de requêtes /scrape")
+    group.add_argument('--concurrency', type=int, default=8, help="requêtes simultanées")
+    group.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                       help="paramètre de /scrape (défaut : max_link=20, refresh=true, max_age=0)")
+    group.add_argument('--client-timeout', type=float, default=600, help="timeout d'une requête côté client (secondes)")
+    group.add_argument('--output', help="écrit le rapport JSON dans ce fichier")
+    add_farm_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # refresh ne contourne que le cache de résultats ; max_age=0 revalide aussi chaque page
+    # du cache de pages (la ferme n'envoie ni ETag ni Last-Modified : téléchargement complet),
+    # sinon seule la première visite d'un site mesurerait la latence de la ferme
+    params = {**DEFAULT_PARAMS, **_key_values(args.param)}
+    farm = farm_from_arguments(args).start()
+    server = None
+    try:
+        if args.target:
+            target, pid = args.target.rstrip('/'), args.server_pid
+        else:
+            server = ServerProcess(args.workers, args.timeout, _key_values(args.env), args.server_log).start()
+            target, pid = server.url, server.process.pid
+        sampler = RssSampler(pid).start() if pid else None
+        plan = request_plan(farm.urls, args.requests, args.seed)
+        print(f"{len(plan)} requests over {len(farm.urls)} sites, concurrency {args.concurrency}, target {target}", flush=True)
+
+        start = time.perf_counter()
+        results = asyncio.run(drive(target, plan, args.concurrency, params, args.client_timeout))
+        elapsed = time.perf_counter() - start
+        report = {
+            "version": SCRIPT_VERSION,
+            "config": {
+                "seed": args.seed, "sites": args.sites, "requests": args.requests, "concurrency": args.concurrency,
+                "params": params, "workers": None if args.target else args.workers,
+                # Pages relues du cache de pages (max_age absent) ou toujours redemandées à la ferme
+                "page_cache": "bypassed" if params.get("max_age") == "0" else "enabled",
+                "env": _key_values(args.env), "farm_requests": farm.requests,
+            },
+            **summarize(results, elapsed),
+            "workers_rss": sampler.stop() if sampler else [],
+        }
+    finally:
+        if server:
+            server.stop()
+        farm.stop()
+
+    latency = report["latency_s"]
+    print(f"throughput: {report['throughput_rps']} req/s over {report['elapsed_s']}s")
+    print(f"latency: p50 {latency['p50']}s, p95 {latency['p95']}s, p99 {latency['p99']}s, max {latency['max']}s")
+    print(f"errors: {report['error_rate']:.2%} {report['outcomes']}")
+    for worker in report["workers_rss"]:
+        print(f"worker {worker['pid']}: rss {worker['rss_mb']} MB (max {worker['max_rss_mb']} MB)")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
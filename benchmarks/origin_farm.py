@@ -0,0 +1,186 @@
+"""
+Ferme de sites de test locale pour les tests de charge : chaque site écoute sur son
+propre port de 127.0.0.1 (un domaine par site pour le scraper) et sert des pages générées
+à partir d'une graine. Le comportement de chaque page (latence, page lente ou bloquée,
+redirection, erreur) est tiré de (graine, site, chemin) : deux exécutions avec la même
+graine servent exactement les mêmes sites.
+
+    python -m benchmarks.origin_farm --sites 5 --seed 1   # sert les sites jusqu'à Ctrl-C
+"""
+import argparse
+import asyncio
+import random
+import socket
+import threading
+from aiohttp import web
+
+WORDS = ("livraison", "produit", "service", "client", "commande", "retour", "qualité", "prix", "collection")
+PHONES = ("01 23 45 67 89", "+33 4 72 00 00 00", "09 70 80 90 00")
+SOCIAL = ("https://www.facebook.com/{}", "https://instagram.com/{}", "https://www.linkedin.com/company/{}")
+FIXED_PAGES = ("/pages/contact", "/pages/mentions-legales", "/pages/a-propos", "/policies/privacy-policy")
+ERROR_STATUSES = (404, 500, 502, 503)
+
+class OriginFarm:
+    """
+    Sites de test servis par aiohttp dans un thread dédié.
+    - sites: nombre de sites ; pages: (min, max) pages par site
+    - latency_ms / latency_sigma: latence lognormale des pages (médiane en ms, dispersion)
+    - slow_rate / slow_seconds: part des pages lentes et leur latence (min, max)
+    - hang_rate / hang_seconds: part des pages qui ne répondent pas avant hang_seconds
+    - redirect_rate: part des liens qui passent par une redirection 301
+    - error_rate: part des pages en erreur (404, 500, 502, 503)
+    La page d'accueil n'a que la latence normale : les erreurs portent sur les pages du crawl.
+    """
+    def __init__(self, sites=10, seed=0, pages=(5, 40), latency_ms=80, latency_sigma=0.6,
+                 slow_rate=0.02, slow_seconds=(5, 15), hang_rate=0.005, hang_seconds=600,
+                 redirect_rate=0.1, error_rate=0.05):
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.redirect_rate = redirect_rate
+        self.error_rate = error_rate
+        rng = random.Random(seed)
+        self.page_counts = [rng.randint(*pages) for _ in range(sites)]
+        self.ports = []
+        self.requests = 0
+        self.loop = None
+        self._runners = []
+        self._thread = None
+
+    @property
+    def urls(self):
+        return [f"http://127.0.0.1:{port}/" for port in self.ports]
+
+    def behavior(self, site, path):
+        """
+        (statut, latence en secondes) d'une page, identiques à chaque exécution.
+        """
+        rng = random.Random(f"{self.seed}:{site}:{path}")
+        latency = rng.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+        if path == '/':
+            return 200, latency
+        draw = rng.random()
+        if draw < self.hang_rate:
+            return 200, self.hang_seconds
+        if draw < self.hang_rate + self.slow_rate:
+            return 200, rng.uniform(*self.slow_seconds)
+        if rng.random() < self.error_rate:
+            return rng.choice(ERROR_STATUSES), latency
+        return 200, latency
+
+    def paths(self, site):
+        count = self.page_counts[site]
+        products = [f"/products/produit-{index}" for index in range(max(0, count - len(FIXED_PAGES)))]
+        return list(FIXED_PAGES[:count]) + products
+
+    def render(self, site, path):
+        rng = random.Random(f"{self.seed}:{site}:{path}:body")
+        paths = self.paths(site)
+        links = paths if path == '/' else rng.sample(paths, min(len(paths), 8))
+        anchors = []
+        for link in links:
+            # Une partie des liens passe par une redirection vers la page
+            if random.Random(f"{self.seed}:{site}:{link}:redirect").random() < self.redirect_rate:
+                link = f"/go{link}"
+            anchors.append(f'<li><a href="{link}">{" ".join(rng.choice(WORDS) for _ in range(3))}</a></li>')
+        brand = f"site{site}"
+        content = ' '.join(rng.choice(WORDS) for _ in range(200))
+        if path == '/pages/contact':
+            content += f' Écrivez-nous : contact@{brand}.example.com, tél. {rng.choice(PHONES)}'
+        social = ''.join(f'<a href="{url.format(brand)}">{brand}</a>' for url in SOCIAL)
+        return (f'<!DOCTYPE html><html lang="fr"><head><title>{brand} {path}</title></head><body>'
+                f'<nav><a href="/">Accueil</a></nav><main><p>{content}</p><ul>{"".join(anchors)}</ul></main>'
+                f'<footer>{social}<a href="mailto:hello@{brand}.example.com">Contact</a></footer></body></html>')
+
+    def _app(self, site):
+        async def page(request):
+            self.requests += 1
+            path = request.path
+            if path == '/robots.txt':
+                return web.Response(text="User-agent: *\nAllow: /\n")
+            if path.startswith('/go/'):
+                raise web.HTTPMovedPermanently(path[3:])
+            if path != '/' and path not in self.paths(site):
+                return web.Response(status=404, text="Not found")
+            status, latency = self.behavior(site, path)
+            await asyncio.sleep(latency)
+            if status != 200:
+                return web.Response(status=status, text=f"Error {status}")
+            return web.Response(text=self.render(site, path), content_type='text/html')
+
+        app = web.Application()
+        app.router.add_route('GET', '/{tail:.*}', page)
+        return app
+
+    async def _start(self):
+        for site in range(len(self.page_counts)):
+            runner = web.AppRunner(self._app(site), access_log=None, shutdown_timeout=1)
+            await runner.setup()
+            sock = socket.socket()
+            sock.bind(('127.0.0.1', 0))
+            await web.SockSite(runner, sock).start()
+            self.ports.append(sock.getsockname()[1])
+            self._runners.append(runner)
+
+    def start(self):
+        """
+        Démarre les sites dans un thread dédié ; retourne la ferme une fois tous les ports ouverts.
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='origin-farm', daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result(30)
+        return self
+
+    def stop(self):
+        async def cleanup():
+            for runner in self._runners:
+                await runner.cleanup()
+            # Pages encore bloquées (hang_seconds) : annulées avant l'arrêt de la boucle
+            pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(cleanup(), self.loop).result(30)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5)
+
+def add_farm_arguments(parser):
+    group = parser.add_argument_group("origin farm")
+    group.add_argument('--sites', type=int, default=10, help="nombre de sites")
+    group.add_argument('--seed', type=int, default=0, help="graine des sites et de l'ordre des requêtes")
+    group.add_argument('--pages', type=int, nargs=2, default=(5, 40), metavar=('MIN', 'MAX'), help="pages par site")
+    group.add_argument('--latency-ms', type=float, default=80, help="latence médiane d'une page (ms)")
+    group.add_argument('--latency-sigma', type=float, default=0.6, help="dispersion lognormale de la latence")
+    group.add_argument('--slow-rate', type=float, default=0.02, help="part des pages lentes")
+    group.add_argument('--slow-seconds', type=float, nargs=2, default=(5, 15), metavar=('MIN', 'MAX'))
+    group.add_argument('--hang-rate', type=float, default=0.005, help="part des pages qui ne répondent pas")
+    group.add_argument('--hang-seconds', type=float, default=600)
+    group.add_argument('--redirect-rate', type=float, default=0.1, help="part des liens redirigés (301)")
+    group.add_argument('--error-rate', type=float, default=0.05, help="part des pages en erreur")
+
+def farm_from_arguments(args):
+    return OriginFarm(
+        sites=args.sites, seed=args.seed, pages=tuple(args.pages), latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma, slow_rate=args.slow_rate, slow_seconds=tuple(args.slow_seconds),
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds, redirect_rate=args.redirect_rate,
+        error_rate=args.error_rate,
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Sert une ferme de sites de test sur 127.0.0.1.")
+    add_farm_arguments(parser)
+    farm = farm_from_arguments(parser.parse_args()).start()
+    print('\n'.join(farm.urls), flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        farm.stop()
+
+if __name__ == '__main__':
+    main()
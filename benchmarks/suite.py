@@ -0,0 +1,362 @@
+"""
+Suite de micro-benchmarks des extracteurs, du classifieur et du parsing HTML sur les
+pages et entrées de benchmarks/fixtures.py, comparée à une référence enregistrée (baseline.json).
+Pour chaque cas : opérations par seconde (meilleure de plusieurs séries) et pic
+mémoire Python (tracemalloc, hors allocations C de lxml). Entièrement hors ligne.
+
+    python -m benchmarks.suite                    # compare à la référence, code 1 si régression
+    python -m benchmarks.suite -k phones          # seulement les cas dont le nom contient "phones"
+    python -m benchmarks.suite --update-baseline  # enregistre la référence de cette machine
+
+Les comparaisons ancien/nouveau (COMPARISONS) mesurent chaque extracteur optimisé face à
+l'implémentation qu'il a remplacée (benchmarks/legacy.py) : mêmes résultats exigés, et
+le gain (ops/s nouveau / ops/s ancien) ne doit pas passer sous le gain annoncé ni
+reculer de plus du seuil par rapport au gain enregistré.
+
+Les vitesses sont rapportées à une boucle de calibration en pur Python, mesurée en
+alternance avec chaque cas et enregistrée avec la référence : une machine deux fois plus
+lente, ou momentanément chargée, n'est pas une régression.
+"""
+import argparse
+import gc
+import json
+import logging
+import operator
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+import phonenumbers
+from benchmarks import legacy
+from benchmarks.fixtures import BASE_URL, ROOT_DOMAIN, FIXTURES, INPUTS
+from utils.analyzers.link_analyzer import analyze_page
+from utils.analyzers.link_classifier import classify_links, get_link_classifier, split_url
+from utils.extractors.document import parse_document
+from utils.extractors.email_extractor import extract_emails_html, extract_emails_jsonld, validate_and_normalize_email
+from utils.extractors.link_explorer import extract_link_contexts
+from utils.extractors.phone_extractor import extract_phones_html, extract_phones_jsonld, find_phone_numbers, lookup_phone
+from utils.extractors.social_links import extract_social_links
+from utils.scrapers.page_store import Page
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# Écart toléré par rapport à la référence (0.25 = 25 % plus lent ou plus gourmand)
+THRESHOLD = 0.25
+# Pics mémoire sous ce seuil (octets) : écarts ignorés, c'est du bruit
+MEMORY_SLACK = 256 * 1024
+MIN_TIME = 0.2
+REPEAT = 5
+COUNTRY_CODE = "FR"
+
+def clear_caches():
+    # Chaque opération paie la validation des emails et numéros, comme sur une nouvelle page
+    validate_and_normalize_email.cache_clear()
+    lookup_phone.cache_clear()
+
+class Case:
+    """
+    Cas de benchmark : setup() prépare les entrées une fois (hors mesure),
+    run(entrées) est l'opération mesurée.
+    """
+    def __init__(self, name, setup, run):
+        self.name = name
+        self.setup = setup
+        self.run = run
+
+class Comparison:
+    """
+    Comparaison ancien/nouveau sur les mêmes entrées : legacy(entrées) est l'implémentation
+    remplacée, run(entrées) l'actuelle. same(ancien, nouveau) vérifie que les résultats
+    concordent ; min_speedup est le gain minimal annoncé lors du remplacement.
+    """
+    def __init__(self, name, setup, legacy, run, min_speedup=1.0, same=operator.eq):
+        self.name = name
+        self.setup = setup
+        self.legacy = legacy
+        self.run = run
+        self.min_speedup = min_speedup
+        self.same = same
+
+def _document(fixture):
+    return lambda: parse_document(FIXTURES[fixture]())
+
+def _text(fixture):
+    return lambda: parse_document(FIXTURES[fixture]()).text
+
+def _links(fixture):
+    return lambda: list(extract_link_contexts(parse_document(FIXTURES[fixture]()), BASE_URL))
+
+def _split(urls):
+    # (url, hôte, chemin) comme les découpe le crawler, hors mesure
+    return lambda: [(url, *split_url(url)) for url in urls()]
+
+def _analyze(html):
+    # Nouvelle Page à chaque opération : parsing compris, comme dans le crawler
+    clear_caches()
+    page = Page(BASE_URL, BASE_URL, 200, {}, html)
+    return analyze_page(page, BASE_URL, True, True, COUNTRY_CODE)
+
+def _emails_html(text):
+    clear_caches()
+    return extract_emails_html(text)
+
+def _phones_html(text):
+    clear_caches()
+    return extract_phones_html(text, COUNTRY_CODE)
+
+def _find_phones(text):
+    # Préfiltre des candidats seul, sans formatage des numéros
+    return list(find_phone_numbers(text, COUNTRY_CODE))
+
+def _prefiltered_phones(text):
+    clear_caches()
+    return {phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+            for number in find_phone_numbers(text, COUNTRY_CODE)}
+
+def _same_platforms(old, new):
+    # L'ancienne version retenait le premier lien venu (boutons de partage compris) :
+    # seules les plateformes trouvées doivent concorder
+    return {platform for platform, link in old.items() if link} == {platform for platform, link in new.items() if link}
+
+def _jsonld(document):
+    clear_caches()
+    return extract_emails_jsonld(document), extract_phones_jsonld(document, COUNTRY_CODE)
+
+CASES = [
+    *[Case(f"parse_document/{fixture}", FIXTURES[fixture], parse_document) for fixture in FIXTURES],
+    Case("extract_emails_html/product_listing", _text("product_listing"), _emails_html),
+    Case("extract_emails_html/footer_heavy", _text("footer_heavy"), _emails_html),
+    Case("extract_phones_html/product_listing", _text("product_listing"), _phones_html),
+    Case("extract_phones_html/footer_heavy", _text("footer_heavy"), _phones_html),
+    Case("extract_jsonld/jsonld_heavy", _document("jsonld_heavy"), _jsonld),
+    Case("extract_link_contexts/link_heavy", _document("link_heavy"), lambda document: extract_link_contexts(document, BASE_URL)),
+    Case("extract_social_links/link_heavy", _links("link_heavy"), extract_social_links),
+    Case("classify_links/link_heavy", _links("link_heavy"), lambda links: classify_links(links, ROOT_DOMAIN)),
+    Case("extract_emails_html/text_page", INPUTS["text_page"], _emails_html),
+    Case("find_phone_numbers/product_text", INPUTS["product_text"], _find_phones),
+    Case("extract_social_links/site_links", INPUTS["site_links"], extract_social_links),
+    Case("classify_links/shop_urls", INPUTS["shop_urls"], lambda urls: classify_links(urls, ROOT_DOMAIN)),
+    Case("classify_parsed/shop_urls", _split(INPUTS["shop_urls"]),
+         lambda parsed: get_link_classifier().classify_parsed(parsed, ROOT_DOMAIN)),
+    Case("analyze_page/product_listing", FIXTURES["product_listing"], _analyze),
+    Case("analyze_page/footer_heavy", FIXTURES["footer_heavy"], _analyze),
+    Case("analyze_page/jsonld_heavy", FIXTURES["jsonld_heavy"], _analyze),
+]
+
+COMPARISONS = [
+    # Fenêtres autour des '@' et validation mémorisée : au moins 5x sur une page de 1 Mo
+    Comparison("extract_emails_html/text_page", INPUTS["text_page"], legacy.extract_emails_html, _emails_html,
+               min_speedup=5.0),
+    Comparison("find_phone_numbers/product_text", INPUTS["product_text"],
+               lambda text: legacy.find_phones(text, COUNTRY_CODE), _prefiltered_phones),
+    Comparison("extract_social_links/site_links", INPUTS["site_links"], legacy.extract_social_links,
+               extract_social_links, same=_same_platforms),
+    Comparison("classify_links/shop_urls", INPUTS["shop_urls"], lambda urls: legacy.classify_links(urls, ROOT_DOMAIN),
+               lambda urls: classify_links(urls, ROOT_DOMAIN)),
+]
+
+CALIBRATION_TEXT = ' '.join(f"item-{index} prix {index % 97},{index % 100:02d} €" for index in range(2000))
+CALIBRATION_PATTERN = re.compile(r'\d+,\d{2}')
+
+def calibration():
+    """
+    Travail de référence en pur Python (regex, dictionnaire, tri), indépendant du code mesuré.
+    """
+    counts = {}
+    for match in CALIBRATION_PATTERN.findall(CALIBRATION_TEXT):
+        counts[match] = counts.get(match, 0) + 1
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:10]
+
+def _series(function, argument, min_time):
+    # Débit d'une série d'au moins min_time secondes de CPU (insensible aux autres processus)
+    operations = 0
+    start = time.process_time()
+    elapsed = 0.0
+    while elapsed < min_time:
+        function(argument)
+        operations += 1
+        elapsed = time.process_time() - start
+    return operations / elapsed
+
+def ops_per_second(function, argument, min_time=MIN_TIME, repeat=REPEAT):
+    """
+    (meilleur débit de function, meilleur débit de la calibration) sur repeat séries
+    alternées d'au moins min_time secondes chacune.
+    """
+    function(argument)
+    best = reference = 0.0
+    for _ in range(repeat):
+        reference = max(reference, _series(lambda _: calibration(), None, min_time))
+        best = max(best, _series(function, argument, min_time))
+    return best, reference
+
+def peak_memory(function, argument):
+    """
+    Pic d'allocations Python (octets) pendant une opération.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        function(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - start)
+
+def run_suite(cases, min_time=MIN_TIME, repeat=REPEAT):
+    """
+    Mesure les cas : {nom: {"ops_per_sec", "calibration" (ops/s mesurées en alternance), "peak_bytes"}}.
+    """
+    results = {}
+    for case in cases:
+        argument = case.setup()
+        ops, reference = ops_per_second(case.run, argument, min_time, repeat)
+        results[case.name] = {"ops_per_sec": ops, "calibration": reference, "peak_bytes": peak_memory(case.run, argument)}
+    return results
+
+def run_comparisons(comparisons, min_time=MIN_TIME, repeat=REPEAT):
+    """
+    Mesure les comparaisons en séries alternées :
+    {nom: {"legacy_ops_per_sec", "ops_per_sec", "speedup", "min_speedup", "same"}}.
+    """
+    results = {}
+    for comparison in comparisons:
+        argument = comparison.setup()
+        same = comparison.same(comparison.legacy(argument), comparison.run(argument))
+        old = new = 0.0
+        for _ in range(repeat):
+            old = max(old, _series(comparison.legacy, argument, min_time))
+            new = max(new, _series(comparison.run, argument, min_time))
+        results[comparison.name] = {"legacy_ops_per_sec": old, "ops_per_sec": new, "speedup": new / old,
+                                    "min_speedup": comparison.min_speedup, "same": same}
+    return results
+
+def compare_speedups(results, baseline, threshold=THRESHOLD):
+    """
+    Gains mesurés face aux gains de référence : [(nom, gain, gain de référence ou None, régressions)].
+    """
+    rows = []
+    for name, current in results.items():
+        reference = (baseline or {}).get("speedups", {}).get(name)
+        regressions = []
+        if not current["same"]:
+            regressions.append("results differ from the legacy implementation")
+        if current["speedup"] < current["min_speedup"]:
+            regressions.append(f"below the {current['min_speedup']:g}x target")
+        if reference is not None and current["speedup"] < reference * (1 - threshold):
+            regressions.append(f"speedup down {(1 - current['speedup'] / reference) * 100:.0f}%")
+        rows.append((name, current["speedup"], reference, regressions))
+    return rows
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Compare aux valeurs de référence. Retourne [(nom, vitesse relative, mémoire relative, régressions)] ;
+    vitesse relative = (ops/s / calibration) actuel / (ops/s / calibration) de référence.
+    Les cas absents de la référence ont None comme valeurs relatives.
+    """
+    rows = []
+    for name, current in results.items():
+        reference = (baseline or {}).get("cases", {}).get(name)
+        if reference is None:
+            rows.append((name, None, None, []))
+            continue
+        speed = (current["ops_per_sec"] / current["calibration"]) / (reference["ops_per_sec"] / reference["calibration"])
+        memory = (current["peak_bytes"] + MEMORY_SLACK) / (reference["peak_bytes"] + MEMORY_SLACK)
+        regressions = []
+        if speed < 1 - threshold:
+            regressions.append(f"{(1 - speed) * 100:.0f}% slower")
+        if memory > 1 + threshold:
+            regressions.append(f"{(memory - 1) * 100:.0f}% more memory")
+        rows.append((name, speed, memory, regressions))
+    return rows
+
+def load_baseline(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+def save_baseline(path, results, speedups=None):
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": {name: {"ops_per_sec": round(values["ops_per_sec"], 2), "calibration": round(values["calibration"], 1),
+                         "peak_bytes": values["peak_bytes"]}
+                  for name, values in results.items()},
+        # Gain ops/s actuel / ops/s de l'implémentation remplacée (COMPARISONS)
+        "speedups": {name: round(speedup, 2) for name, speedup in (speedups or {}).items()},
+    }
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2)
+        file.write('\n')
+
+def _ratio(value):
+    return f"{value:6.2f}x" if value is not None else "    new"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks des extracteurs, du classifieur et du parsing.")
+    parser.add_argument('-k', '--filter', default='', help="seulement les cas dont le nom contient ce texte")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="fichier de référence")
+    parser.add_argument('--update-baseline', action='store_true', help="enregistre les mesures comme référence")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="écart toléré (0.25 = 25 %%)")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help="durée min d'une série (secondes)")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="nombre de séries par cas")
+    args = parser.parse_args(argv)
+
+    # Les extracteurs journalisent chaque page en INFO
+    logging.disable(logging.INFO)
+    cases = [case for case in CASES if args.filter in case.name]
+    results = run_suite(cases, args.min_time, args.repeat)
+    comparisons = [comparison for comparison in COMPARISONS if args.filter in comparison.name]
+    speedups = run_comparisons(comparisons, args.min_time, args.repeat)
+
+    if args.update_baseline:
+        different = [name for name, values in speedups.items() if not values["same"]]
+        if different:
+            print(f"Not written: results differ from the legacy implementation for {', '.join(different)}")
+            return 1
+        speedups = {name: values["speedup"] for name, values in speedups.items()}
+        baseline = load_baseline(args.baseline) if args.filter else None
+        if baseline:
+            # Mise à jour partielle : les autres cas gardent leur référence
+            results = {**baseline["cases"], **results}
+            speedups = {**baseline.get("speedups", {}), **speedups}
+        save_baseline(args.baseline, results, speedups)
+        print(f"Baseline written to {args.baseline} ({len(results)} cases, {len(speedups)} speedups)")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    rows = compare(results, baseline, args.threshold)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, run with --update-baseline to create it")
+    print(f"{'case':<40} {'ops/s':>10} {'peak KiB':>10} {'speed':>8} {'memory':>8}")
+    failed = 0
+    for name, speed, memory, regressions in rows:
+        current = results[name]
+        line = (f"{name:<40} {current['ops_per_sec']:>10.1f} {current['peak_bytes'] / 1024:>10.0f} "
+                f"{_ratio(speed):>8} {_ratio(memory):>8}")
+        if regressions:
+            failed += 1
+            line += f"  REGRESSION: {', '.join(regressions)}"
+        print(line)
+    if speedups:
+        print(f"\n{'legacy comparison':<40} {'legacy ops/s':>12} {'ops/s':>10} {'speedup':>8} {'baseline':>8}")
+    for name, speedup, reference, regressions in compare_speedups(speedups, baseline, args.threshold):
+        current = speedups[name]
+        line = (f"{name:<40} {current['legacy_ops_per_sec']:>12.1f} {current['ops_per_sec']:>10.1f} "
+                f"{speedup:>7.2f}x {f'{reference:.2f}x' if reference is not None else 'new':>8}")
+        if regressions:
+            failed += 1
+            line += f"  REGRESSION: {', '.join(regressions)}"
+        print(line)
+    if failed:
+        print(f"{failed} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
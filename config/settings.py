@@ -5,6 +5,54 @@ import logging
 WORKERS = int(os.getenv('WORKERS', '4'))
 REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '60'))
 MAX_LINKS_DEFAULT = int(os.getenv('MAX_LINKS_DEFAULT', '100'))
+CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', '10'))
+HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', '5'))
+HEALTH_SAMPLE_INTERVAL = float(os.getenv('HEALTH_SAMPLE_INTERVAL', '5'))
+READY_MAX_CRAWLS = int(os.getenv('READY_MAX_CRAWLS', '16'))
+READY_MAX_PARSE_BACKLOG = int(os.getenv('READY_MAX_PARSE_BACKLOG', '200'))
+READY_MAX_LOOP_LAG = float(os.getenv('READY_MAX_LOOP_LAG', '1'))
+READY_MAX_MEMORY_PERCENT = float(os.getenv('READY_MAX_MEMORY_PERCENT', '90'))
+FETCH_CONCURRENCY = int(os.getenv('FETCH_CONCURRENCY', '200'))
+FETCH_PER_HOST_LIMIT = int(os.getenv('FETCH_PER_HOST_LIMIT', '8'))
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(WORKERS)))
+CRAWL_CONCURRENCY = int(os.getenv('CRAWL_CONCURRENCY', '16'))
+CRAWL_DEPTH_DEFAULT = int(os.getenv('CRAWL_DEPTH_DEFAULT', '1'))
+CRAWL_TIME_LIMIT = float(os.getenv('CRAWL_TIME_LIMIT', '240'))
+TEXT_SCAN_DEFAULT = os.getenv('TEXT_SCAN_DEFAULT', 'true').lower() == 'true'
+PHONE_DEFAULT_REGION = os.getenv('PHONE_DEFAULT_REGION', 'US').upper()
+PHONE_FORMAT = os.getenv('PHONE_FORMAT', 'e164').lower()
+PHONE_CACHE_SIZE = int(os.getenv('PHONE_CACHE_SIZE', '50000'))
+LINK_RULES_PATH = os.getenv('LINK_RULES_PATH', '')
+ROBOTS_ENABLED = os.getenv('ROBOTS_ENABLED', 'true').lower() == 'true'
+ROBOTS_CACHE_TTL = int(os.getenv('ROBOTS_CACHE_TTL', '3600'))
+ROBOTS_MAX_CRAWL_DELAY = float(os.getenv('ROBOTS_MAX_CRAWL_DELAY', '5'))
+SITEMAP_DEFAULT = os.getenv('SITEMAP_DEFAULT', 'true').lower() == 'true'
+SITEMAP_MAX_URLS = int(os.getenv('SITEMAP_MAX_URLS', '5000'))
+SITEMAP_MAX_FILES = int(os.getenv('SITEMAP_MAX_FILES', '10'))
+MAX_PAGE_SIZE_MB = float(os.getenv('MAX_PAGE_SIZE_MB', '5'))
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+PAGE_CACHE_DIR = os.getenv('PAGE_CACHE_DIR', '/tmp/contact-scraper-cache')
+PAGE_CACHE_TTL = int(os.getenv('PAGE_CACHE_TTL', '3600'))
+PAGE_CACHE_MEMORY_ENTRIES = int(os.getenv('PAGE_CACHE_MEMORY_ENTRIES', '500'))
+PAGE_CACHE_MEMORY_MB = int(os.getenv('PAGE_CACHE_MEMORY_MB', '32'))
+PAGE_CACHE_DISK_ENTRIES = int(os.getenv('PAGE_CACHE_DISK_ENTRIES', '50000'))
+PAGE_CACHE_DISK_MB = int(os.getenv('PAGE_CACHE_DISK_MB', '512'))
+RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', '900'))
+RESULT_CACHE_ENTRIES = int(os.getenv('RESULT_CACHE_ENTRIES', '1000'))
+RESULT_CACHE_WAIT = float(os.getenv('RESULT_CACHE_WAIT', '20'))
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '8'))
+BATCH_PER_DOMAIN = int(os.getenv('BATCH_PER_DOMAIN', '1'))
+BATCH_MAX_URLS = int(os.getenv('BATCH_MAX_URLS', '500'))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', '/tmp/contact-scraper-jobs/jobs.sqlite3')
+JOB_RETENTION = int(os.getenv('JOB_RETENTION', '86400'))
+JOB_STALE_AFTER = float(os.getenv('JOB_STALE_AFTER', '60'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+METRICS_DIR = os.getenv('METRICS_DIR', '/tmp/contact-scraper-metrics')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+TIMINGS_TOP_URLS = int(os.getenv('TIMINGS_TOP_URLS', '10'))
+TRACE_DIR = os.getenv('TRACE_DIR', '')
 SCRIPT_VERSION = "V 1.9 / Docker Ready"
 
 def configure_logging():
@@ -22,6 +70,32 @@ logger = configure_logging()
 def configure_app(app):
     app.config['WORKERS'] = WORKERS
     app.config['REQUEST_TIMEOUT'] = REQUEST_TIMEOUT
+    app.config['HEALTH_SAMPLE_INTERVAL'] = HEALTH_SAMPLE_INTERVAL
     app.config['MAX_LINKS_DEFAULT'] = MAX_LINKS_DEFAULT
+    app.config['CONNECT_TIMEOUT'] = CONNECT_TIMEOUT
+    app.config['FETCH_CONCURRENCY'] = FETCH_CONCURRENCY
+    app.config['FETCH_PER_HOST_LIMIT'] = FETCH_PER_HOST_LIMIT
+    app.config['PARSE_WORKERS'] = PARSE_WORKERS
+    app.config['CRAWL_CONCURRENCY'] = CRAWL_CONCURRENCY
+    app.config['CRAWL_DEPTH_DEFAULT'] = CRAWL_DEPTH_DEFAULT
+    app.config['CRAWL_TIME_LIMIT'] = CRAWL_TIME_LIMIT
+    app.config['TEXT_SCAN_DEFAULT'] = TEXT_SCAN_DEFAULT
+    app.config['PHONE_DEFAULT_REGION'] = PHONE_DEFAULT_REGION
+    app.config['PHONE_FORMAT'] = PHONE_FORMAT
+    app.config['LINK_RULES_PATH'] = LINK_RULES_PATH
+    app.config['ROBOTS_ENABLED'] = ROBOTS_ENABLED
+    app.config['SITEMAP_DEFAULT'] = SITEMAP_DEFAULT
+    app.config['SITEMAP_MAX_URLS'] = SITEMAP_MAX_URLS
+    app.config['MAX_PAGE_SIZE_MB'] = MAX_PAGE_SIZE_MB
+    app.config['PAGE_CACHE_ENABLED'] = PAGE_CACHE_ENABLED
+    app.config['PAGE_CACHE_TTL'] = PAGE_CACHE_TTL
+    app.config['RESULT_CACHE_ENABLED'] = RESULT_CACHE_ENABLED
+    app.config['RESULT_CACHE_TTL'] = RESULT_CACHE_TTL
+    app.config['BATCH_CONCURRENCY'] = BATCH_CONCURRENCY
+    app.config['BATCH_MAX_URLS'] = BATCH_MAX_URLS
+    app.config['JOB_WORKERS'] = JOB_WORKERS
+    app.config['JOB_QUEUE_PATH'] = JOB_QUEUE_PATH
+    app.config['METRICS_DIR'] = METRICS_DIR
+    app.config['TRACE_DIR'] = TRACE_DIR
     app.config['SCRIPT_VERSION'] = SCRIPT_VERSION
     return app
\ No newline at end of file
@@ -1,6 +1,8 @@
+import json
 import uuid
 import time
-from utils.analyzers.link_classifier import classify_links
+from utils.analyzers.link_classifier import get_link_classifier, split_url
+from utils.tracing import span
 
 def format_execution_time(start_time):
     execution_time = time.time() - start_time
@@ -12,17 +14,39 @@ def format_scraping_response(
     url,
     root_domain,
     visited_links,
+    parsed_links=None,
     emails={},
     phones={},
     social_links={},
+    social_profiles=None,
     include_emails=True,
     include_phones=True,
     include_social_links=True,
     include_unique_links=True,
-    start_time=None
+    start_time=None,
+    truncated_pages=None,
+    skipped_pages=None,
+    trace=None
 ):
     execution_time_str = format_execution_time(start_time) if start_time else "N/A"
     links_analysed_count = f"{len(visited_links)} links"
+    unique_links = {
+        "Home": [],
+        "Pages": [],
+        "Policies": [],
+        "Blogs": [],
+        "Collections": [],
+        "Products": [],
+        "Others": []
+    }
+    if include_unique_links:
+        with span(trace, 'classify_links', links=len(visited_links)):
+            # (url, hôte, chemin) déjà découpés par le crawler, les autres URLs sont découpées ici
+            parsed_links = parsed_links or {}
+            unique_links = get_link_classifier().classify_parsed(
+                (parsed_links.get(link) or (link, *split_url(link)) for link in sorted(visited_links)),
+                root_domain
+            )
 
     return {
         "request_id": str(uuid.uuid4()),
@@ -31,20 +55,17 @@ def format_scraping_response(
         "root_domain": root_domain,
         "query": url,
         "status": "OK",
+        # Pages coupées à MAX_PAGE_SIZE_MB, et pages non analysées (type de contenu)
+        "truncated_pages": truncated_pages or [],
+        "skipped_pages": skipped_pages or [],
         "data": [
             {
                 "emails": [{"value": email, "sources": sources} for email, sources in emails.items()] if include_emails else [],
                 "phone_numbers": [{"value": phone, "sources": sources} for phone, sources in phones.items()] if include_phones else [],
                 "social_links": social_links if include_social_links else {},
-                "unique_links": classify_links(sorted(list(visited_links)), root_domain) if include_unique_links else {
-                    "Home": [],
-                    "Pages": [],
-                    "Policies": [],
-                    "Blogs": [],
-                    "Collections": [],
-                    "Products": [],
-                    "Others": []
-                }
+                # Tous les profils trouvés par plateforme, le plus probable en premier
+                "social_profiles": (social_profiles or {}) if include_social_links else {},
+                "unique_links": unique_links
             }
         ]
     }
@@ -54,3 +75,14 @@ def format_error_response(error_message, status="ERROR"):
         "error": str(error_message),
         "status": status
     }
+
+def format_stream_event(event, data, stream_format="ndjson"):
+    """
+    Sérialise un événement de /scrape en flux : une ligne JSON (ndjson) ou un
+    message Server-Sent Events (sse). Le keepalive n'est émis qu'en SSE.
+    """
+    if event == "keepalive":
+        return ": keepalive\n\n" if stream_format == "sse" else ""
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, "data": data}) + "\n"
@@ -0,0 +1,9 @@
+"""
+Configuration gunicorn, chargée automatiquement depuis le dossier de lancement
+(les options de la ligne de commande du Dockerfile restent prioritaires).
+"""
+
+def post_worker_init(worker):
+    # Threads d'arrière-plan démarrés dans chaque worker, après le fork
+    from main import start_background_services
+    start_background_services()
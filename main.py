@@ -2,14 +2,31 @@ import os
 from flask import Flask
 from config.settings import configure_app, logger, SCRIPT_VERSION, WORKERS, REQUEST_TIMEOUT, MAX_LINKS_DEFAULT
 from api.routes import register_routes
+from services.job_queue import get_job_queue
+from utils.scrapers.health_checker import get_health_sampler
+from utils.metrics import get_metrics_registry
 
 # Create the Flask application instance
 app = Flask(__name__)
 configure_app(app)
 register_routes(app)
 
+def start_background_services():
+    """
+    Démarre les threads d'arrière-plan du processus : appelée par gunicorn dans chaque
+    worker (post_worker_init, voir gunicorn.conf.py) ou par le serveur de développement,
+    jamais à l'import du module.
+    """
+    # Workers de jobs (reprend les jobs en file après un redémarrage)
+    get_job_queue()
+    # Sonde de santé en arrière-plan : /livez et /readyz répondent depuis son instantané
+    get_health_sampler()
+    # Métriques du worker écrites périodiquement dans METRICS_DIR pour /metrics
+    get_metrics_registry()
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', '5000'))
     logger.info(f"Starting script version: {SCRIPT_VERSION}")
     logger.info(f"Workers: {WORKERS}, Timeout: {REQUEST_TIMEOUT}s, Max Links: {MAX_LINKS_DEFAULT}")
+    start_background_services()
     app.run(host='0.0.0.0', port=port)
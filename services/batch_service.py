@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+from config.settings import BATCH_CONCURRENCY, BATCH_PER_DOMAIN, BATCH_MAX_URLS, logger
+from services.scrape_pipeline import ScrapeError, ResultPending, parse_scrape_options, cached_scrape
+from formatters.response_formatter import format_error_response, format_execution_time
+
+def parse_batch_request(payload, max_urls=BATCH_MAX_URLS):
+    """
+    Valide le corps JSON de /scrape/batch :
+        {"urls": ["https://a.com", {"url": "https://b.com", "max_link": 20}], "options": {...}}
+    Les options d'une URL complètent les options communes.
+    Retourne une liste de (url, options). Lève ValueError si le corps est invalide.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('urls'), list):
+        raise ValueError("Body must be a JSON object with a 'urls' list")
+    urls = payload['urls']
+    if not urls:
+        raise ValueError("'urls' is empty")
+    if len(urls) > max_urls:
+        raise ValueError(f"Too many URLs ({len(urls)}), the maximum is {max_urls}")
+    defaults = payload.get('options') or {}
+    if not isinstance(defaults, dict):
+        raise ValueError("'options' must be a JSON object")
+
+    items = []
+    for index, entry in enumerate(urls):
+        args = dict(defaults)
+        if isinstance(entry, dict):
+            args.update(entry)
+        else:
+            args['url'] = entry
+        url = args.get('url')
+        if not url or not isinstance(url, str):
+            raise ValueError(f"urls[{index}]: URL is required")
+        try:
+            items.append((url, parse_scrape_options(args)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"urls[{index}]: {str(e)}") from e
+    return items
+
+def domain_key(url):
+    """
+    Clé d'équité du batch : l'hôte sans "www.".
+    """
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+def _scrape_item(url, options):
+    start_time = time.time()
+    try:
+        return {"status": "OK", "result": cached_scrape(url, options, start_time)}
+    except ResultPending as e:
+        return format_error_response(str(e), status="PENDING")
+    except ScrapeError as e:
+        return format_error_response(str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error processing URL {url} in batch: {str(e)}")
+        return format_error_response(f"An unexpected error occurred: {str(e)}")
+
+def run_batch(items, concurrency=BATCH_CONCURRENCY, per_domain=BATCH_PER_DOMAIN):
+    """
+    Scrape une liste de (url, options) et produit un dict par URL dès qu'elle est terminée,
+    puis un résumé final. Chaque URL passe par le même pipeline (et le même cache) que /scrape.
+    - concurrency: nombre max de scrapings simultanés pour tout le batch
+    - per_domain: nombre max de scrapings simultanés d'un même domaine ; les domaines
+      sont servis à tour de rôle pour qu'un gros domaine ne monopolise pas le batch
+    """
+    start_time = time.time()
+    queues = OrderedDict()
+    for index, (url, options) in enumerate(items):
+        queues.setdefault(domain_key(url), deque()).append((index, url, options))
+
+    running = {}
+    active = {domain: 0 for domain in queues}
+    errors = 0
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='batch')
+
+    def dispatch():
+        # Tour de rôle : une URL par domaine éligible et par passage
+        progress = True
+        while progress and len(running) < concurrency:
+            progress = False
+            for domain in list(queues):
+                if len(running) >= concurrency:
+                    break
+                if active[domain] >= per_domain:
+                    continue
+                index, url, options = queues[domain].popleft()
+                if not queues[domain]:
+                    del queues[domain]
+                else:
+                    # Le domaine repasse en fin de tour
+                    queues.move_to_end(domain)
+                active[domain] += 1
+                running[executor.submit(_scrape_item, url, options)] = (index, url, domain)
+                progress = True
+
+    logger.info(f"Starting batch of {len(items)} URLs over {len(queues)} domains")
+    try:
+        dispatch()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, url, domain = running.pop(future)
+                active[domain] -= 1
+                line = {"index": index, "url": url, **future.result()}
+                errors += line["status"] == "ERROR"
+                yield line
+            dispatch()
+    finally:
+        # Client déconnecté : les URLs pas encore lancées sont abandonnées
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    logger.info(f"Completed batch of {len(items)} URLs with {errors} errors")
+    yield {
+        "done": True,
+        "total": len(items),
+        "errors": errors,
+        "execution_time": format_execution_time(start_time)
+    }
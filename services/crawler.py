@@ -0,0 +1,228 @@
+import asyncio
+import heapq
+import time
+import requests
+from functools import partial
+from config.settings import CRAWL_CONCURRENCY, PHONE_DEFAULT_REGION, logger
+from utils.analyzers.link_analyzer import analyze_page
+from utils.analyzers.link_scorer import link_priority
+from utils.extractors.link_explorer import canonical_parts, is_same_domain
+from utils.extractors.social_links import extract_social_links
+from utils.scrapers.link_scraper import is_valid_url
+from utils.metrics import ERRORS
+from utils.tracing import span
+
+STOP_FIELDS = ('emails', 'phones', 'social_links')
+ANALYSIS_ERRORS = ERRORS.labels('analysis')
+
+class StopCondition:
+    """
+    Condition d'arrêt anticipé du crawl : au moins min_results valeurs distinctes
+    pour chacun des champs demandés (emails, phones, social_links).
+    """
+    def __init__(self, fields, min_results=1):
+        unknown = set(fields) - set(STOP_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown stop_when fields: {', '.join(sorted(unknown))}")
+        self.fields = tuple(fields)
+        self.min_results = max(1, min_results)
+        self.emails = set()
+        self.phones = set()
+        self.social_platforms = set()
+
+    def update(self, emails=None, phones=None, links=None):
+        """
+        Ajoute les résultats d'une page. Retourne True si la condition est remplie.
+        """
+        if emails:
+            self.emails.update(emails)
+        if phones:
+            self.phones.update(phones)
+        if links and 'social_links' in self.fields:
+            found = extract_social_links(list(links))
+            self.social_platforms.update(platform for platform, link in found.items() if link)
+        return self.satisfied()
+
+    def satisfied(self):
+        counts = {
+            'emails': len(self.emails),
+            'phones': len(self.phones),
+            'social_links': len(self.social_platforms),
+        }
+        return all(counts[field] >= self.min_results for field in self.fields)
+
+class Crawler:
+    """
+    Crawler en largeur (BFS) au-dessus du moteur de crawl.
+
+    - frontier: tas trié par (niveau, priorité, ordre de découverte)
+    - priority: fonction (url, contexte du lien) -> clé, plus petit = visité en premier.
+      Par défaut le score de link_scorer (pages contact, mentions légales... d'abord).
+      Les liens de départ gardent l'ordre fourni (déjà classés par link_scraper).
+    - seen: URLs canoniques déjà mises en file, conservées d'un niveau à l'autre
+    - parsed_links: {url: (url, hôte, chemin)} des URLs mises en file, découpées une
+      fois à la canonicalisation pour classify_parsed
+    - max_pages: budget total de pages analysées (max_link)
+    - time_limit: durée max en secondes, les fetchs en cours sont annulés à l'échéance
+    - stop_condition: StopCondition optionnelle, le crawl s'arrête dès qu'elle est remplie
+    - on_page: fonction (url, emails, phones, liens) appelée après chaque page analysée,
+      depuis la boucle du moteur : elle doit rester rapide
+    - text_scan: scan complet du texte visible des pages (voir analyze_page)
+    - country_code: région par défaut des numéros de téléphone du site
+    - robots: RobotsRules optionnelles du site : les URLs interdites ne sont pas mises en file
+      et les téléchargements sont espacés de leur crawl_delay
+    """
+    def __init__(self, store, domain, depth=1, max_pages=None, time_limit=None,
+                 concurrency=CRAWL_CONCURRENCY, priority=None, stop_condition=None, on_page=None,
+                 text_scan=True, country_code=PHONE_DEFAULT_REGION, robots=None):
+        self.store = store
+        self.domain = domain
+        self.depth = max(1, depth)
+        self.max_pages = max_pages
+        self.time_limit = time_limit
+        self.concurrency = max(1, concurrency)
+        self.priority = priority or partial(link_priority, root_domain=domain)
+        self.stop_condition = stop_condition
+        self.on_page = on_page
+        self.text_scan = text_scan
+        self.country_code = country_code
+        self.robots = robots
+
+        self.frontier = []
+        self.seen = set()
+        self.parsed_links = {}
+        self.results = []
+        self.visited = []
+        self.discovered_links = set()
+        self.dispatched = 0
+        self.stop_reason = None
+        self._counter = 0
+        self._next_fetch = 0
+
+    def add(self, url, level, check_domain=True, context=None, priority=None):
+        """
+        Met une URL en file si elle est nouvelle, valide et (sauf seed) du même domaine.
+        """
+        if not url or not is_valid_url(url):
+            return False
+        if check_domain and not is_same_domain(url, self.domain):
+            return False
+        key, host, path = canonical_parts(url)
+        if key in self.seen:
+            return False
+        # Les pages déjà téléchargées (page de départ) restent analysables
+        if self.robots and key not in self.store and not self.robots.can_fetch(url):
+            return False
+        self.seen.add(key)
+        self.parsed_links[url] = (url, host, path)
+        self._counter += 1
+        if priority is None:
+            priority = self.priority(url, context)
+        heapq.heappush(self.frontier, (level, priority, self._counter, url))
+        return True
+
+    def budget_left(self):
+        if not self.max_pages or self.max_pages <= 0:
+            return len(self.frontier)
+        return self.max_pages - self.dispatched
+
+    async def run(self, links):
+        """
+        Explore les liens de départ puis, niveau par niveau, les liens découverts.
+        Retourne les résultats au format de analyze_links: (emails, phones, visited_links).
+        """
+        self.store.engine.crawls_in_flight += 1
+        try:
+            return await self._run(links)
+        finally:
+            self.store.engine.crawls_in_flight -= 1
+
+    async def _run(self, links):
+        for position, link in enumerate(links):
+            self.add(link, 1, check_domain=False, priority=position)
+
+        deadline = time.monotonic() + self.time_limit if self.time_limit else None
+        pending = set()
+
+        while self.frontier or pending:
+            if self.stop_condition and self.stop_condition.satisfied():
+                self.stop_reason = 'stop_condition'
+                await self._cancel(pending)
+                pending = set()
+                break
+
+            while self.frontier and len(pending) < self.concurrency and self.budget_left() > 0:
+                level, _, _, url = heapq.heappop(self.frontier)
+                pending.add(asyncio.ensure_future(self._visit(url, level)))
+                self.dispatched += 1
+
+            if not pending:
+                break
+
+            timeout = max(0, deadline - time.monotonic()) if deadline else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                self._collect(*task.result())
+
+            if deadline and time.monotonic() >= deadline and (pending or self.frontier):
+                self.stop_reason = 'time_limit'
+                await self._cancel(pending)
+                pending = set()
+                break
+
+        if self.stop_reason is None and self.frontier and self.budget_left() <= 0:
+            self.stop_reason = 'budget'
+        if self.stop_reason:
+            logger.info(f"Crawl stopped early ({self.stop_reason}) after {len(self.visited)} pages, {len(self.frontier)} left in frontier")
+        return self.results
+
+    async def _visit(self, url, level):
+        logger.info(f"Analyzing link: {url} (depth {level})")
+        try:
+            trace = self.store.trace
+            with span(trace, 'crawl_delay', url=url):
+                await self._throttle(url)
+            page = await self.store.fetch(url)
+            # Attente dans le pool CPU comprise
+            with span(trace, 'analyze_page', url=url, depth=level):
+                emails, phones, links = await self.store.engine.run_cpu(
+                    analyze_page, page, url, True, self.text_scan, self.country_code, trace
+                )
+            return url, level, emails, phones, links
+        except requests.RequestException as e:
+            logger.error(f"Failed to process link {url}: {e}")
+        except Exception as e:
+            ANALYSIS_ERRORS.inc()
+            logger.error(f"Unexpected error analyzing {url}: {str(e)}")
+        return url, level, {}, {}, {}
+
+    async def _throttle(self, url):
+        # Crawl-delay : les téléchargements démarrent à crawl_delay secondes d'intervalle
+        if not self.robots or not self.robots.crawl_delay or url in self.store:
+            return
+        now = time.monotonic()
+        start = max(now, self._next_fetch)
+        self._next_fetch = start + self.robots.crawl_delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def _collect(self, url, level, emails, phones, links):
+        self.visited.append(url)
+        self.results.append((emails, phones, {url}))
+        self.discovered_links.update(links)
+        if self.stop_condition:
+            self.stop_condition.update(emails, phones, links)
+        if self.on_page:
+            try:
+                self.on_page(url, emails, phones, links)
+            except Exception as e:
+                logger.error(f"Page callback failed for {url}: {str(e)}")
+        if level < self.depth:
+            for link, context in links.items():
+                self.add(link, level + 1, context=context)
+
+    async def _cancel(self, pending):
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self.store.cancel_pending()
@@ -1,11 +1,16 @@
-import requests
 from urllib.parse import urlparse
-from config.settings import REQUEST_TIMEOUT, logger
+from config.settings import logger
+from utils.scrapers.page_store import PageStore
 
-def get_root_domain(url, headers):
+def get_root_domain(url, headers, store=None):
+    """
+    Domaine final de l'URL après redirections.
+    Réutilise la page du PageStore de la requête si elle a déjà été téléchargée.
+    """
     try:
-        response = requests.get(url, headers=headers, allow_redirects=True, timeout=REQUEST_TIMEOUT)
-        final_url = response.url
+        if store is None:
+            store = PageStore(headers)
+        final_url = store.get(url).final_url
         return urlparse(final_url).netloc
     except Exception as e:
         logger.error(f"Error getting root domain for {url}: {str(e)}")
@@ -0,0 +1,260 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from config.settings import (
+    JOB_WORKERS, JOB_QUEUE_PATH, JOB_RETENTION, JOB_STALE_AFTER, JOB_MAX_ATTEMPTS, CRAWL_TIME_LIMIT, logger
+)
+from services.scrape_pipeline import ScrapeError, cached_scrape
+from utils.metrics import RETRIES
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+JOB_RETRIES = RETRIES.labels('job')
+
+class JobQueue:
+    """
+    File de jobs de scraping persistée dans SQLite (mode WAL), partagée par les
+    workers gunicorn et conservée après un redémarrage.
+    Un job "running" dont le heartbeat est plus vieux que stale_after est remis en
+    file (worker tué, redéploiement...), au plus max_attempts fois.
+    """
+    def __init__(self, path, retention=JOB_RETENTION, stale_after=JOB_STALE_AFTER, max_attempts=JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.retention = retention
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                url TEXT,
+                options TEXT,
+                status TEXT,
+                attempts INTEGER DEFAULT 0,
+                owner TEXT,
+                pages INTEGER DEFAULT 0,
+                budget INTEGER,
+                result TEXT,
+                error TEXT,
+                created_at REAL,
+                started_at REAL,
+                finished_at REAL,
+                heartbeat_at REAL
+            )
+        """)
+        self._connection().execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def enqueue(self, url, options):
+        job_id = str(uuid.uuid4())
+        self._connection().execute(
+            "INSERT INTO jobs (id, url, options, status, budget, created_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, url, json.dumps(options), options.get("max_link"), time.time())
+        )
+        return job_id
+
+    def claim(self, owner):
+        """
+        Prend le plus ancien job en file. Retourne (id, url, options) ou None.
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT id, url, options FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, attempts = attempts + 1, "
+                    "started_at = ?, heartbeat_at = ?, pages = 0 WHERE id = ?",
+                    (owner, now, now, row["id"])
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return row["id"], row["url"], json.loads(row["options"])
+
+    def progress(self, pages, owner):
+        """
+        Enregistre l'avancement {job_id: pages} des jobs en cours, qui sert aussi de heartbeat.
+        """
+        now = time.time()
+        self._connection().executemany(
+            "UPDATE jobs SET pages = ?, heartbeat_at = ? WHERE id = ? AND owner = ? AND status = 'running'",
+            [(count, now, job_id, owner) for job_id, count in pages.items()]
+        )
+
+    def finish(self, job_id, owner, pages, result=None, error=None):
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, pages = ?, result = ?, error = ?, finished_at = ? "
+            "WHERE id = ? AND owner = ? AND status = 'running'",
+            ('failed' if error else 'done', pages, json.dumps(result) if result is not None else None,
+             error, time.time(), job_id, owner)
+        )
+
+    def recover(self):
+        """
+        Remet en file les jobs abandonnés et purge les jobs terminés trop anciens.
+        """
+        now = time.time()
+        connection = self._connection()
+        stale = now - self.stale_after
+        connection.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Job abandoned too many times', finished_at = ? "
+            "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+            (now, stale, self.max_attempts)
+        )
+        requeued = connection.execute(
+            "UPDATE jobs SET status = 'queued', owner = NULL WHERE status = 'running' AND heartbeat_at < ?",
+            (stale,)
+        ).rowcount
+        if requeued:
+            logger.warning(f"Requeued {requeued} abandoned jobs")
+            JOB_RETRIES.inc(requeued)
+        connection.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (now - self.retention,)
+        )
+
+    def get(self, job_id):
+        """
+        État public d'un job, ou None s'il est inconnu.
+        """
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "url": row["url"],
+            "status": row["status"],
+            "progress": {"pages": row["pages"], "budget": row["budget"]},
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+        }
+
+    def counts(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: 0 for status in JOB_STATUSES} | {row[0]: row[1] for row in rows}
+
+class JobWorkerPool:
+    """
+    Threads qui exécutent les jobs de la file, hors des workers HTTP.
+    La durée d'un crawl ne bloque donc plus ni gunicorn ni /health.
+    """
+    POLL_INTERVAL = 1.0
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(self, queue, workers=JOB_WORKERS):
+        self.queue = queue
+        self.workers = workers
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._pid = os.getpid()
+        self._running = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'job-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._maintain, name='job-heartbeat', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        logger.info(f"Job worker pool started with {self.workers} workers")
+
+    def stop(self):
+        self._stop.set()
+
+    def _maintain(self):
+        # Avancement / heartbeat des jobs en cours, et reprise des jobs abandonnés par d'autres workers
+        last_recover = 0.0
+        while not self._stop.wait(self.PROGRESS_INTERVAL):
+            try:
+                with self._lock:
+                    running = dict(self._running)
+                if running:
+                    self.queue.progress(running, self.owner)
+                if time.monotonic() - last_recover >= self.queue.stale_after / 3:
+                    last_recover = time.monotonic()
+                    self.queue.recover()
+            except sqlite3.Error as e:
+                logger.error(f"Job queue maintenance failed: {str(e)}")
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(self.owner)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to claim a job: {str(e)}")
+                job = None
+            if job is None:
+                self._stop.wait(self.POLL_INTERVAL)
+                continue
+            self._execute(*job)
+
+    def _execute(self, job_id, url, options):
+        with self._lock:
+            self._running[job_id] = 0
+        logger.info(f"Starting job {job_id} for URL: {url}")
+
+        def on_page(page_url, emails, phones, links):
+            with self._lock:
+                self._running[job_id] += 1
+
+        result, error = None, None
+        try:
+            # Hors requête HTTP : un job attend un scraping identique jusqu'à l'expiration de son bail
+            result = cached_scrape(url, options, on_page=on_page, wait=CRAWL_TIME_LIMIT + 60)
+            logger.info(f"Completed job {job_id}")
+        except ScrapeError as e:
+            error = str(e)
+        except Exception as e:
+            logger.error(f"Unexpected error in job {job_id}: {str(e)}")
+            error = f"An unexpected error occurred: {str(e)}"
+        finally:
+            with self._lock:
+                pages = self._running.pop(job_id, 0)
+        try:
+            self.queue.finish(job_id, self.owner, pages, result=result, error=error)
+        except sqlite3.Error as e:
+            # Le job sera repris par recover() une fois son heartbeat expiré
+            logger.error(f"Failed to record the end of job {job_id}: {str(e)}")
+
+_queue = None
+_pool = None
+_jobs_lock = threading.Lock()
+
+def get_job_queue():
+    """
+    File de jobs du processus ; le pool de workers est (re)démarré après un fork de gunicorn.
+    """
+    global _queue, _pool
+    if _pool is None or _pool._pid != os.getpid():
+        with _jobs_lock:
+            if _pool is None or _pool._pid != os.getpid():
+                os.makedirs(os.path.dirname(JOB_QUEUE_PATH) or '.', exist_ok=True)
+                _queue = JobQueue(JOB_QUEUE_PATH)
+                _queue.recover()
+                _pool = JobWorkerPool(_queue)
+                if JOB_WORKERS > 0:
+                    _pool.start()
+    return _queue
@@ -0,0 +1,270 @@
+import json
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from config.settings import (
+    RESULT_CACHE_ENABLED, RESULT_CACHE_TTL, RESULT_CACHE_ENTRIES, RESULT_CACHE_WAIT,
+    PAGE_CACHE_DIR, CRAWL_TIME_LIMIT, logger
+)
+from utils.metrics import CACHE_EVENTS
+
+# Durée du bail au-delà du time_limit du crawl : page de départ, sitemaps, mise en forme
+LEASE_MARGIN = 60
+
+RESULT_CACHE_EVENTS = {name: CACHE_EVENTS.labels('result', name) for name in ("hits", "misses", "coalesced", "refreshes")}
+
+class ResultPending(Exception):
+    """
+    Un scraping identique est toujours en cours après le délai d'attente :
+    l'appelant peut réessayer dans retry_after secondes.
+    """
+    def __init__(self, key, retry_after):
+        super().__init__(f"An identical scrape is still running, retry in {retry_after}s")
+        self.key = key
+        self.retry_after = retry_after
+
+class ResultCache:
+    """
+    Cache des réponses /scrape complètes, avec regroupement des requêtes identiques.
+
+    - Niveau mémoire (LRU, borné) puis SQLite partagé entre les workers gunicorn.
+    - Une seule exécution par clé à la fois : dans un même processus les appelants
+      attendent le même Future ; entre processus, une ligne "inflight" fait office
+      de bail (lease) et les autres workers attendent le résultat en base. Le bail
+      doit couvrir toute l'exécution : passé son expiration, un autre worker relance
+      le même calcul.
+    - L'attente est bornée (wait secondes) : au-delà, ResultPending est levée plutôt
+      que de bloquer un worker pendant tout le scraping d'un autre.
+    """
+    POLL_INTERVAL = 0.25
+
+    def __init__(self, path=None, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_ENTRIES,
+                 lease=CRAWL_TIME_LIMIT + LEASE_MARGIN, wait=RESULT_CACHE_WAIT):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lease = lease
+        self.wait = wait
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0}
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if path:
+            connection = self._connection()
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT,
+                    created_at REAL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS inflight (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT,
+                    expires_at REAL
+                )
+            """)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+        RESULT_CACHE_EVENTS[name].inc()
+
+    def get(self, key, max_age=None):
+        """
+        Résultat en cache s'il a moins de min(ttl, max_age) secondes, sinon None.
+        """
+        limit = self.ttl if max_age is None else min(self.ttl, max_age)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+        if cached is None and self.path:
+            row = self._connection().execute(
+                "SELECT payload, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                cached = (json.loads(row[0]), row[1])
+                self._remember(key, *cached)
+        if cached is not None and time.time() - cached[1] <= limit:
+            return cached[0]
+        return None
+
+    def put(self, key, result):
+        created_at = time.time()
+        self._remember(key, result, created_at)
+        if self.path:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (key, json.dumps(result), created_at)
+            )
+            connection.execute(
+                "DELETE FROM results WHERE created_at < ? OR key IN "
+                "(SELECT key FROM results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (created_at - self.ttl, self.max_entries)
+            )
+
+    def _remember(self, key, result, created_at):
+        with self._lock:
+            self._memory[key] = (result, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get_or_run(self, key, func, refresh=False, max_age=None, wait=None, lease=None):
+        """
+        Retourne (résultat, statut) avec statut 'hit', 'coalesced' ou 'miss'.
+        refresh=True ignore le cache mais rejoint un calcul déjà en cours.
+        wait borne l'attente d'un calcul en cours (self.wait par défaut) ; au-delà,
+        ResultPending est levée.
+        lease: durée max de func en secondes, bail pris entre processus (self.lease par défaut).
+        Les exceptions de func sont propagées à tous les appelants regroupés ; les
+        erreurs ne sont pas mises en cache.
+        """
+        wait = self.wait if wait is None else wait
+        if refresh:
+            self._count("refreshes")
+        else:
+            cached = self.get(key, max_age)
+            if cached is not None:
+                self._count("hits")
+                return cached, 'hit'
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            try:
+                result = future.result(timeout=wait)
+            except FutureTimeout:
+                raise ResultPending(key, self._retry_after(wait)) from None
+            self._count("coalesced")
+            return result, 'coalesced'
+
+        try:
+            result, status = self._run_shared(key, func, refresh, max_age, wait, lease or self.lease)
+            future.set_result(result)
+            return result, status
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _run_shared(self, key, func, refresh, max_age, wait, lease):
+        """
+        Coordination entre processus : le premier worker prend le bail, les autres
+        attendent que le résultat apparaisse en base (au plus wait secondes).
+        """
+        if not self.path:
+            self._count("misses")
+            result = func()
+            self.put(key, result)
+            return result, 'miss'
+
+        started = time.time()
+        token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        connection = self._connection()
+        while True:
+            now = time.time()
+            connection.execute("DELETE FROM inflight WHERE key = ? AND expires_at < ?", (key, now))
+            self._release_dead_owner(connection, key)
+            acquired = connection.execute(
+                "INSERT OR IGNORE INTO inflight VALUES (?, ?, ?)", (key, token, now + lease)
+            ).rowcount == 1
+            if acquired:
+                break
+            if now - started >= wait:
+                logger.info(f"In-flight scrape {key} still running after {wait}s")
+                raise ResultPending(key, self._retry_after(wait))
+            time.sleep(min(self.POLL_INTERVAL, max(0.0, wait - (now - started))))
+            # Un autre worker a pu terminer entre-temps
+            cached = self.get(key, max_age if not refresh else time.time() - started)
+            if cached is not None:
+                self._count("coalesced")
+                return cached, 'coalesced'
+
+        try:
+            self._count("misses")
+            result = func()
+            self.put(key, result)
+            return result, 'miss'
+        finally:
+            connection.execute("DELETE FROM inflight WHERE key = ? AND owner = ?", (key, token))
+
+    @staticmethod
+    def _retry_after(wait):
+        return max(1, math.ceil(wait))
+
+    @staticmethod
+    def _release_dead_owner(connection, key):
+        """
+        Libère le bail d'un worker de la même machine qui n'existe plus (tué, redémarré)
+        sans attendre l'expiration du bail.
+        """
+        row = connection.execute("SELECT owner FROM inflight WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        host, _, rest = row[0].partition(':')
+        pid = rest.partition(':')[0]
+        if host != socket.gethostname() or not pid.isdigit():
+            return
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            connection.execute("DELETE FROM inflight WHERE key = ? AND owner = ?", (key, row[0]))
+        except PermissionError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            stats = {**self.counters, "memory_entries": len(self._memory), "inflight": len(self._inflight)}
+        if self.path:
+            stats["disk_entries"] = self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """
+    Cache de résultats du processus, ou None si RESULT_CACHE_ENABLED est désactivé.
+    """
+    global _cache
+    if not RESULT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = None
+                if PAGE_CACHE_DIR:
+                    try:
+                        os.makedirs(PAGE_CACHE_DIR, exist_ok=True)
+                        path = os.path.join(PAGE_CACHE_DIR, 'results.sqlite3')
+                        _cache = ResultCache(path)
+                    except (OSError, sqlite3.Error) as e:
+                        logger.warning(f"Shared result cache unavailable, memory only: {str(e)}")
+                if _cache is None:
+                    _cache = ResultCache()
+    return _cache
@@ -0,0 +1,233 @@
+import time
+import uuid
+from config.settings import (
+    MAX_LINKS_DEFAULT, CRAWL_DEPTH_DEFAULT, CRAWL_TIME_LIMIT, TEXT_SCAN_DEFAULT, ROBOTS_ENABLED, SITEMAP_DEFAULT,
+    TRACE_DIR, logger
+)
+from services.domain_service import get_root_domain
+from services.scraper_service import analyze_links_parallel, process_scraping_results
+from services.crawler import StopCondition
+from services.result_cache import LEASE_MARGIN, ResultPending, get_result_cache
+from formatters.response_formatter import format_scraping_response, format_execution_time
+from utils.extractors.link_explorer import canonicalize_url
+from utils.scrapers.link_scraper import link_scraper, is_valid_url
+from utils.scrapers.user_agent import get_user_agent_headers
+from utils.scrapers.page_store import PageStore
+from utils.scrapers.sitemap import discover_site
+from utils.extractors.phone_extractor import infer_phone_region
+from utils.extractors.social_links import best_social_links
+from utils.metrics import ERRORS
+from utils.tracing import Trace, span
+
+class ScrapeError(Exception):
+    """
+    Échec du scraping de la page de départ (URL invalide, site injoignable...).
+    """
+
+START_PAGE_ERRORS = ERRORS.labels('start_page')
+
+INCLUDE_FLAGS = ('include_emails', 'include_phones', 'include_social_links', 'include_unique_links')
+
+def _flag(args, name, default='true'):
+    return str(args.get(name, default)).lower() == 'true'
+
+def parse_scrape_options(args):
+    """
+    Construit les options de scraping depuis les paramètres de requête (ou un dict JSON).
+    Lève ValueError si un paramètre est invalide.
+    """
+    max_link = args.get('max_link')
+    depth = args.get('depth')
+    time_limit = args.get('time_limit')
+    # Âge max (secondes) des pages servies depuis le cache, 0 = toujours revalider
+    max_age = args.get('max_age')
+    # Arrêt anticipé : ex. stop_when=emails,phones&min_results=1
+    stop_when = args.get('stop_when') or ''
+    if isinstance(stop_when, str):
+        stop_when = [field.strip() for field in stop_when.split(',') if field.strip()]
+
+    options = {
+        **{flag: _flag(args, flag) for flag in INCLUDE_FLAGS},
+        "max_link": int(max_link) if max_link else MAX_LINKS_DEFAULT,
+        "depth": max(1, int(depth)) if depth else CRAWL_DEPTH_DEFAULT,
+        "time_limit": float(time_limit) if time_limit else CRAWL_TIME_LIMIT,
+        "max_age": float(max_age) if max_age not in (None, '') else None,
+        "stop_when": sorted(set(stop_when)),
+        "min_results": int(args.get('min_results') or 1),
+        # False : seulement mailto:/tel:, JSON-LD, emails Cloudflare et obfusqués (pas de scan du texte)
+        "text_scan": _flag(args, 'text_scan', 'true' if TEXT_SCAN_DEFAULT else 'false'),
+        # Liens des sitemaps du site en plus de ceux de la page de départ
+        "sitemap": _flag(args, 'sitemap', 'true' if SITEMAP_DEFAULT else 'false'),
+        # Ignore le résultat en cache (hors clé de cache)
+        "refresh": _flag(args, 'refresh', 'false'),
+        # Durée de chaque étape dans la réponse (scraping toujours exécuté, hors cache de résultats)
+        "timings": _flag(args, 'timings', 'false'),
+    }
+    if options["stop_when"]:
+        # Valide les champs dès maintenant
+        StopCondition(options["stop_when"], options["min_results"])
+    return options
+
+def scrape_cache_key(url, options):
+    """
+    Clé du cache de résultats : URL canonique et options qui influencent le résultat.
+    """
+    return '|'.join([
+        canonicalize_url(url),
+        ''.join('1' if options[flag] else '0' for flag in INCLUDE_FLAGS),
+        f"max_link={options['max_link']}",
+        f"depth={options['depth']}",
+        f"time_limit={options['time_limit']:g}",
+        f"stop_when={','.join(options['stop_when'])}:{options['min_results']}",
+        f"text_scan={int(options['text_scan'])}",
+        f"sitemap={int(options['sitemap'])}",
+    ])
+
+def run_scrape(url, options, start_time=None, on_page=None):
+    """
+    Pipeline complet d'un scraping : link_scraper -> analyze_links_parallel ->
+    process_scraping_results -> format_scraping_response.
+    on_page est appelée après chaque page analysée (voir Crawler).
+    Avec options["timings"], le résultat porte un champ "timings" (voir Trace.breakdown).
+    Lève ScrapeError si la page de départ ne peut pas être récupérée.
+    """
+    start_time = start_time or time.time()
+    trace = Trace() if options.get("timings") else None
+    headers = get_user_agent_headers()
+    include_emails = options["include_emails"]
+    include_phones = options["include_phones"]
+    include_social_links = options["include_social_links"]
+    include_unique_links = options["include_unique_links"]
+    max_link = options["max_link"]
+
+    stop_condition = None
+    if options["stop_when"]:
+        stop_condition = StopCondition(options["stop_when"], options["min_results"])
+
+    logger.info(f"Starting scrape for URL: {url} with max_link: {max_link}, depth: {options['depth']}")
+
+    # Chaque page n'est téléchargée et parsée qu'une fois pour toute la requête
+    store = PageStore(headers, max_age=options["max_age"], trace=trace)
+
+    robots, sitemap_links = None, []
+    if is_valid_url(url) and (ROBOTS_ENABLED or options["sitemap"]):
+        # robots.txt et sitemaps sont lus pendant le téléchargement de la page de départ
+        store.prefetch(url)
+        with span(trace, 'discover_site', url=url):
+            robots, sitemap_links = store.engine.run(discover_site(store, url, max_link, ROBOTS_ENABLED, options["sitemap"]))
+
+    # Récupérer les liens du domaine et tous les liens (sitemaps compris)
+    with span(trace, 'link_scraper', url=url):
+        domain_links, all_links, error = link_scraper(url, headers, max_link, store, sitemap_links, robots)
+    if error:
+        logger.error(f"Error scraping links: {error}")
+        START_PAGE_ERRORS.inc()
+        raise ScrapeError(error)
+
+    with span(trace, 'get_root_domain', url=url):
+        root_domain = get_root_domain(url, headers, store)
+    # Région des numéros écrits sans indicatif, déduite une fois pour tout le crawl
+    start_page = store.get(url)
+    with span(trace, 'infer_phone_region', url=url):
+        country_code = infer_phone_region(start_page.final_url, start_page.document)
+    logger.info(f"Phone region for {url}: {country_code}")
+    emails, phones, social_profiles = {}, {}, {}
+    visited_links = set()
+    parsed_links = {}
+
+    if include_unique_links and not (include_emails or include_phones or include_social_links):
+        # Si on veut uniquement les liens uniques, pas besoin d'analyse supplémentaire
+        valid_links = [link for link in domain_links if is_valid_url(link)]
+        visited_links.update(valid_links)
+    else:
+        if include_emails or include_phones or include_unique_links:
+            # Analyser seulement les liens du domaine pour les emails et téléphones
+            discovered_links = set(all_links)
+            if stop_condition:
+                stop_condition.update(links=all_links)
+            with span(trace, 'analyze_links_parallel', links=len(domain_links)):
+                results = analyze_links_parallel(
+                    domain_links, headers, root_domain, store,
+                    depth=options["depth"],
+                    max_pages=max_link,
+                    time_limit=options["time_limit"],
+                    discovered_links=discovered_links,
+                    stop_condition=stop_condition,
+                    on_page=on_page,
+                    text_scan=options["text_scan"],
+                    country_code=country_code,
+                    robots=robots,
+                    parsed_links=parsed_links
+                )
+            with span(trace, 'process_scraping_results', results=len(results)):
+                emails, phones, social_profiles, visited_links = process_scraping_results(
+                    results,
+                    domain_links,
+                    list(discovered_links),  # Tous les liens trouvés pour l'extraction des réseaux sociaux
+                    include_emails,
+                    include_phones,
+                    include_social_links,
+                    domain=root_domain,
+                    trace=trace
+                )
+
+    truncated_pages, skipped_pages = store.report()
+    result = format_scraping_response(
+        url=url,
+        root_domain=root_domain,
+        visited_links=visited_links,
+        parsed_links=parsed_links,
+        emails=emails,
+        phones=phones,
+        social_links=best_social_links(social_profiles),
+        social_profiles=social_profiles,
+        include_emails=include_emails,
+        include_phones=include_phones,
+        include_social_links=include_social_links,
+        include_unique_links=include_unique_links,
+        start_time=start_time,
+        truncated_pages=truncated_pages,
+        skipped_pages=skipped_pages,
+        trace=trace
+    )
+    if trace is not None:
+        result["timings"] = trace.breakdown()
+        if TRACE_DIR:
+            try:
+                result["timings"]["trace_file"] = trace.export(TRACE_DIR, result["request_id"])
+            except OSError as e:
+                logger.warning(f"Unable to write trace for {url}: {str(e)}")
+
+    logger.info(f"Completed scraping for URL: {url}")
+    return result
+
+def cached_scrape(url, options, start_time=None, on_page=None, wait=None):
+    """
+    run_scrape derrière le cache de résultats : les requêtes identiques simultanées
+    attendent le même scraping. Le résultat porte un champ "cache" (miss, hit, coalesced).
+    Lève ResultPending si le scraping identique dure plus de wait secondes
+    (RESULT_CACHE_WAIT par défaut).
+    """
+    start_time = start_time or time.time()
+    cache = get_result_cache()
+    if cache is None or options.get("timings"):
+        # timings=true mesure un vrai scraping : ni lu ni écrit dans le cache de résultats
+        return run_scrape(url, options, start_time, on_page)
+
+    result, cache_status = cache.get_or_run(
+        scrape_cache_key(url, options),
+        lambda: run_scrape(url, options, start_time, on_page),
+        refresh=options["refresh"],
+        max_age=options["max_age"],
+        wait=wait,
+        # Bail à la mesure du crawl demandé (time_limit sans plafond)
+        lease=options["time_limit"] + LEASE_MARGIN
+    )
+    if cache_status != 'miss':
+        logger.info(f"Result cache {cache_status} for URL: {url}")
+        result = {
+            **result,
+            "request_id": str(uuid.uuid4()),
+            "execution_time": format_execution_time(start_time)
+        }
+    return {**result, "cache": cache_status}
@@ -0,0 +1,105 @@
+import queue
+import threading
+import time
+from config.settings import logger
+from services.scrape_pipeline import ScrapeError, ResultPending, cached_scrape
+from formatters.response_formatter import format_error_response
+from utils.extractors.social_links import extract_social_links
+
+STREAM_FORMATS = ('ndjson', 'sse')
+KEEPALIVE_INTERVAL = 15
+
+_DONE = object()
+
+class _StreamState:
+    """
+    Valeurs déjà envoyées au client, pour n'émettre que les nouvelles.
+    """
+    def __init__(self, options):
+        self.options = options
+        self.pages = 0
+        self.emails = set()
+        self.phones = set()
+        self.platforms = set()
+
+    def page_events(self, url, emails, phones, links):
+        self.pages += 1
+        yield 'page', {"url": url, "pages": self.pages, "emails": len(emails), "phones": len(phones)}
+        if self.options["include_emails"]:
+            yield from self._new_values('email', self.emails, emails, url)
+        if self.options["include_phones"]:
+            yield from self._new_values('phone', self.phones, phones, url)
+        if self.options["include_social_links"] and links:
+            for platform, link in extract_social_links(list(links)).items():
+                if link and platform not in self.platforms:
+                    self.platforms.add(platform)
+                    yield 'social_link', {"platform": platform, "url": link}
+
+    def result_events(self, result):
+        # Valeurs absentes des événements de page (résultat servi depuis le cache)
+        data = result["data"][0]
+        for item in data["emails"]:
+            yield from self._new_values('email', self.emails, {item["value"]: item["sources"]})
+        for item in data["phone_numbers"]:
+            yield from self._new_values('phone', self.phones, {item["value"]: item["sources"]})
+        for platform, link in data["social_links"].items():
+            if link and platform not in self.platforms:
+                self.platforms.add(platform)
+                yield 'social_link', {"platform": platform, "url": link}
+
+    @staticmethod
+    def _new_values(event, seen, values, source=None):
+        for value, sources in values.items():
+            if value not in seen:
+                seen.add(value)
+                yield event, {"value": value, "source": source or (sources[0] if sources else None)}
+
+def stream_scrape(url, options, start_time=None):
+    """
+    Scraping en flux : produit des (événement, données) au fil du crawl.
+    - page: une page vient d'être analysée
+    - email / phone / social_link: première occurrence d'une valeur
+    - summary: réponse complète, identique à /scrape
+    - error: échec du scraping (même format que les erreurs de /scrape)
+    - keepalive: aucun événement depuis KEEPALIVE_INTERVAL secondes
+    Le scraping tourne dans un thread dédié ; les événements de page sont transmis
+    par une file pour ne pas ralentir la boucle du moteur.
+    Le résumé reste construit en entier : c'est aussi l'entrée du cache de résultats,
+    servie telle quelle aux requêtes identiques (en flux ou non).
+    """
+    start_time = start_time or time.time()
+    events = queue.Queue()
+
+    def on_page(page_url, emails, phones, links):
+        events.put((page_url, emails, phones, links))
+
+    def scrape():
+        try:
+            events.put(('summary', cached_scrape(url, options, start_time, on_page)))
+        except ResultPending as e:
+            events.put(('error', format_error_response(str(e), status="PENDING")))
+        except ScrapeError as e:
+            events.put(('error', format_error_response(str(e))))
+        except Exception as e:
+            logger.error(f"Unexpected error processing URL {url}: {str(e)}")
+            events.put(('error', format_error_response(f"An unexpected error occurred: {str(e)}")))
+        events.put(_DONE)
+
+    threading.Thread(target=scrape, name='scrape-stream', daemon=True).start()
+    state = _StreamState(options)
+
+    while True:
+        try:
+            item = events.get(timeout=KEEPALIVE_INTERVAL)
+        except queue.Empty:
+            yield 'keepalive', None
+            continue
+        if item is _DONE:
+            return
+        if len(item) == 4:
+            yield from state.page_events(*item)
+            continue
+        event, data = item
+        if event == 'summary':
+            yield from state.result_events(data)
+        yield event, data
@@ -1,14 +1,11 @@
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from config.settings import WORKERS, logger
-from utils.analyzers.link_analyzer import analyze_links
+from config.settings import CRAWL_TIME_LIMIT, PHONE_DEFAULT_REGION, logger
+from services.crawler import Crawler
 from utils.scrapers.link_scraper import is_valid_url
-from utils.extractors.social_links import extract_social_links
+from utils.scrapers.page_store import PageStore
+from utils.extractors.social_links import extract_social_profiles
+from utils.tracing import span
 
-def analyze_links_parallel(links, headers, domain):
-    """
-    Analyse les liens en parallèle en utilisant un pool de threads.
-    """
+def _prepare_links(links):
     if not links:
         logger.warning("No links to analyze")
         return []
@@ -16,32 +13,92 @@ def analyze_links_parallel(links, headers, domain):
     valid_links = [link for link in links if is_valid_url(link)]
     if not valid_links:
         logger.warning("No valid links found to analyze")
+    return valid_links
+
+def analyze_links_parallel(links, headers, domain, store=None, depth=1, max_pages=None,
+                           time_limit=CRAWL_TIME_LIMIT, discovered_links=None, stop_condition=None,
+                           on_page=None, text_scan=True, country_code=PHONE_DEFAULT_REGION, robots=None,
+                           parsed_links=None):
+    """
+    Analyse les liens en parallèle sur le moteur de crawl asynchrone (façade synchrone).
+    Les pages déjà présentes dans le PageStore (ex: la page d'accueil) ne sont pas re-téléchargées.
+    Args:
+        depth: niveaux de liens à suivre (1 = uniquement les liens fournis)
+        max_pages: budget total de pages analysées, tous niveaux confondus
+        time_limit: durée max du crawl en secondes
+        discovered_links: set optionnel complété avec tous les liens trouvés sur les pages analysées
+        stop_condition: StopCondition optionnelle, les fetchs restants sont annulés dès qu'elle est remplie
+        on_page: fonction optionnelle (url, emails, phones, liens) appelée après chaque page (voir Crawler)
+        text_scan: False pour ne pas scanner tout le texte des pages (mailto:/tel:, JSON-LD... seulement)
+        country_code: région par défaut des numéros de téléphone (voir infer_phone_region)
+        robots: RobotsRules optionnelles du site (URLs interdites et crawl-delay, voir Crawler)
+        parsed_links: dict optionnel complété avec {url: (url, hôte, chemin)} des URLs mises en file
+    """
+    valid_links = _prepare_links(links)
+    if not valid_links:
         return []
 
-    logger.info(f"Starting parallel analysis of {len(valid_links)} links")
-    
-    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Créer les tâches pour chaque lien
-        tasks = [
-            loop.run_in_executor(executor, analyze_links, link, headers, domain)
-            for link in valid_links
-        ]
-        
-        try:
-            # Exécuter toutes les tâches en parallèle
-            results = loop.run_until_complete(asyncio.gather(*tasks))
-            logger.info(f"Successfully analyzed {len(results)} links")
-            return results
-        except Exception as e:
-            logger.error(f"Error in parallel analysis: {str(e)}")
-            return []
-        finally:
-            loop.close()
+    logger.info(f"Starting parallel analysis of {len(valid_links)} links (depth {depth})")
+    store = store or PageStore(headers)
+    crawler = Crawler(
+        store, domain,
+        depth=depth,
+        max_pages=max_pages or len(valid_links),
+        time_limit=time_limit,
+        stop_condition=stop_condition,
+        on_page=on_page,
+        text_scan=text_scan,
+        country_code=country_code,
+        robots=robots
+    )
+    try:
+        results = store.engine.run(crawler.run(valid_links))
+        logger.info(f"Successfully analyzed {len(results)} links")
+        if discovered_links is not None:
+            discovered_links.update(crawler.discovered_links)
+        if parsed_links is not None:
+            parsed_links.update(crawler.parsed_links)
+        return results
+    except Exception as e:
+        logger.error(f"Error in parallel analysis: {str(e)}")
+        return []
+
+async def analyze_links_parallel_async(links, headers, domain, store=None, depth=1, max_pages=None,
+                                       time_limit=CRAWL_TIME_LIMIT, discovered_links=None, stop_condition=None,
+                                       on_page=None, text_scan=True, country_code=PHONE_DEFAULT_REGION, robots=None,
+                                       parsed_links=None):
+    """
+    Variante awaitable de analyze_links_parallel pour un serveur asynchrone.
+    """
+    valid_links = _prepare_links(links)
+    if not valid_links:
+        return []
+
+    store = store or PageStore(headers)
+    crawler = Crawler(
+        store, domain,
+        depth=depth,
+        max_pages=max_pages or len(valid_links),
+        time_limit=time_limit,
+        stop_condition=stop_condition,
+        on_page=on_page,
+        text_scan=text_scan,
+        country_code=country_code,
+        robots=robots
+    )
+    try:
+        results = await store.engine.submit(crawler.run(valid_links))
+        if discovered_links is not None:
+            discovered_links.update(crawler.discovered_links)
+        if parsed_links is not None:
+            parsed_links.update(crawler.parsed_links)
+        return results
+    except Exception as e:
+        logger.error(f"Error in parallel analysis: {str(e)}")
+        return []
 
-def process_scraping_results(results, domain_links, all_links, include_emails=True, include_phones=True, include_social_links=True):
+def process_scraping_results(results, domain_links, all_links, include_emails=True, include_phones=True, include_social_links=True,
+                             domain=None, trace=None):
     """
     Traite les résultats du scraping et combine les données.
     Args:
@@ -49,11 +106,15 @@ def process_scraping_results(results, domain_links, all_links, include_emails=Tr
         domain_links: Liste des liens du même domaine
         all_links: Liste de tous les liens trouvés (pour l'extraction des réseaux sociaux)
         include_*: Flags pour inclure/exclure certains types de données
+        domain: domaine du site, pour classer en premier les profils sociaux à son nom
+        trace: Trace optionnelle (timings=true)
+    Retourne (emails, phones, social_profiles, visited_links), social_profiles étant
+    {plateforme: [profils du plus au moins probable]}.
     """
     emails = {}
     phones = {}
     visited_links = set(domain_links)  # Initialiser avec les liens du domaine
-    social_links = {}
+    social_profiles = {}
     
     # Log initial state
     logger.info(f"Processing {len(results)} scraping results")
@@ -64,6 +125,7 @@ def process_scraping_results(results, domain_links, all_links, include_emails=Tr
     for result in results:
         if result:
             result_emails, result_phones, result_visited = result
+            visited_links.update(result_visited)
             
             # Ajouter les emails trouvés
             if include_emails and result_emails:
@@ -85,7 +147,8 @@ def process_scraping_results(results, domain_links, all_links, include_emails=Tr
     
     # Extraire les liens sociaux de tous les liens trouvés
     if include_social_links and all_links:
-        social_links = extract_social_links(all_links)
+        with span(trace, 'extract_social_profiles', links=len(all_links)):
+            social_profiles = extract_social_profiles(all_links, domain)
         logger.info(f"Extracted social links from {len(all_links)} total links")
     
     # Log final results
@@ -93,4 +156,4 @@ def process_scraping_results(results, domain_links, all_links, include_emails=Tr
     logger.info(f"Total unique phones found: {len(phones)}")
     logger.info(f"Total links visited: {len(visited_links)}")
     
-    return emails, phones, social_links, visited_links
\ No newline at end of file
+    return emails, phones, social_profiles, visited_links
\ No newline at end of file
@@ -1,17 +1,78 @@
-from bs4 import BeautifulSoup
 import requests
 import logging
+from config.settings import PHONE_DEFAULT_REGION
 from urllib.parse import urlparse
-from utils.extractors.email_extractor import extract_emails_html, extract_emails_jsonld
-from utils.extractors.phone_extractor import extract_phones_html, extract_phones_jsonld, validate_phones
+from utils.scrapers.page_store import PageStore
+from utils.extractors.link_explorer import extract_link_contexts
+from utils.extractors.email_extractor import (
+    extract_emails_html, extract_emails_jsonld, extract_emails_mailto, extract_emails_cloudflare, deobfuscate_emails
+)
+from utils.extractors.phone_extractor import extract_phones_html, extract_phones_jsonld, extract_phones_tel
+from utils.metrics import EXTRACTOR_SECONDS
+from utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
+EMAIL_SECONDS = EXTRACTOR_SECONDS.labels('email')
+PHONE_SECONDS = EXTRACTOR_SECONDS.labels('phone')
+
 def is_valid_url(url):
     parsed = urlparse(url)
     return bool(parsed.netloc) and bool(parsed.scheme)
 
-def analyze_links(link, headers, domain):
+def analyze_page(page, link, collect_links=False, text_scan=True, country_code=PHONE_DEFAULT_REGION, trace=None):
+    """
+    Extrait emails et téléphones d'une page déjà téléchargée.
+    Traitement purement CPU, exécuté dans le pool de parsing du moteur.
+    Avec collect_links, retourne aussi les liens de la page et leur contexte
+    ({url: {"text", "region"}}) pour le niveau suivant du crawl.
+    Les liens mailto:/tel:, le JSON-LD, les emails Cloudflare et obfusqués sont
+    toujours lus ; text_scan=False désactive seulement le scan regex / PhoneNumberMatcher
+    de tout le texte visible, le plus coûteux.
+    country_code: région des numéros écrits sans indicatif (voir infer_phone_region).
+    trace: Trace optionnelle (timings=true), un span par extracteur.
+    """
+    emails = {}
+    phones = {}
+    links = {}
+
+    page.raise_for_status()
+    document = page.document
+
+    # Texte visible, fragments séparés par des espaces pour éviter les collages
+    html_text = document.text
+    
+    # Utiliser l'opération union (|) pour les sets au lieu de l'addition
+    with EMAIL_SECONDS.time(), span(trace, 'extract_emails', url=link):
+        emails_found = (
+            extract_emails_mailto(document)
+            | extract_emails_cloudflare(document)
+            | extract_emails_jsonld(document)
+            | deobfuscate_emails(html_text)
+        )
+        if text_scan:
+            emails_found |= extract_emails_html(html_text)
+
+    with PHONE_SECONDS.time(), span(trace, 'extract_phones', url=link):
+        # Numéros déjà validés et formatés (PHONE_FORMAT) par les extracteurs : un
+        # nouveau parsing perdrait l'indicatif des numéros étrangers au format national
+        phones_found = extract_phones_tel(document, country_code) | extract_phones_jsonld(document, country_code)
+        if text_scan:
+            phones_found |= extract_phones_html(html_text, country_code)
+
+    for email in emails_found:
+        emails.setdefault(email, []).append(link)
+
+    for phone in phones_found:
+        phones.setdefault(phone, []).append(link)
+
+    if collect_links:
+        with span(trace, 'extract_links', url=link):
+            links = extract_link_contexts(document, page.final_url)
+
+    return emails, phones, links
+
+def analyze_links(link, headers, domain, store=None, text_scan=True):
     emails = {}
     phones = {}
     visited_links = set()
@@ -23,22 +84,9 @@ def analyze_links(link, headers, domain):
     visited_links.add(link)
 
     try:
-        response = requests.get(link, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Utiliser get_text avec separator pour éviter les collages de texte
-        html_text = soup.get_text(separator=' ')
-        
-        # Utiliser l'opération union (|) pour les sets au lieu de l'addition
-        emails_found = extract_emails_html(html_text) | extract_emails_jsonld(soup)
-        for email in emails_found:
-            emails.setdefault(email, []).append(link)
-
-        # Pour les téléphones, vérifier le type de retour de ces fonctions
-        phones_found = set(extract_phones_html(html_text)) | set(extract_phones_jsonld(soup))
-        for phone in validate_phones(phones_found):
-            phones.setdefault(phone, []).append(link)
+        if store is None:
+            store = PageStore(headers)
+        emails, phones, _ = analyze_page(store.get(link), link, text_scan=text_scan)
     except requests.exceptions.RequestException as e:
         logger.error(f"Failed to process link {link}: {e}")
 
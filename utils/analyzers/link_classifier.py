@@ -1,87 +1,162 @@
-from urllib.parse import urlsplit
+import json
+import re
+import logging
+from config.settings import LINK_RULES_PATH
+from utils.metrics import EXTRACTOR_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CLASSIFY_SECONDS = EXTRACTOR_SECONDS.labels('classify')
+
+HOME = "Home"
+OTHERS = "Others"
+
+# Règles de classification, dans l'ordre des catégories de la réponse :
+# - prefixes: premiers segments de chemin ("pages", ou plusieurs segments "legal/privacy")
+# - patterns: regex sur le chemin en minuscules ("/mentions-legales"), testées si aucun préfixe ne correspond
+DEFAULT_CATEGORY_RULES = {
+    "Pages": {"prefixes": ["pages", "page"]},
+    "Policies": {"prefixes": ["policies", "policy"]},
+    "Blogs": {"prefixes": ["blogs", "blog"]},
+    "Collections": {"prefixes": ["collections", "collection"]},
+    "Products": {"prefixes": ["products", "product"]},
+}
+
+# Segment de langue en tête de chemin : /fr/pages/..., /en-us/products/...
+LOCALE_SEGMENT = re.compile(r'^[a-z]{2}(?:[-_][a-z]{2,4})?$')
+
+_CATEGORY = object()
+
+def split_url(url):
+    """
+    (hôte en minuscules, chemin) d'une URL, sans urlsplit.
+    Comme urlsplit, une URL sans "//" n'a pas d'hôte.
+    """
+    head, separator, rest = url.partition('//')
+    if separator and (not head or (head.endswith(':') and '/' not in head)):
+        netloc, slash, path = rest.partition('#')[0].partition('?')[0].partition('/')
+        return netloc.lower(), slash + path
+    return '', url.partition('#')[0].partition('?')[0]
+
+class LinkClassifier:
+    """
+    Classifieur d'URLs compilé une fois depuis une table de règles (voir DEFAULT_CATEGORY_RULES) :
+    les préfixes de chemin forment un trie de segments, les regex sont compilées.
+    Un segment de langue en tête de chemin (/fr/, /en-us/) est ignoré s'il ne correspond
+    à aucune règle. Home : racine du domaine (ou de l'une de ses langues) ; Others : le reste,
+    y compris les URLs hors du domaine.
+    """
+    def __init__(self, rules=None, locale_prefixes=True):
+        rules = DEFAULT_CATEGORY_RULES if rules is None else rules
+        self.categories = [HOME, *rules, OTHERS]
+        self.locale_prefixes = locale_prefixes
+        self._trie = {}
+        self._patterns = []
+        for category, rule in rules.items():
+            for prefix in rule.get("prefixes", []):
+                node = self._trie
+                for segment in prefix.strip('/').lower().split('/'):
+                    node = node.setdefault(segment, {})
+                node.setdefault(_CATEGORY, category)
+            for pattern in rule.get("patterns", []):
+                self._patterns.append((re.compile(pattern), category))
+
+    def _match(self, segments, start):
+        # Préfixe le plus long du trie à partir de segments[start]
+        node, category = self._trie, None
+        for segment in segments[start:]:
+            node = node.get(segment)
+            if node is None:
+                break
+            category = node.get(_CATEGORY, category)
+        return category
+
+    def classify_path(self, path):
+        """
+        Catégorie d'un chemin du domaine : Home, une catégorie des règles, ou Others.
+        """
+        path = path.lower().rstrip('/')
+        segments = path.split('/')[1:] if path.startswith('/') else path.split('/')
+        if not path:
+            return HOME
+        category = self._match(segments, 0)
+        locale = self.locale_prefixes and LOCALE_SEGMENT.match(segments[0])
+        if category is None and locale:
+            if len(segments) == 1:
+                return HOME
+            category = self._match(segments, 1)
+        if category is None and self._patterns:
+            localized = '/' + '/'.join(segments[1:]) if locale else path
+            category = next((name for pattern, name in self._patterns
+                             if pattern.search(path) or pattern.search(localized)), None)
+        return category or OTHERS
+
+    def classify(self, netloc, path, root_domain):
+        """
+        Catégorie d'une URL déjà découpée (hôte, chemin).
+        """
+        netloc = netloc.lower()
+        root_domain = root_domain.lower()
+        if netloc == root_domain:
+            return self.classify_path(path)
+        # Sous-domaines : classés par chemin, sauf leur racine
+        if netloc.endswith(root_domain):
+            category = self.classify_path(path)
+            return OTHERS if category == HOME else category
+        return OTHERS
+
+    def classify_parsed(self, parsed_urls, root_domain):
+        """
+        API batch : classe des URLs déjà découpées en amont, itérable de (url, hôte, chemin).
+        Retourne {catégorie: [urls]} dans l'ordre des catégories.
+        """
+        categories = {category: [] for category in self.categories}
+        for url, netloc, path in parsed_urls:
+            categories[self.classify(netloc, path, root_domain)].append(url)
+        return categories
+
+    def classify_links(self, urls, root_domain):
+        return self.classify_parsed(((url, *split_url(url)) for url in urls), root_domain)
+
+def load_category_rules(path=LINK_RULES_PATH):
+    """
+    Règles de LINK_RULES_PATH (JSON au format de DEFAULT_CATEGORY_RULES), ou les règles par défaut.
+    """
+    if not path:
+        return DEFAULT_CATEGORY_RULES
+    try:
+        with open(path, encoding='utf-8') as rules_file:
+            return json.load(rules_file)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Unable to load link rules from {path}, using defaults: {str(e)}")
+        return DEFAULT_CATEGORY_RULES
+
+_classifier = None
+
+def get_link_classifier():
+    """
+    Classifieur du processus, compilé au premier appel.
+    """
+    global _classifier
+    if _classifier is None:
+        _classifier = LinkClassifier(load_category_rules())
+    return _classifier
+
+def classify_url(url: str, root_domain: str) -> str:
+    """
+    Catégorie d'une seule URL.
+    """
+    return get_link_classifier().classify(*split_url(url), root_domain)
 
 def classify_links(urls: list, root_domain: str) -> dict:
     """Classifie les URLs dans des catégories prédéfinies basées sur leur chemin.
-    
+
     Args:
         urls: Liste des URLs à classifier
         root_domain: Domaine racine pour la catégorie Home
-        
+
     Returns:
         Dictionnaire des URLs classées par catégorie
     """
-    categories = {
-        "Home": [],
-        "Pages": [],
-        "Policies": [],
-        "Blogs": [],
-        "Collections": [],
-        "Products": [],
-        "Others": []
-    }
-    
-    for url in urls:
-        parsed = urlsplit(url)
-        
-        # Normalisation du path
-        path = parsed.path.lower()
-        if path.endswith("/"):
-            path = path[:-1]
-        
-        # Classification: Home (root_domain exact)
-        if parsed.netloc == root_domain and path == "":
-            categories["Home"].append(url)
-            continue
-            
-        # Vérification des sous-domaines
-        if not parsed.netloc.endswith(root_domain):
-            categories["Others"].append(url)
-            continue
-            
-        # Classification: Autres catégories
-        matched = False
-        # Split path into segments
-        segments = path.split("/")
-        
-        # Classification based on path segments
-        if len(segments) > 0:
-            first_segment = segments[0]
-            
-            if first_segment in ["pages", "page"]:
-                categories["Pages"].append(url)
-                matched = True
-            elif first_segment in ["policies", "policy"]:
-                categories["Policies"].append(url)
-                matched = True
-            elif first_segment in ["blogs", "blog"]:
-                categories["Blogs"].append(url)
-                matched = True
-            elif first_segment in ["collections", "collection"]:
-                categories["Collections"].append(url)
-                matched = True
-            elif first_segment in ["products", "product"]:
-                categories["Products"].append(url)
-                matched = True
-            elif first_segment == "" and len(segments) > 1:
-                # Handle cases like "/pages/about"
-                if segments[1] in ["pages", "page"]:
-                    categories["Pages"].append(url)
-                    matched = True
-                elif segments[1] in ["policies", "policy"]:
-                    categories["Policies"].append(url)
-                    matched = True
-                elif segments[1] in ["blogs", "blog"]:
-                    categories["Blogs"].append(url)
-                    matched = True
-                elif segments[1] in ["collections", "collection"]:
-                    categories["Collections"].append(url)
-                    matched = True
-                elif segments[1] in ["products", "product"]:
-                    categories["Products"].append(url)
-                    matched = True
-        
-        # Si aucune correspondance → Others
-        if not matched:
-            categories["Others"].append(url)
-    
-    return categories
+    with CLASSIFY_SECONDS.time():
+        return get_link_classifier().classify_links(urls, root_domain)
@@ -0,0 +1,94 @@
+from urllib.parse import urlsplit
+from utils.analyzers.link_classifier import classify_url, get_link_classifier, split_url
+
+# Mots-clés de chemin, du plus au moins susceptible de contenir des coordonnées
+PATH_KEYWORDS = {
+    'contact': 10, 'kontakt': 10, 'contacto': 10, 'contatti': 10,
+    'impressum': 9, 'imprint': 9, 'mentions-legales': 9, 'mentions_legales': 9, 'legal-notice': 9,
+    'about': 7, 'a-propos': 7, 'qui-sommes-nous': 7, 'notre-histoire': 5, 'our-story': 5,
+    'support': 6, 'service-client': 6, 'customer-service': 6, 'help': 4, 'aide': 4,
+    'legal': 5, 'cgv': 3, 'terms': 2, 'privacy': 3, 'confidentialite': 3,
+    'store-locator': 4, 'magasins': 4, 'boutiques': 4, 'locations': 4,
+    'team': 3, 'equipe': 3, 'faq': 3,
+}
+
+# Textes d'ancre, comparés en minuscules
+ANCHOR_KEYWORDS = {
+    'contact': 6, 'nous contacter': 7, 'contactez': 7, 'kontakt': 6,
+    'impressum': 6, 'imprint': 6, 'mentions légales': 6, 'mentions legales': 6, 'legal notice': 6,
+    'about': 4, 'à propos': 4, 'a propos': 4, 'qui sommes': 4,
+    'support': 4, 'service client': 4, 'customer service': 4, 'aide': 2, 'help': 2,
+    'magasin': 2, 'store locator': 2,
+}
+
+REGION_WEIGHTS = {'footer': 3, 'header': 1}
+
+# Catégories de link_classifier : les pages éditoriales avant le catalogue
+CATEGORY_WEIGHTS = {
+    'Home': 5,
+    'Pages': 4,
+    'Policies': 3,
+    'Others': 0,
+    'Blogs': -2,
+    'Collections': -4,
+    'Products': -5,
+}
+
+SKIPPED_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico',
+    '.pdf', '.zip', '.gz', '.mp4', '.mp3', '.css', '.js', '.xml', '.json'
+)
+
+def _keyword_score(value, keywords):
+    return max((weight for keyword, weight in keywords.items() if keyword in value), default=0)
+
+def score_link(url, category='Others', context=None):
+    """
+    Score d'intérêt d'un lien pour trouver des coordonnées (plus haut = plus prometteur).
+    Args:
+        url: URL absolue
+        category: catégorie retournée par classify_links
+        context: {"text": texte d'ancre, "region": zone de la page} (optionnel)
+    """
+    path = urlsplit(url).path.lower()
+    if path.endswith(SKIPPED_EXTENSIONS):
+        return -20
+
+    score = CATEGORY_WEIGHTS.get(category, 0)
+    score += _keyword_score(path, PATH_KEYWORDS)
+
+    if context:
+        text = (context.get("text") or '').lower()
+        if text:
+            score += _keyword_score(text, ANCHOR_KEYWORDS)
+        score += REGION_WEIGHTS.get(context.get("region"), 0)
+
+    # Les pages profondes sont rarement des pages de contact
+    segments = len([segment for segment in path.split('/') if segment])
+    return score - max(0, segments - 2)
+
+def categorize_links(urls, root_domain):
+    """
+    Catégorie de chaque URL selon le classifieur de liens.
+    """
+    classifier = get_link_classifier()
+    return {url: classifier.classify(*split_url(url), root_domain) for url in urls}
+
+def rank_links(urls, root_domain, contexts=None):
+    """
+    Trie les URLs de la plus à la moins prometteuse.
+    L'ordre est déterministe : à score égal, les URLs courtes puis l'ordre alphabétique.
+    """
+    contexts = contexts or {}
+    categories = categorize_links(urls, root_domain)
+    scored = [
+        (-score_link(url, categories.get(url, 'Others'), contexts.get(url)), len(url), url)
+        for url in set(urls)
+    ]
+    return [url for _, _, url in sorted(scored)]
+
+def link_priority(url, context=None, root_domain=''):
+    """
+    Clé de priorité pour la frontière du crawler (plus petit = visité en premier).
+    """
+    return -score_link(url, classify_url(url, root_domain), context)
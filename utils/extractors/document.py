@@ -0,0 +1,170 @@
+import json
+import logging
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+LANDMARK_TAGS = {'header': 'header', 'nav': 'header', 'footer': 'footer'}
+HIDDEN_TAGS = ('script', 'style', 'template')
+# Lien de remplacement des emails protégés par Cloudflare : /cdn-cgi/l/email-protection#<hex>
+CF_EMAIL_PATH = '/cdn-cgi/l/email-protection#'
+
+class Document:
+    """
+    Page HTML parsée une seule fois (lxml) et partagée par tous les extracteurs.
+    - text: texte visible (hors script/style/template), fragments séparés par des espaces
+    - anchors: liens <a href> dans l'ordre de la page, {"href", "text", "region"}
+    - jsonld: blocs JSON-LD déjà décodés
+    - mailto_links / tel_links: href mailto: et tel: bruts
+    - cfemails: emails encodés par la protection Cloudflare (data-cfemail ou lien email-protection)
+    - meta: balises <meta> {name ou property en minuscules: content}
+    - title, lang: <title> et attribut lang de <html>
+    """
+    def __init__(self, text='', anchors=None, jsonld=None, mailto_links=None, tel_links=None,
+                 meta=None, title='', lang=None, cfemails=None):
+        self.text = text
+        self.anchors = anchors or []
+        self.jsonld = jsonld or []
+        self.mailto_links = mailto_links or []
+        self.tel_links = tel_links or []
+        self.meta = meta or {}
+        self.title = title
+        self.lang = lang
+        self.cfemails = cfemails or []
+
+def get_anchor_region(element):
+    """
+    Zone de la page contenant l'élément : 'footer', 'header' (header/nav) ou None.
+    Reconnaît les balises sémantiques et les id/class contenant footer/header.
+    """
+    for parent in element.iterancestors():
+        tag = parent.tag
+        if tag in LANDMARK_TAGS:
+            return LANDMARK_TAGS[tag]
+        if tag in ('body', 'html'):
+            return None
+        markers = f"{parent.get('id') or ''} {parent.get('class') or ''}".lower()
+        if 'footer' in markers:
+            return 'footer'
+        if 'header' in markers or 'navbar' in markers:
+            return 'header'
+    return None
+
+def _anchor_text(element):
+    return ' '.join(filter(None, [
+        ' '.join(' '.join(element.itertext()).split()),
+        element.get('title'),
+        element.get('aria-label')
+    ]))[:200]
+
+def _decode_jsonld(script):
+    try:
+        return json.loads(script.text or '')
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+class DocumentParser:
+    """
+    Parsing incrémental : le HTML est passé par morceaux (feed) au fil du
+    téléchargement, close() construit le Document.
+    Les appels doivent être faits dans l'ordre et jamais simultanément ; ils peuvent
+    en revanche venir de threads différents (lxml le déconseille pour les performances,
+    pas pour la correction), comme l'arbre retourné par finish().
+    """
+    def __init__(self):
+        self._parser = etree.HTMLParser(remove_comments=True)
+        self._empty = True
+        # Morceaux reçus depuis le dernier '>', concaténés une seule fois
+        self._rest = []
+
+    def feed(self, html):
+        if not html:
+            return
+        self._empty = False
+        # Le parser incrémental de libxml2 perd la suite du document si un morceau
+        # se termine au milieu d'une balise : on ne lui passe que jusqu'au dernier '>'
+        cut = html.rfind('>') + 1
+        if not cut:
+            self._rest.append(html)
+            return
+        self._rest.append(html[:cut])
+        self._parser.feed(''.join(self._rest))
+        self._rest = [html[cut:]] if cut < len(html) else []
+
+    def finish(self):
+        """
+        Termine le parsing et retourne la racine de l'arbre, ou None si le HTML est vide ou illisible.
+        """
+        if self._empty:
+            return None
+        try:
+            if self._rest:
+                self._parser.feed(''.join(self._rest))
+            return self._parser.close()
+        except (etree.XMLSyntaxError, etree.ParserError) as e:
+            logger.warning(f"Unable to parse HTML: {str(e)}")
+            return None
+
+    def close(self):
+        return build_document(self.finish())
+
+def parse_document(html):
+    """
+    Construit le Document d'une page en un seul parsing.
+    Retourne un Document vide si le HTML est vide ou illisible.
+    """
+    parser = DocumentParser()
+    parser.feed(html)
+    return parser.close()
+
+def build_document(root):
+    """
+    Extrait en un parcours les éléments utiles de l'arbre lxml (Document vide si root est None).
+    L'arbre est modifié (scripts et styles retirés pour le texte visible).
+    """
+    if root is None:
+        return Document()
+    anchors, jsonld, mailto_links, tel_links, meta = [], [], [], [], {}
+    cfemails = [value for value in root.xpath('//@data-cfemail') if value]
+    title = ''
+    for element in root.iter('a', 'script', 'meta', 'title'):
+        tag = element.tag
+        if tag == 'a':
+            href = (element.get('href') or '').strip()
+            if not href:
+                continue
+            scheme = href[:7].lower()
+            if scheme == 'mailto:':
+                mailto_links.append(href)
+            elif scheme[:4] == 'tel:':
+                tel_links.append(href)
+            elif CF_EMAIL_PATH in href:
+                cfemails.append(href.split('#', 1)[1])
+            anchors.append({"href": href, "text": _anchor_text(element), "region": get_anchor_region(element)})
+        elif tag == 'script':
+            if (element.get('type') or '').strip().lower() == 'application/ld+json':
+                data = _decode_jsonld(element)
+                if data is not None:
+                    jsonld.append(data)
+        elif tag == 'meta':
+            name = element.get('name') or element.get('property')
+            if name and element.get('content') is not None:
+                meta.setdefault(name.strip().lower(), element.get('content'))
+        elif not title:
+            title = (element.text or '').strip()
+
+    # Le texte visible est calculé après coup, sans les scripts et styles
+    etree.strip_elements(root, *HIDDEN_TAGS, with_tail=False)
+    text = ' '.join(root.itertext())
+
+    return Document(
+        text=text,
+        anchors=anchors,
+        jsonld=jsonld,
+        mailto_links=mailto_links,
+        tel_links=tel_links,
+        meta=meta,
+        title=title,
+        lang=root.get('lang'),
+        cfemails=cfemails,
+    )
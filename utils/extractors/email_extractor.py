@@ -1,6 +1,8 @@
 import re
-import json
+import html
 import logging
+from functools import lru_cache
+from urllib.parse import unquote
 from email_validator import validate_email, EmailNotValidError
 
 # Configure logging
@@ -23,6 +25,27 @@ VALID_TLDS = {
     'software', 'technology'
 }
 
+# Pattern RFC 5322, compilé une fois pour toutes
+EMAIL_PATTERN = re.compile(
+    r'''(?:[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*|"(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21\x23-\x5b\x5d-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])*")@(?:(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z0-9](?:[a-z0-9-]*[a-z0-9])?|\[(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?|[a-z0-9-]*[a-z0-9]:(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21-\x5a\x53-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])+)\])''',
+    re.IGNORECASE
+)
+# Caractères que le pattern ne peut pas consommer (hors échappement entre guillemets)
+BOUNDARY = re.compile(r'[ \t\n\r]')
+BOUNDARY_CHARS = ' \t\n\r'
+
+# Obfuscations courantes : "contact [at] example (dot) com", "contact(arobase)example.com"...
+# Les marqueurs commencent par une parenthèse ou un crochet : leur recherche reste rapide
+OBFUSCATED_AT = re.compile(r'[\[\(\{<]\s*(?:at|arobase|@)\s*[\]\)\}>]', re.IGNORECASE)
+OBFUSCATED_DOT = re.compile(r'\s*[\[\(\{<]\s*(?:dot|point)\s*[\]\)\}>]\s*', re.IGNORECASE)
+OBFUSCATED_LOCAL_PART = re.compile(r"[a-z0-9!#$%&'*+/=?^_`{|}~.-]+$", re.IGNORECASE)
+OBFUSCATED_DOMAIN = re.compile(r'[a-z0-9-]+(?:\.[a-z0-9-]+)+', re.IGNORECASE)
+# Nombre de caractères examinés de part et d'autre d'un marqueur [at]
+OBFUSCATION_LOOKAROUND = 100
+
+# Taille du cache de validation, partagé entre les pages du processus
+EMAIL_VALIDATION_CACHE_SIZE = 4096
+
 def is_valid_tld(email: str) -> bool:
     """
     Vérifie si le TLD de l'email est valide.
@@ -34,10 +57,12 @@ def is_valid_tld(email: str) -> bool:
     except IndexError:
         return False
 
+@lru_cache(maxsize=EMAIL_VALIDATION_CACHE_SIZE)
 def validate_and_normalize_email(email: str) -> str | None:
     """
     Valide et normalise une adresse email.
-    Vérifie la syntaxe et le TLD.
+    Vérifie la syntaxe et le TLD. Résultats mémorisés (LRU) : les mêmes
+    adresses reviennent sur toutes les pages d'un site.
     """
     try:
         # Nettoyage initial
@@ -57,22 +82,98 @@ def validate_and_normalize_email(email: str) -> str | None:
     except EmailNotValidError:
         return None
 
+def email_windows(text: str):
+    """
+    Portions du texte qui peuvent contenir un email : les suites de caractères
+    sans espace ni saut de ligne autour de chaque '@'. Le pattern ne pouvant pas
+    franchir ces caractères, le scan des fenêtres équivaut au scan du texte complet.
+    """
+    end = 0
+    at = text.find('@')
+    while at != -1:
+        start = max(text.rfind(char, end, at) for char in BOUNDARY_CHARS) + 1
+        start = max(start, end)
+        match = BOUNDARY.search(text, at)
+        end = match.start() if match else len(text)
+        yield text[start:end]
+        at = text.find('@', end)
+
 def extract_emails_html(html_content: str) -> set[str]:
     """
     Extrait les emails du texte HTML avec une validation stricte.
+    Seules les fenêtres autour des '@' sont analysées.
     """
-    # Pattern plus strict pour les emails
-    email_pattern = r'''(?:[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*|"(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21\x23-\x5b\x5d-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])*")@(?:(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z0-9](?:[a-z0-9-]*[a-z0-9])?|\[(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?|[a-z0-9-]*[a-z0-9]:(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21-\x5a\x53-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])+)\])'''
-    
     emails = set()
-    potential_emails = re.findall(email_pattern, html_content, re.IGNORECASE)
-    
-    for email in potential_emails:
-        normalized_email = validate_and_normalize_email(email)
+    for window in email_windows(html_content):
+        for email in EMAIL_PATTERN.findall(window):
+            normalized_email = validate_and_normalize_email(email)
+            if normalized_email:
+                emails.add(normalized_email)
+    if emails:
+        logger.debug(f"Emails extraits : {emails}")
+    return emails
+
+def deobfuscate_emails(text: str) -> set[str]:
+    """
+    Décode les emails écrits sous forme obfusquée ([at], (dot), {arobase}...).
+    Seul le voisinage de chaque marqueur [at] est analysé.
+    """
+    emails = set()
+    for marker in OBFUSCATED_AT.finditer(text):
+        before = text[max(0, marker.start() - OBFUSCATION_LOOKAROUND):marker.start()]
+        after = text[marker.end():marker.end() + OBFUSCATION_LOOKAROUND]
+        local_part = OBFUSCATED_LOCAL_PART.search(OBFUSCATED_DOT.sub('.', before).rstrip())
+        domain = OBFUSCATED_DOMAIN.match(OBFUSCATED_DOT.sub('.', after).lstrip())
+        if local_part and domain:
+            normalized_email = validate_and_normalize_email(f"{local_part.group().lstrip('.')}@{domain.group()}")
+            if normalized_email:
+                emails.add(normalized_email)
+    return emails
+
+def extract_emails_mailto(document) -> set[str]:
+    """
+    Extrait les destinataires des liens mailto: du Document
+    (encodage URL et entités HTML décodés, paramètres ?subject=... ignorés).
+    """
+    emails = set()
+    for href in document.mailto_links:
+        recipients = html.unescape(unquote(href[7:].split('?', 1)[0]))
+        for recipient in recipients.split(','):
+            if '@' not in recipient:
+                emails.update(deobfuscate_emails(recipient))
+                continue
+            normalized_email = validate_and_normalize_email(recipient)
+            if normalized_email:
+                emails.add(normalized_email)
+    return emails
+
+def decode_cfemail(encoded: str) -> str | None:
+    """
+    Décode un email protégé par Cloudflare : octets en hexadécimal,
+    le premier est la clé XOR des suivants.
+    """
+    try:
+        data = bytes.fromhex(encoded)
+    except ValueError:
+        return None
+    if len(data) < 2:
+        return None
+    key = data[0]
+    try:
+        return bytes(byte ^ key for byte in data[1:]).decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+def extract_emails_cloudflare(document) -> set[str]:
+    """
+    Extrait les emails protégés par Cloudflare (data-cfemail) du Document.
+    """
+    emails = set()
+    for encoded in document.cfemails:
+        email = decode_cfemail(encoded)
+        normalized_email = validate_and_normalize_email(email) if email else None
         if normalized_email:
             emails.add(normalized_email)
-            logger.info(f"Email extrait : {normalized_email}")
-    
     return emails
 
 def extract_emails_from_json(data) -> set[str]:
@@ -95,18 +196,11 @@ def extract_emails_from_json(data) -> set[str]:
             
     return emails
 
-def extract_emails_jsonld(soup) -> set[str]:
+def extract_emails_jsonld(document) -> set[str]:
     """
-    Extrait les emails des balises script JSON-LD.
+    Extrait les emails des blocs JSON-LD (déjà décodés) du Document.
     """
     emails = set()
-    scripts = soup.find_all("script", type="application/ld+json")
-    
-    for script in scripts:
-        try:
-            data = json.loads(script.string)
-            emails.update(extract_emails_from_json(data))
-        except (json.JSONDecodeError, TypeError, Exception):
-            continue
-    
+    for data in document.jsonld:
+        emails.update(extract_emails_from_json(data))
     return emails
@@ -1,8 +1,34 @@
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
 import logging
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonicalize_url(url):
+    """
+    Forme canonique d'une URL pour l'utiliser comme clé (cache, déduplication).
+    Schéma et hôte en minuscules, port par défaut et fragment supprimés,
+    chemin vide remplacé par '/'. La query string est conservée.
+    """
+    return canonical_parts(url)[0]
+
+def canonical_parts(url):
+    """
+    (URL canonique, hôte, chemin) : voir canonicalize_url. L'hôte et le chemin
+    sont ceux de la forme canonique, réutilisables par le classement des liens.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        netloc = (parts.hostname or '').lower()
+        if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+            netloc = f"{netloc}:{parts.port}"
+        path = parts.path or '/'
+        return urlunsplit((scheme, netloc, path, parts.query, '')), netloc, path
+    except ValueError:
+        return url, '', url
+
 def is_same_domain(url, domain):
     """
     Vérifie si l'URL appartient au même domaine.
@@ -27,21 +53,21 @@ def normalize_url(url, base_url):
         logger.error(f"Error normalizing URL {url}: {str(e)}")
         return None
 
-def extract_links(soup, base_url, domain=None):
+def extract_link_contexts(document, base_url, domain=None):
     """
-    Extrait tous les liens d'une page web.
+    Extrait les liens d'une page avec leur contexte, utilisé pour prioriser le crawl.
     Args:
-        soup: BeautifulSoup object
-        base_url: URL de base pour résoudre les liens relatifs
-        domain: Domaine à filtrer (optionnel)
+        document: Document de la page (voir utils.extractors.document)
     Returns:
-        set: Ensemble des liens uniques trouvés
+        dict: {url: {"text": texte d'ancre, "region": 'footer' | 'header' | None}}
+        Pour un lien présent plusieurs fois, les textes sont concaténés et
+        la première zone connue est conservée.
     """
-    links = set()
+    contexts = {}
     try:
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"].strip()
-            
+        for anchor in document.anchors:
+            href = anchor["href"]
+
             # Ignore les liens vides ou javascript:
             if not href or href.startswith(('javascript:', 'mailto:', 'tel:')):
                 continue
@@ -54,11 +80,30 @@ def extract_links(soup, base_url, domain=None):
             # Vérifie le domaine si spécifié
             if domain and not is_same_domain(normalized_url, domain):
                 continue
-                
-            links.add(normalized_url)
+
+            text = anchor["text"]
+            context = contexts.get(normalized_url)
+            if context is None:
+                contexts[normalized_url] = {"text": text, "region": anchor["region"]}
+            else:
+                if text and text not in context["text"]:
+                    context["text"] = f"{context['text']} {text}".strip()[:200]
+                context["region"] = context["region"] or anchor["region"]
             
-        logger.info(f"Extracted {len(links)} links from {base_url}")
+        logger.info(f"Extracted {len(contexts)} links from {base_url}")
     except Exception as e:
         logger.error(f"Error extracting links from {base_url}: {str(e)}")
     
-    return links
+    return contexts
+
+def extract_links(document, base_url, domain=None):
+    """
+    Extrait tous les liens d'une page web.
+    Args:
+        document: Document de la page
+        base_url: URL de base pour résoudre les liens relatifs
+        domain: Domaine à filtrer (optionnel)
+    Returns:
+        set: Ensemble des liens uniques trouvés
+    """
+    return set(extract_link_contexts(document, base_url, domain))
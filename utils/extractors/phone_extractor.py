@@ -1,113 +1,266 @@
-import json
+import re
 import phonenumbers
 from phonenumbers import PhoneNumberMatcher
 import logging
 from functools import lru_cache
+from urllib.parse import unquote, urlsplit
+from config.settings import PHONE_DEFAULT_REGION, PHONE_FORMAT, PHONE_CACHE_SIZE
+
+# Ponctuation acceptée par libphonenumber entre les chiffres d'un numéro
+# (tirets, espaces, parenthèses, points, barres, variantes pleine chasse...)
+PHONE_PUNCTUATION = "-x\u2010-\u2015\u2212\u30FC\uFF0D-\uFF0F \u00A0\u00AD\u200B\u2060\u3000()\uFF08\uFF09\uFF3B\uFF3D.\\[\\]/~\u2053\u223C\uFF5E"
+PLUS_CHARS = "+\uFF0B"
+# Suite de chiffres et de ponctuation, point de départ possible d'un numéro
+PHONE_CANDIDATE = re.compile(rf"[{PLUS_CHARS}(\[\uFF08\uFF3B]?\d[{PHONE_PUNCTUATION}\d]*")
+# Contexte ajouté autour d'un candidat (extension "ext. 12", lettre ou devise adjacente...)
+PHONE_CONTEXT = 20
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
-@lru_cache(maxsize=100)
-def parse_phone(phone_str, country_code="US"):
+# Formats de sortie, appliqués par libphonenumber d'après ses métadonnées de numérotation
+PHONE_FORMATS = {
+    'e164': phonenumbers.PhoneNumberFormat.E164,                    # +33123456789
+    'international': phonenumbers.PhoneNumberFormat.INTERNATIONAL,  # +33 1 23 45 67 89
+    'national': phonenumbers.PhoneNumberFormat.NATIONAL,            # 01 23 45 67 89
+    'rfc3966': phonenumbers.PhoneNumberFormat.RFC3966,              # tel:+33-1-23-45-67-89
+}
+DEFAULT_PHONE_FORMAT = 'e164'
+
+def phone_output_format(phone_format=PHONE_FORMAT):
     """
-    Parse un numéro de téléphone avec mise en cache pour éviter les parsing répétés.
+    Format de sortie configuré (PHONE_FORMAT), ou E.164 s'il n'est pas dans PHONE_FORMATS.
+    """
+    if phone_format in PHONE_FORMATS:
+        return phone_format
+    logging.warning(f"Unknown PHONE_FORMAT '{phone_format}' (expected one of {', '.join(PHONE_FORMATS)}), using {DEFAULT_PHONE_FORMAT}")
+    return DEFAULT_PHONE_FORMAT
+
+# Validé une fois à l'import : une valeur inconnue ne fait pas échouer chaque extraction
+OUTPUT_FORMAT = phone_output_format()
+
+# TLD dont le code pays diffère de la région ISO 3166
+TLD_REGIONS = {'uk': 'GB'}
+# ccTLD vendus comme domaines génériques ou de marque : n'indiquent pas le pays du site
+GENERIC_TLDS = frozenset({
+    'io', 'co', 'ai', 'me', 'tv', 'ly', 'fm', 'am', 'gg', 'sh', 'to', 'cc', 'ws', 'nu', 'vc', 'la',
+    'ac', 'is', 'im', 'so', 'st', 'gl', 'tk', 'ml', 'ga', 'cf', 'cx', 'ms', 'bz', 'mu', 'sc', 'ps',
+})
+# Langues associées sans ambiguïté à une région, pour <html lang> sans sous-tag de région
+LANGUAGE_REGIONS = {
+    'fr': 'FR', 'de': 'DE', 'it': 'IT', 'es': 'ES', 'nl': 'NL', 'pt': 'PT', 'pl': 'PL',
+    'da': 'DK', 'sv': 'SE', 'fi': 'FI', 'nb': 'NO', 'cs': 'CZ', 'el': 'GR', 'ja': 'JP', 'ko': 'KR',
+}
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def lookup_phone(phone_str, country_code=PHONE_DEFAULT_REGION):
+    """
+    Parse, valide et formate un numéro en une fois ; le résultat
+    (PhoneNumber ou None, valide, numéro formaté ou None) est mémorisé dans un
+    cache LRU partagé par toutes les pages du processus (voir phone_cache_stats).
+    Le PhoneNumber retourné est partagé : ne pas le modifier.
     """
     try:
-        return phonenumbers.parse(phone_str, country_code)
+        parsed = phonenumbers.parse(phone_str, country_code)
     except phonenumbers.NumberParseException:
-        return None
+        return None, False, None
+    valid = phonenumbers.is_valid_number(parsed)
+    return parsed, valid, format_phone(parsed) if valid else None
 
-def validate_phone(phone, country_code="US"):
+def phone_cache_stats():
+    """
+    Compteurs du cache de numéros, pour /cache/stats.
+    """
+    info = lookup_phone.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else None,
+    }
+
+def parse_phone(phone_str, country_code=PHONE_DEFAULT_REGION):
+    """
+    Parse un numéro de téléphone avec mise en cache pour éviter les parsing répétés.
+    """
+    return lookup_phone(phone_str, country_code)[0]
+
+def validate_phone(phone, country_code=PHONE_DEFAULT_REGION):
     """
     Valide un numéro de téléphone de manière optimisée.
     """
-    parsed = parse_phone(phone, country_code)
-    return parsed and phonenumbers.is_valid_number(parsed)
+    return lookup_phone(phone, country_code)[1]
 
-def validate_phones(phones, country_code="US"):
+def validate_phones(phones, country_code=PHONE_DEFAULT_REGION):
     """
     Fonction de compatibilité pour l'ancienne API.
     Valide une liste de numéros de téléphone et retourne un set de numéros valides.
     """
     valid_phones = set()
     for phone in phones:
-        if validate_phone(phone, country_code):
+        if phone and validate_phone(phone, country_code):
             valid_phones.add(phone)
     return valid_phones
 
-def format_phone(parsed_number):
+def format_phone(parsed_number, phone_format=None):
     """
-    Formate un numéro parsé en format international E.164 et le rend plus lisible.
+    Formate un numéro parsé selon PHONE_FORMATS (OUTPUT_FORMAT par défaut).
+    Retourne None si le numéro n'est pas valide.
     """
     if not parsed_number or not phonenumbers.is_valid_number(parsed_number):
-        return None  # Return None for invalid numbers
-
-    # Format the number in E.164
-    formatted_number = phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164)
-    
-    # Remove leading zeros and non-numeric characters
-    formatted_number = ''.join(filter(str.isdigit, formatted_number))
-    
-    # Dictionary to map country codes to formatting rules
-    formatting_rules = {
-        '1': lambda num: f"+{num[:1]} {num[1:4]} {num[4:]}",
-        '212': lambda num: f"+{num[:3]} {num[3:6]} {num[6:]}",
-        '33': lambda num: f"+{num[:2]} {num[2:4]} {num[4:]}",
-        '49': lambda num: f"+{num[:2]} {num[2:5]} {num[5:]}",
-    }
-    
-    # Get the country code
-    country_code = formatted_number[:2]  # Get the country code
-    local_number = formatted_number[4:]  # Remaining local number
-
-    # Use the formatting rule if it exists
-    if country_code in formatting_rules:
-        return formatting_rules[country_code](local_number)
-
-    # Use the formatting rule if it exists
-    if country_code in formatting_rules:
-        return formatting_rules[country_code](local_number)
-    else:
-        return None  # Return None if no formatting rule is found
-
-    # Use the formatting rule if it exists
-    if country_code in formatting_rules:
-        return formatting_rules[country_code](local_number)
-    local_number = formatted_number[4:]  # Remaining local number
-
-    # Format the output with segmentation into groups of two
-    local_number_segments = [local_number[i:i+2] for i in range(0, len(local_number), 2)]
-    formatted_local_number = ' '.join(local_number_segments)
-    
-    return f"+{country_code} {operator_prefix} {formatted_local_number}"
-
-def extract_phones_html(text, country_code="US"):
+        return None
+    return phonenumbers.format_number(parsed_number, PHONE_FORMATS[phone_format or OUTPUT_FORMAT])
+
+def _jsonld_countries(data):
+    # Valeurs addressCountry du JSON-LD : "FR" ou {"@type": "Country", "name": "FR"}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == 'addressCountry':
+                if isinstance(value, dict):
+                    value = value.get('name') or value.get('identifier')
+                if isinstance(value, str):
+                    yield value.strip()
+            elif isinstance(value, (dict, list)):
+                yield from _jsonld_countries(value)
+    elif isinstance(data, list):
+        for item in data:
+            yield from _jsonld_countries(item)
+
+def _supported_region(code):
+    code = (code or '').upper()
+    return code if code in phonenumbers.SUPPORTED_REGIONS else None
+
+def infer_phone_region(url, document=None, default=PHONE_DEFAULT_REGION):
+    """
+    Région par défaut des numéros d'un site, déduite une fois par crawl, dans l'ordre :
+    addressCountry du JSON-LD, sous-tag de région de <html lang> (en-US -> US),
+    TLD national du domaine (hors GENERIC_TLDS : .io, .co, .ai...), puis langue seule
+    de <html lang> (fr -> FR). Retourne default si aucun indice n'est exploitable.
+    """
+    if document is not None:
+        for country in _jsonld_countries(document.jsonld):
+            region = _supported_region(country) if len(country) == 2 else None
+            if region:
+                return region
+
+    lang = ((document.lang if document is not None else None) or '').replace('_', '-').split('-')
+    if len(lang) > 1 and len(lang[-1]) == 2:
+        region = _supported_region(lang[-1])
+        if region:
+            return region
+
+    host = (urlsplit(url).hostname or '').rstrip('.')
+    tld = host.rsplit('.', 1)[-1].lower() if '.' in host else ''
+    if len(tld) == 2 and tld not in GENERIC_TLDS:
+        region = _supported_region(TLD_REGIONS.get(tld, tld))
+        if region:
+            return region
+
+    region = LANGUAGE_REGIONS.get(lang[0].lower())
+    return region or default
+
+@lru_cache(maxsize=None)
+def min_phone_digits(country_code=None):
+    """
+    Nombre minimal de chiffres d'un numéro valide, d'après les métadonnées de libphonenumber :
+    numéro national le plus court de la région, ou avec country_code=None numéro
+    international le plus court (indicatif compris), toutes régions confondues.
+    """
+    if country_code:
+        metadata = phonenumbers.PhoneMetadata.metadata_for_region(country_code.upper())
+        lengths = [length for length in metadata.general_desc.possible_length if length > 0] if metadata else []
+        if lengths:
+            return min(lengths)
+    shortest = []
+    for region in phonenumbers.SUPPORTED_REGIONS:
+        metadata = phonenumbers.PhoneMetadata.metadata_for_region(region)
+        lengths = [length for length in metadata.general_desc.possible_length if length > 0]
+        if lengths:
+            shortest.append(len(str(metadata.country_code)) + min(lengths))
+    for code in phonenumbers.COUNTRY_CODES_FOR_NON_GEO_REGIONS:
+        metadata = phonenumbers.PhoneMetadata.metadata_for_nongeo_region(code)
+        lengths = [length for length in metadata.general_desc.possible_length if length > 0] if metadata else []
+        if lengths:
+            shortest.append(len(str(code)) + min(lengths))
+    return min(shortest)
+
+def phone_windows(text, country_code=PHONE_DEFAULT_REGION):
+    """
+    Portions du texte susceptibles de contenir un numéro : les suites de chiffres et de
+    ponctuation assez longues pour la région (ou pour un numéro international si elles
+    commencent par '+'), avec un peu de contexte et étendues aux espaces les plus proches
+    pour ne pas couper de mot. Les fenêtres qui se chevauchent sont fusionnées.
+    Prix, dates, références courtes... sont écartés sans passer par PhoneNumberMatcher.
+    """
+    national_digits = min_phone_digits(country_code)
+    international_digits = min_phone_digits(None)
+    window_start = window_end = None
+    for match in PHONE_CANDIDATE.finditer(text):
+        candidate = match.group()
+        required = international_digits if candidate[0] in PLUS_CHARS else national_digits
+        if sum(char.isdigit() for char in candidate) < required:
+            continue
+        start = max(0, match.start() - PHONE_CONTEXT)
+        start = max(text.rfind(' ', 0, start), text.rfind('\n', 0, start)) + 1
+        end = min(len(text), match.end() + PHONE_CONTEXT)
+        end = min(position for position in (text.find(' ', end), text.find('\n', end), len(text)) if position != -1)
+        if window_end is not None and start <= window_end:
+            window_end = max(window_end, end)
+            continue
+        if window_end is not None:
+            yield text[window_start:window_end]
+        window_start, window_end = start, end
+    if window_end is not None:
+        yield text[window_start:window_end]
+
+def find_phone_numbers(text, country_code=PHONE_DEFAULT_REGION):
+    """
+    Numéros (PhoneNumber) trouvés par PhoneNumberMatcher dans les fenêtres candidates du texte.
+    """
+    for window in phone_windows(text, country_code):
+        for match in PhoneNumberMatcher(window, country_code):
+            yield match.number
+
+def extract_phones_html(text, country_code=PHONE_DEFAULT_REGION):
     """
     Extrait les numéros de téléphone du texte HTML avec support de pays configurable.
+    Seules les fenêtres candidates (voir phone_windows) passent par PhoneNumberMatcher.
     """
     phones = set()
-    for match in PhoneNumberMatcher(text, country_code):
-        phones.add(format_phone(match.number))
+    for number in find_phone_numbers(text, country_code):
+        formatted = format_phone(number)
+        if formatted:
+            phones.add(formatted)
     if phones:
         logging.info(f"Extracted phones from HTML: {phones}")
     return phones
 
-def extract_phones_jsonld(soup, country_code="US"):
+def extract_phones_jsonld(document, country_code=PHONE_DEFAULT_REGION):
     """
-    Extrait les numéros de téléphone du JSON-LD avec support de pays configurable.
+    Extrait les numéros de téléphone des blocs JSON-LD (déjà décodés) du Document.
     """
     phones = set()
-    scripts = soup.find_all("script", type="application/ld+json")
-    for script in scripts:
-        try:
-            data = json.loads(script.string)
-            if "telephone" in data:
-                phone = data["telephone"]
-                parsed = parse_phone(phone, country_code)
-                if parsed and validate_phone(phone, country_code):
-                    phones.add(format_phone(parsed))
-        except (json.JSONDecodeError, TypeError):
-            continue
+    for data in document.jsonld:
+        if isinstance(data, dict) and isinstance(data.get("telephone"), str):
+            formatted = lookup_phone(data["telephone"], country_code)[2]
+            if formatted:
+                phones.add(formatted)
     if phones:
         logging.info(f"Extracted phones from JSON-LD: {phones}")
     return phones
+
+def extract_phones_tel(document, country_code=PHONE_DEFAULT_REGION):
+    """
+    Extrait les numéros des liens tel: du Document (paramètres ;ext=... ignorés).
+    """
+    phones = set()
+    for href in document.tel_links:
+        phone = unquote(href[4:]).split(';', 1)[0].strip()
+        formatted = lookup_phone(phone, country_code)[2]
+        if formatted:
+            phones.add(formatted)
+    if phones:
+        logging.info(f"Extracted phones from tel: links: {phones}")
+    return phones
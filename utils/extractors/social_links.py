@@ -1,63 +1,243 @@
 import re
 import logging
+from functools import lru_cache
+from urllib.parse import parse_qs
+from utils.metrics import EXTRACTOR_SECONDS
 
 logger = logging.getLogger(__name__)
 
-def extract_social_links(unique_links):
+SOCIAL_SECONDS = EXTRACTOR_SECONDS.labels('social')
+
+SOCIAL_PLATFORMS = (
+    "facebook", "instagram", "twitter", "tiktok", "linkedin", "youtube", "pinterest", "github", "snapchat"
+)
+
+# Aiguillage sur l'hôte : domaine exact (sous-domaines www., m., fr.... compris)
+PLATFORM_HOSTS = {
+    'facebook.com': 'facebook',
+    'fb.com': 'facebook',
+    'twitter.com': 'twitter',
+    'x.com': 'twitter',
+    'tiktok.com': 'tiktok',
+    'youtube.com': 'youtube',
+    'youtu.be': 'youtube',
+    'github.com': 'github',
+    'snapchat.com': 'snapchat',
+}
+# Plateformes reconnues quelle que soit l'extension (instagram.fr, pinterest.co.uk...)
+PLATFORM_BRANDS = {
+    'instagram': 'instagram',
+    'twitter': 'twitter',
+    'linkedin': 'linkedin',
+    'pinterest': 'pinterest',
+}
+# Seconds niveaux acceptés devant un TLD national (co.uk, com.br...)
+SECOND_LEVEL_LABELS = {'co', 'com'}
+
+# Règles de chemin par plateforme :
+# - prefixes: premier segment suivi de l'identifiant du profil -> rang (plus petit = préféré) ;
+#   '@' désigne un premier segment de la forme @identifiant
+# - excluded: premiers segments qui ne sont pas des profils (partage, intent, contenus, pages du service)
+# - bare: rang d'un profil /identifiant, None si ce format n'est pas un profil
+PROFILE_RULES = {
+    "facebook": {
+        "prefixes": {"pages": 1},
+        "excluded": {
+            "sharer", "sharer.php", "share", "share.php", "dialog", "plugins", "tr", "login", "login.php",
+            "help", "policies", "privacy", "legal", "watch", "hashtag", "photo", "photo.php", "photos",
+            "permalink.php", "story.php", "events", "home.php", "settings", "ads", "business", "groups",
+            "search", "l.php", "video.php", "media", "marketplace", "gaming", "reel",
+        },
+        "bare": 0,
+    },
+    "instagram": {
+        "prefixes": {},
+        "excluded": {
+            "p", "reel", "reels", "explore", "accounts", "stories", "tv", "about", "legal", "direct",
+            "developer", "sharer.php", "share",
+        },
+        "bare": 0,
+    },
+    "twitter": {
+        "prefixes": {},
+        "excluded": {
+            "intent", "share", "home", "hashtag", "search", "i", "login", "signup", "tos", "privacy",
+            "settings", "explore", "messages", "notifications", "compose", "widgets.js",
+        },
+        "bare": 0,
+    },
+    "tiktok": {
+        "prefixes": {"@": 0},
+        "excluded": {"share", "embed", "tag", "discover", "music", "legal", "about", "login", "foryou", "search"},
+        "bare": 1,
+    },
+    "linkedin": {
+        "prefixes": {"company": 0, "in": 0, "school": 1, "showcase": 1},
+        "excluded": set(),
+        "bare": None,
+    },
+    "youtube": {
+        "prefixes": {"@": 0, "channel": 0, "c": 0, "user": 0},
+        "excluded": {
+            "watch", "embed", "results", "playlist", "shorts", "feed", "redirect", "share", "live",
+            "about", "t", "account", "premium", "howyoutubeworks", "kids", "v",
+        },
+        "bare": 1,
+    },
+    "pinterest": {
+        "prefixes": {},
+        "excluded": {"pin", "search", "ideas", "_", "today", "business", "login", "explore", "categories"},
+        "bare": 0,
+    },
+    "github": {
+        "prefixes": {"orgs": 1},
+        "excluded": {
+            "features", "about", "pricing", "login", "join", "sponsors", "topics", "marketplace", "apps",
+            "settings", "site", "contact", "enterprise", "security", "explore", "collections", "search",
+            "trending", "customer-stories", "readme", "team",
+        },
+        "bare": 0,
+    },
+    "snapchat": {
+        "prefixes": {"add": 0, "@": 0},
+        "excluded": {"discover", "spotlight", "lens", "unlock", "scan", "share", "legal", "privacy", "terms"},
+        "bare": 1,
+    },
+}
+# youtu.be ne mène qu'à des vidéos : gardées en dernier recours
+VIDEO_RANK = 2
+
+NON_ALNUM = re.compile(r'[^a-z0-9]')
+
+@lru_cache(maxsize=4096)
+def platform_for_host(netloc):
     """
-    Extrait les liens des réseaux sociaux à partir d'une liste de liens.
-    Supporte différents formats d'URLs pour chaque réseau social.
-    """
-    social_links = {
-        "facebook": None,
-        "instagram": None,
-        "twitter": None,
-        "tiktok": None,
-        "linkedin": None,
-        "youtube": None,
-        "pinterest": None,
-        "github": None,
-        "snapchat": None
-    }
-
-    # Patterns plus flexibles pour les liens sociaux
-    patterns = {
-        "facebook": re.compile(r"https?://(www\.)?(facebook|fb)\.com/([^/\s]+)/?"),
-        "instagram": re.compile(r"https?://(www\.)?instagram\.[^/]+/([^/\s]+)/?"),
-        "twitter": re.compile(r"https?://(www\.)?(twitter|x)\.[^/]+/([^/\s]+)/?"),
-        "tiktok": re.compile(r"https?://(www\.)?tiktok\.com/(@[^/\s]+|[^/\s]+)/?"),
-        "linkedin": re.compile(r"https?://(www\.)?linkedin\.[^/]+/(company/[^/\s]+|in/[^/\s]+)/?"),
-        "youtube": re.compile(r"https?://(www\.)?(youtube\.com|youtu\.be)/(channel/|user/|c/|@)?([^/\s]+)/?"),
-        "pinterest": re.compile(r"https?://(www\.)?pinterest\.[^/]+/([^/\s]+)/?"),
-        "github": re.compile(r"https?://(www\.)?github\.com/([^/\s]+)/?"),
-        "snapchat": re.compile(r"https?://(www\.)?snapchat\.com/(add/|@)?([^/\s]+)/?")
-    }
+    Plateforme sociale d'un hôte (netloc, éventuellement avec port), ou None.
+    Quelques recherches dans des dicts, quel que soit le nombre de plateformes ;
+    mémorisé car les liens d'un site partagent peu d'hôtes différents.
+    """
+    host = netloc.rpartition('@')[2].partition(':')[0].lower().rstrip('.')
+    labels = host.split('.')
+    for index in range(len(labels) - 1):
+        platform = PLATFORM_HOSTS.get('.'.join(labels[index:]))
+        if platform:
+            return platform
+        brand = PLATFORM_BRANDS.get(labels[index])
+        remaining = len(labels) - index - 1
+        if brand and (remaining == 1 or (remaining == 2 and labels[index + 1] in SECOND_LEVEL_LABELS)):
+            return brand
+    return None
+
+def _split_link(link):
+    # "https://hôte/chemin?requête#fragment" -> (hôte, chemin, requête), sans urlsplit
+    parts = link.split('/', 3)
+    if len(parts) < 3 or parts[1] or parts[0].lower() not in ('http:', 'https:'):
+        return None
+    path, _, query = (parts[3] if len(parts) > 3 else '').partition('#')[0].partition('?')
+    return parts[2], path, query
+
+def parse_social_link(link):
+    """
+    Analyse un lien social : retourne (plateforme, identifiant, clé de rang) ou None si
+    le lien n'est pas un profil (autre site, partage, intent, publication...).
+    L'hôte est testé en premier ; seuls les liens d'une plateforme passent aux règles de chemin.
+    """
+    split = _split_link(link.strip())
+    if split is None:
+        return None
+    netloc, path, query = split
+    platform = platform_for_host(netloc)
+    if platform is None:
+        return None
+
+    rules = PROFILE_RULES[platform]
+    segments = [segment for segment in path.split('/') if segment]
+    if not segments:
+        # Page d'accueil de la plateforme
+        return None
+    first = segments[0].lower()
+
+    if netloc.lower().endswith('youtu.be'):
+        handle, kind, used = segments[0], VIDEO_RANK, 1
+    elif platform == "facebook" and first == "profile.php":
+        profile_id = parse_qs(query).get('id')
+        if not profile_id:
+            return None
+        handle, kind, used = f"profile.php?id={profile_id[0]}", 1, 1
+    elif first.startswith('@') and '@' in rules["prefixes"] and len(first) > 1:
+        handle, kind, used = segments[0], rules["prefixes"]['@'], 1
+    elif first in rules["prefixes"]:
+        if len(segments) < 2:
+            return None
+        handle, kind, used = f"{first}/{segments[1]}", rules["prefixes"][first], 2
+    elif first in rules["excluded"] or rules["bare"] is None or '.php' in first:
+        return None
+    else:
+        handle, kind, used = segments[0], rules["bare"], 1
 
+    # Profil direct d'abord, puis sans paramètres, puis l'URL la plus courte
+    rank = (kind, len(segments) - used, bool(query), len(link))
+    return platform, handle, rank
+
+def _brand(domain):
+    # Nom de marque du domaine : "shop" pour www.shop.fr ou blog.shop.co.uk
+    labels = [label for label in (domain or '').lower().split(':')[0].split('.') if label and label != 'www']
+    if len(labels) >= 3 and labels[-2] in SECOND_LEVEL_LABELS:
+        brand = labels[-3]
+    else:
+        brand = labels[-2] if len(labels) >= 2 else ''.join(labels)
+    brand = NON_ALNUM.sub('', brand)
+    return brand if len(brand) >= 3 else ''
+
+def extract_social_profiles(unique_links, domain=None):
+    """
+    Tous les profils sociaux trouvés dans les liens, par plateforme, du plus au moins probable :
+    {"facebook": ["https://facebook.com/shop", ...], ...}.
+    Un seul passage sur les liens (aiguillage sur l'hôte puis règle de chemin de la plateforme) ;
+    les liens de partage / intent et les publications sont écartés.
+    Avec domain, les profils dont l'identifiant contient le nom du site passent en premier.
+    Un même profil (identifiant sans casse) n'apparaît qu'une fois, sous sa meilleure URL.
+    """
+    profiles = {platform: {} for platform in SOCIAL_PLATFORMS}
     if not unique_links:
         logger.warning("No links provided for social media extraction")
-        return social_links
+        return {platform: [] for platform in SOCIAL_PLATFORMS}
 
-    logger.info(f"Analyzing {len(unique_links)} links for social media presence")
+    with SOCIAL_SECONDS.time():
+        ranked = _rank_profiles(unique_links, _brand(domain), profiles)
+    found_platforms = [platform for platform, links in ranked.items() if links]
+    logger.info(f"Analyzed {len(unique_links)} links for social media presence, found profiles on: {', '.join(found_platforms) or 'none'}")
+    return ranked
 
+def _rank_profiles(unique_links, brand, profiles):
     for link in unique_links:
-        if not link:
+        # Aiguillage sur l'hôte (mémorisé) : les liens hors plateformes sociales s'arrêtent là
+        parts = link.split('/', 3) if link else ()
+        if len(parts) < 3 or platform_for_host(parts[2]) is None:
             continue
+        parsed = parse_social_link(link)
+        if parsed is None:
+            continue
+        platform, handle, rank = parsed
+        key = handle.lower()
+        if brand:
+            rank = (brand not in NON_ALNUM.sub('', key),) + rank
+        candidate = (rank, link.strip())
+        current = profiles[platform].get(key)
+        if current is None or candidate < current:
+            profiles[platform][key] = candidate
 
-        link = link.strip().lower()
-        for platform, pattern in patterns.items():
-            if social_links[platform]:
-                continue  # Skip if we already found a link for this platform
-
-            match = pattern.search(link)
-            if match:
-                social_links[platform] = link
-                logger.info(f"Found {platform} profile: {link}")
+    return {platform: [link for _, link in sorted(candidates.values())] for platform, candidates in profiles.items()}
 
-    # Log summary of found social links
-    found_platforms = [platform for platform, link in social_links.items() if link]
-    if found_platforms:
-        logger.info(f"Found social media profiles on: {', '.join(found_platforms)}")
-    else:
-        logger.info("No social media profiles found")
+def best_social_links(profiles):
+    """
+    Meilleur profil de chaque plateforme (None si aucun), au format de extract_social_links.
+    """
+    return {platform: links[0] if links else None for platform, links in profiles.items()}
 
-    return social_links
+def extract_social_links(unique_links, domain=None):
+    """
+    Extrait les liens des réseaux sociaux à partir d'une liste de liens.
+    Retourne le profil le plus probable de chaque plateforme (voir extract_social_profiles).
+    """
+    return best_social_links(extract_social_profiles(unique_links, domain))
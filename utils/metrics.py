@@ -0,0 +1,363 @@
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+import logging
+from config.settings import METRICS_DIR, METRICS_FLUSH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+CPU_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+class _Child:
+    """
+    Série d'une métrique pour des valeurs de labels fixées, à obtenir une fois (labels())
+    et à garder : sur le chemin critique, une mise à jour n'écrit que dans le
+    dictionnaire du thread courant, sans verrou.
+    """
+    __slots__ = ('registry', 'key')
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+
+    def inc(self, amount=1):
+        values = self.registry.thread_values()
+        values[self.key] = values.get(self.key, 0) + amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+class _HistogramChild(_Child):
+    __slots__ = ('bounds',)
+
+    def __init__(self, registry, key, bounds):
+        super().__init__(registry, key)
+        self.bounds = bounds
+
+    def observe(self, value):
+        values = self.registry.thread_values()
+        cell = values.get(self.key)
+        if cell is None:
+            # Compteurs par bucket (non cumulés), puis somme et nombre d'observations
+            cell = values[self.key] = [0] * (len(self.bounds) + 3)
+        cell[bisect.bisect_left(self.bounds, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def time(self):
+        return _Timer(self)
+
+class _Timer:
+    __slots__ = ('child', 'start')
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+class Metric:
+    """
+    Métrique déclarée dans le registre : counter, gauge ou histogram.
+    Sans labels, inc()/dec()/observe()/time() s'appliquent directement à la série unique.
+    """
+    def __init__(self, registry, kind, name, documentation, labels=(), buckets=None):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.bounds = tuple(buckets) if buckets else None
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    key = (self.name, values)
+                    if self.kind == 'histogram':
+                        child = _HistogramChild(self.registry, key, self.bounds)
+                    else:
+                        child = _Child(self.registry, key)
+                    self._children[values] = child
+        return child
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+class MetricsRegistry:
+    """
+    Registre de métriques du processus, exposé au format texte de Prometheus.
+    - chaque thread accumule dans son propre dictionnaire (pas de verrou sur le chemin critique) ;
+      collect() additionne les dictionnaires, ceux des threads terminés sont repliés dans un cumul
+    - gauge_function(): jauge calculée à la lecture (occupation des pools...)
+    - avec directory, chaque worker gunicorn écrit ses valeurs dans un fichier (flush()) et
+      render() agrège tous les workers : compteurs et histogrammes additionnés (workers
+      terminés compris), jauges additionnées sur les workers vivants
+    """
+    def __init__(self, directory=METRICS_DIR):
+        self.directory = directory
+        self.metrics = {}
+        self.functions = {}
+        self._lock = threading.Lock()
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Après un fork, les valeurs du parent ne sont pas attribuées à l'enfant
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._stores = []
+        self._retired = {}
+        self._flusher = None
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Metric(self, 'counter', name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        return self._register(Metric(self, 'gauge', name, documentation, labels))
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS, labels=()):
+        return self._register(Metric(self, 'histogram', name, documentation, labels, buckets))
+
+    def gauge_function(self, name, documentation, function):
+        """
+        Jauge sans label dont la valeur est lue à chaque collecte ; function peut retourner None.
+        """
+        self.functions[name] = (documentation, function)
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def thread_values(self):
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._stores.append((threading.current_thread(), values))
+            return values
+
+    def collect(self):
+        """
+        Valeurs du processus : {(nom, labels): valeur ou [buckets..., somme, nombre]}.
+        """
+        with self._lock:
+            totals = {}
+            _merge(totals, self._retired)
+            alive = []
+            for thread, values in self._stores:
+                snapshot = dict(list(values.items()))
+                _merge(totals, snapshot)
+                if thread.is_alive():
+                    alive.append((thread, values))
+                else:
+                    _merge(self._retired, snapshot)
+            self._stores = alive
+        for name, (_, function) in self.functions.items():
+            try:
+                value = function()
+            except Exception as e:
+                logger.warning(f"Metric {name} failed: {str(e)}")
+                value = None
+            if value is not None:
+                totals[(name, ())] = value
+        return totals
+
+    # Agrégation multi-processus
+
+    def _path(self, pid=None):
+        return os.path.join(self.directory, f"metrics-{os.getppid()}-{pid or os.getpid()}.json")
+
+    def flush(self):
+        """
+        Écrit les valeurs de ce worker dans son fichier (remplacement atomique).
+        """
+        if not self.directory:
+            return
+        values = [[name, list(labels), value] for (name, labels), value in self.collect().items()]
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path()
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w') as file:
+            json.dump({"pid": os.getpid(), "values": values}, file)
+        os.replace(temporary, path)
+
+    def start(self, interval=METRICS_FLUSH_INTERVAL):
+        """
+        Démarre l'écriture périodique des valeurs du worker (une fois par processus).
+        Les fichiers laissés par une instance précédente du serveur (autre processus parent)
+        sont supprimés ; ceux des workers redémarrés par le même parent sont gardés.
+        """
+        if not self.directory or self._flusher is not None:
+            return self
+        os.makedirs(self.directory, exist_ok=True)
+        prefix = f"metrics-{os.getppid()}-"
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            if not os.path.basename(path).startswith(prefix):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush()
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Unable to write metrics: {str(e)}")
+
+        self._flusher = threading.Thread(target=run, name='metrics-flush', daemon=True)
+        self._flusher.start()
+        return self
+
+    def _all_workers(self):
+        if not self.directory:
+            return [(True, self.collect())]
+        try:
+            self.flush()
+        except OSError as e:
+            logger.warning(f"Unable to write metrics: {str(e)}")
+        workers = []
+        for path in glob.glob(os.path.join(self.directory, f"metrics-{os.getppid()}-*.json")):
+            try:
+                with open(path) as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+            values = {(name, tuple(labels)): value for name, labels, value in data["values"]}
+            workers.append((_pid_alive(data["pid"]), values))
+        return workers
+
+    def render(self):
+        """
+        Toutes les métriques au format d'exposition texte de Prometheus (0.0.4).
+        """
+        totals = {}
+        for alive, values in self._all_workers():
+            if not alive:
+                values = {key: value for key, value in values.items() if self._kind(key[0]) != 'gauge'}
+            _merge(totals, values)
+
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            series = sorted((labels, value) for (series_name, labels), value in totals.items() if series_name == name)
+            for labels, value in series:
+                pairs = list(zip(metric.label_names, labels))
+                if metric.kind != 'histogram':
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.bounds + (float('inf'),), value):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(pairs + [('le', _number(bound))])} {_number(cumulative)}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(value[-2])}")
+                lines.append(f"{name}_count{_labels(pairs)} {_number(value[-1])}")
+        for name, (documentation, _) in self.functions.items():
+            if (name, ()) in totals:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_number(totals[(name, ())])}")
+        return '\n'.join(lines) + '\n'
+
+    def _kind(self, name):
+        metric = self.metrics.get(name)
+        return metric.kind if metric else 'gauge'
+
+def _merge(totals, values):
+    for key, value in values.items():
+        current = totals.get(key)
+        if current is None:
+            totals[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            totals[key] = [a + b for a, b in zip(current, value)]
+        else:
+            totals[key] = current + value
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+REGISTRY = MetricsRegistry()
+
+# Métriques partagées : les modules instrumentés gardent les séries dont ils ont besoin
+FETCH_SECONDS = REGISTRY.histogram(
+    'scraper_fetch_duration_seconds', 'Network download time of a page, headers and body.', LATENCY_BUCKETS)
+FETCH_BYTES = REGISTRY.histogram(
+    'scraper_fetch_bytes', 'Bytes downloaded per page body.', SIZE_BUCKETS)
+PARSE_SECONDS = REGISTRY.histogram(
+    'scraper_parse_duration_seconds', 'HTML parsing time of a page (incremental feed and document build).', CPU_BUCKETS)
+EXTRACTOR_SECONDS = REGISTRY.histogram(
+    'scraper_extractor_duration_seconds', 'Time spent in each extractor.', CPU_BUCKETS, labels=('extractor',))
+PAGES_FETCHED = REGISTRY.counter(
+    'scraper_pages_fetched_total', 'Pages obtained by the crawl engine, by source.', labels=('source',))
+CACHE_EVENTS = REGISTRY.counter(
+    'scraper_cache_events_total', 'Page and result cache lookups and stores.', labels=('cache', 'event'))
+ERRORS = REGISTRY.counter(
+    'scraper_errors_total', 'Errors by type.', labels=('type',))
+RETRIES = REGISTRY.counter(
+    'scraper_retries_total', 'Retried work items.', labels=('kind',))
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    'scraper_http_requests_in_flight', 'HTTP requests being served, by endpoint.', labels=('endpoint',))
+
+def get_metrics_registry():
+    """
+    Registre du processus, avec l'écriture périodique démarrée (voir MetricsRegistry.start).
+    """
+    if REGISTRY._flusher is None or REGISTRY._pid != os.getpid():
+        with REGISTRY._lock:
+            REGISTRY.start()
+    return REGISTRY
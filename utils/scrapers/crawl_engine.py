@@ -0,0 +1,346 @@
+import asyncio
+import atexit
+import codecs
+import os
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+import requests
+from config.settings import PARSE_WORKERS, CONNECT_TIMEOUT, REQUEST_TIMEOUT, MAX_PAGE_SIZE_MB, FETCH_CONCURRENCY
+from utils.extractors.document import Document, DocumentParser, build_document
+from utils.extractors.link_explorer import canonicalize_url
+from utils.scrapers.http_client import CHARSET_SNIFF_SIZE, create_async_session, detect_charset
+from utils.scrapers.page_cache import CacheEntry, entry_ttl, get_page_cache
+from utils.metrics import REGISTRY, FETCH_SECONDS, FETCH_BYTES, PARSE_SECONDS, PAGES_FETCHED, ERRORS
+
+logger = logging.getLogger(__name__)
+
+PAGES_FROM_CACHE = PAGES_FETCHED.labels('cache')
+PAGES_REVALIDATED = PAGES_FETCHED.labels('revalidated')
+PAGES_FROM_NETWORK = PAGES_FETCHED.labels('network')
+TIMEOUT_ERRORS = ERRORS.labels('timeout')
+NETWORK_ERRORS = ERRORS.labels('network')
+HTTP_ERRORS = {4: ERRORS.labels('http_4xx'), 5: ERRORS.labels('http_5xx')}
+
+class FetchError(requests.RequestException):
+    """
+    Erreur réseau du moteur asynchrone. Hérite de RequestException pour que les
+    appelants existants (link_scraper, analyze_links) la traitent comme avant.
+    """
+
+# Types de contenu analysés ; les autres réponses (images, PDF, binaires) ne sont pas téléchargées
+PARSED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain', '')
+
+class FetchDetails:
+    """
+    Informations sur un téléchargement, en plus du corps :
+    - truncated: corps coupé à max_bytes
+    - skipped: raison pour laquelle le corps n'a pas été téléchargé (type de contenu), sinon None
+    - document: Document déjà construit pendant le téléchargement, sinon None (parsé à la demande)
+    - parse_time: temps de parsing HTML pendant le téléchargement (secondes)
+    """
+    def __init__(self, truncated=False, skipped=None, document=None, parse_time=0.0):
+        self.truncated = truncated
+        self.skipped = skipped
+        self.document = document
+        self.parse_time = parse_time
+
+class CrawlEngine:
+    """
+    Moteur de fetch asynchrone partagé par tout le processus.
+
+    Une boucle asyncio tourne dans un thread dédié et porte la session aiohttp
+    (limites de concurrence globale et par hôte). Le parsing HTML et l'extraction
+    sont délégués à un pool de threads borné pour ne jamais bloquer la boucle.
+    - run(coro): façade synchrone, utilisable depuis Flask/gunicorn
+    - submit(coro): façade asynchrone, utilisable depuis une autre boucle (serveur ASGI)
+    Les corps sont lus par morceaux, bornés à max_bytes, et parsés au fil de l'eau.
+    Compteurs (modifiés uniquement depuis la boucle, lus par la sonde de santé) :
+    - fetches_in_flight: téléchargements en cours
+    - parse_backlog: traitements CPU en attente ou en cours dans le pool
+    - crawls_in_flight: crawls en cours (voir Crawler)
+    """
+    FEED_SIZE = 64 * 1024
+
+    def __init__(self, parse_workers=PARSE_WORKERS, cache=None, max_bytes=int(MAX_PAGE_SIZE_MB * 1024 * 1024)):
+        self._pid = os.getpid()
+        self.max_bytes = max_bytes
+        self.cache = cache if cache is not None else get_page_cache()
+        self.loop = asyncio.new_event_loop()
+        self.cpu_pool = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix='parse')
+        self._session = None
+        self.fetches_in_flight = 0
+        self.parse_backlog = 0
+        self.crawls_in_flight = 0
+        self._thread = threading.Thread(target=self._run_loop, name='crawl-engine', daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @property
+    def session(self):
+        # Créée à la demande dans la boucle du moteur
+        if self._session is None or self._session.closed:
+            self._session = create_async_session()
+        return self._session
+
+    def in_engine_thread(self):
+        return threading.current_thread() is self._thread
+
+    def run(self, coro, timeout=None):
+        """
+        Exécute une coroutine sur la boucle du moteur et attend son résultat.
+        """
+        if self.in_engine_thread():
+            coro.close()
+            raise RuntimeError("CrawlEngine.run() cannot be called from the engine loop, await the coroutine instead")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def submit(self, coro):
+        """
+        Équivalent asynchrone de run() pour un appelant tournant dans une autre boucle.
+        """
+        if self.in_engine_thread():
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    async def run_cpu(self, func, *args):
+        """
+        Délègue un traitement CPU (parsing, extraction) au pool borné.
+        """
+        self.parse_backlog += 1
+        try:
+            return await self.loop.run_in_executor(self.cpu_pool, func, *args)
+        finally:
+            self.parse_backlog -= 1
+
+    def is_alive(self):
+        return self._thread.is_alive() and self.loop.is_running()
+
+    def ping(self, timeout):
+        """
+        Latence de la boucle (secondes) : délai avant qu'elle exécute un rappel, None si elle ne répond pas.
+        """
+        answered = threading.Event()
+        start = time.monotonic()
+        self.loop.call_soon_threadsafe(answered.set)
+        if not answered.wait(timeout):
+            return None
+        return time.monotonic() - start
+
+    def stats(self):
+        return {
+            "fetches_in_flight": self.fetches_in_flight,
+            "parse_backlog": self.parse_backlog,
+            "crawls_in_flight": self.crawls_in_flight,
+        }
+
+    async def fetch(self, url, headers, timeout=None, max_age=None):
+        """
+        Retourne (url finale, statut, en-têtes, corps décodé, FetchDetails) en passant par le cache de pages.
+        - entrée fraîche (âge <= max_age, ou <= TTL de l'entrée si max_age est None) : pas de requête
+        - entrée périmée avec ETag/Last-Modified : requête conditionnelle, 304 = entrée réutilisée
+        - sinon téléchargement complet, stocké si la réponse est un 200 cacheable, complet et analysable
+        Lève FetchError en cas d'erreur réseau ou de timeout.
+        """
+        self.fetches_in_flight += 1
+        try:
+            return await self._fetch(url, headers, timeout, max_age)
+        finally:
+            self.fetches_in_flight -= 1
+
+    async def _fetch(self, url, headers, timeout, max_age):
+        if self.cache is None:
+            PAGES_FROM_NETWORK.inc()
+            return await self._download(url, headers, timeout)
+
+        key = canonicalize_url(url)
+        entry, tier = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None and entry.is_fresh(max_age):
+            self.cache.count(f"{tier}_hits")
+            PAGES_FROM_CACHE.inc()
+            return (*entry.as_response(), FetchDetails())
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            request_headers.update(entry.validation_headers())
+        final_url, status_code, response_headers, text, details = await self._download(url, request_headers, timeout)
+
+        if status_code == 304 and entry is not None:
+            self.cache.count("revalidated")
+            PAGES_REVALIDATED.inc()
+            entry.fetched_at = time.time()
+            entry.ttl = entry_ttl(response_headers, entry.ttl) or entry.ttl
+            await asyncio.to_thread(self.cache.put, key, entry)
+            return (*entry.as_response(), FetchDetails())
+
+        self.cache.count("misses")
+        PAGES_FROM_NETWORK.inc()
+        ttl = entry_ttl(response_headers)
+        if status_code == 200 and ttl and not (details.truncated or details.skipped):
+            entry = CacheEntry(final_url, status_code, response_headers, text, ttl=ttl)
+            await asyncio.to_thread(self.cache.put, key, entry)
+        return final_url, status_code, response_headers, text, details
+
+    async def _download(self, url, headers, timeout=None):
+        request_timeout = None
+        if timeout:
+            request_timeout = aiohttp.ClientTimeout(total=None, connect=min(CONNECT_TIMEOUT, timeout), sock_read=timeout)
+        start = time.perf_counter()
+        try:
+            async with self.session.get(url, headers=headers, allow_redirects=True, timeout=request_timeout) as response:
+                final_url, status_code, response_headers = str(response.url), response.status, dict(response.headers)
+                if status_code >= 400:
+                    HTTP_ERRORS[min(status_code // 100, 5)].inc()
+                # Sans Content-Type, aiohttp annonce application/octet-stream : on tente le parsing
+                content_type = response.content_type if 'Content-Type' in response.headers else ''
+                if content_type not in PARSED_CONTENT_TYPES:
+                    # Pas de téléchargement du corps : la connexion est fermée à la sortie du bloc
+                    logger.info(f"Skipping {url}: unsupported content type {content_type}")
+                    details = FetchDetails(skipped=f"content type {content_type}", document=Document())
+                    return final_url, status_code, response_headers, '', details
+                text, details = await self._read_body(url, response)
+                FETCH_SECONDS.observe(time.perf_counter() - start)
+                return final_url, status_code, response_headers, text, details
+        except asyncio.TimeoutError as e:
+            TIMEOUT_ERRORS.inc()
+            raise FetchError(f"Timeout fetching {url} (read timeout {timeout or REQUEST_TIMEOUT}s)") from e
+        except (aiohttp.ClientError, ValueError) as e:
+            NETWORK_ERRORS.inc()
+            raise FetchError(f"Error fetching {url}: {str(e)}") from e
+
+    async def _read_body(self, url, response):
+        """
+        Lit le corps par morceaux, au plus max_bytes, en alimentant le parser HTML
+        au fil du téléchargement. Le parsing tourne dans le pool CPU, jamais sur la
+        boucle : un seul feed à la fois par page, dans l'ordre, pendant que la boucle
+        lit le morceau suivant ; la construction du Document suit dans le pool.
+        Sans charset dans Content-Type, l'encodage est déduit des premiers octets
+        (voir detect_charset).
+        """
+        decoder = None
+        if response.charset:
+            try:
+                decoder = codecs.getincrementaldecoder(response.charset)(errors='replace')
+            except LookupError:
+                pass
+        head = b''
+        parser = DocumentParser()
+        feeding = None
+        parts, pending = [], []
+        size = pending_size = 0
+        truncated = False
+        # Temps de parsing mesuré dans le pool (sans l'attente dans sa file)
+        parse_time = 0.0
+
+        async for chunk in response.content.iter_chunked(self.FEED_SIZE):
+            if size + len(chunk) > self.max_bytes:
+                chunk = chunk[:self.max_bytes - size]
+                truncated = True
+            size += len(chunk)
+            if decoder is None:
+                # Encodage deviné sur les premiers octets, mis de côté jusque-là
+                head += chunk
+                if len(head) < CHARSET_SNIFF_SIZE and not truncated:
+                    continue
+                decoder = _body_decoder(response, head)
+                chunk, head = head, b''
+            pending.append(decoder.decode(chunk))
+            pending_size += len(chunk)
+            if pending_size >= self.FEED_SIZE or truncated:
+                text = ''.join(pending)
+                parts.append(text)
+                if feeding is not None:
+                    parse_time += await feeding
+                feeding = asyncio.ensure_future(self.run_cpu(_timed_call, parser.feed, text))
+                pending, pending_size = [], 0
+            if truncated:
+                logger.warning(f"Truncated {url} at {self.max_bytes} bytes")
+                break
+
+        if decoder is None:
+            decoder = _body_decoder(response, head)
+            pending.append(decoder.decode(head))
+        pending.append(decoder.decode(b'', final=True))
+        text = ''.join(pending)
+        parts.append(text)
+        if feeding is not None:
+            parse_time += await feeding
+        document, build_time = await self.run_cpu(_timed_finish, parser, text)
+        parse_time += build_time
+        PARSE_SECONDS.observe(parse_time)
+        FETCH_BYTES.observe(size)
+        return ''.join(parts), FetchDetails(truncated=truncated, document=document, parse_time=parse_time)
+
+    def shutdown(self):
+        if not self.loop.is_running():
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5)
+        self.cpu_pool.shutdown(wait=False)
+
+def _body_decoder(response, head):
+    return codecs.getincrementaldecoder(detect_charset(response, head))(errors='replace')
+
+def _timed_call(func, *args):
+    # Durée mesurée dans le thread du pool, sans l'attente dans la file
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def _timed_finish(parser, text):
+    start = time.perf_counter()
+    parser.feed(text)
+    document = build_document(parser.finish())
+    return document, time.perf_counter() - start
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def current_engine():
+    """
+    Moteur du processus s'il est déjà démarré, sans le créer (None sinon).
+    """
+    if _engine is None or _engine._pid != os.getpid():
+        return None
+    return _engine
+
+def _engine_stat(name):
+    engine = current_engine()
+    return engine.stats()[name] if engine is not None else None
+
+REGISTRY.gauge_function('scraper_fetches_in_flight', 'Downloads in progress in the crawl engine.',
+                        lambda: _engine_stat('fetches_in_flight'))
+REGISTRY.gauge_function('scraper_parse_backlog', 'CPU tasks queued or running in the parse pool.',
+                        lambda: _engine_stat('parse_backlog'))
+REGISTRY.gauge_function('scraper_crawls_in_flight', 'Crawls in progress.',
+                        lambda: _engine_stat('crawls_in_flight'))
+# Capacités des pools, sommées sur les workers comme les jauges ci-dessus (occupation = en cours / taille)
+REGISTRY.gauge_function('scraper_fetch_pool_size', 'Connection limit of the crawl engine (FETCH_CONCURRENCY).',
+                        lambda: FETCH_CONCURRENCY if current_engine() is not None else None)
+REGISTRY.gauge_function('scraper_parse_pool_size', 'Threads of the parse pool (PARSE_WORKERS).',
+                        lambda: PARSE_WORKERS if current_engine() is not None else None)
+
+def get_engine():
+    """
+    Moteur partagé du processus (recréé après un fork de gunicorn).
+    """
+    global _engine
+    if _engine is None or _engine._pid != os.getpid():
+        with _engine_lock:
+            if _engine is None or _engine._pid != os.getpid():
+                _engine = CrawlEngine()
+                atexit.register(_engine.shutdown)
+                logger.info("Crawl engine started")
+    return _engine
@@ -1,8 +1,20 @@
-import psutil
+import os
+import threading
+import time
+import logging
 from datetime import datetime
-import requests
 from typing import Dict, Any
-import os
+import psutil
+from config.settings import (
+    HEALTH_CHECK_TIMEOUT, HEALTH_SAMPLE_INTERVAL, READY_MAX_CRAWLS, READY_MAX_PARSE_BACKLOG,
+    READY_MAX_LOOP_LAG, READY_MAX_MEMORY_PERCENT
+)
+from utils.scrapers.crawl_engine import current_engine
+
+logger = logging.getLogger(__name__)
+
+# Un instantané plus vieux que STALE_SAMPLES intervalles : la sonde ne tourne plus
+STALE_SAMPLES = 3
 
 def get_memory_usage() -> Dict[str, Any]:
     """Récupère les informations d'utilisation de la mémoire"""
@@ -15,41 +27,131 @@ def get_memory_usage() -> Dict[str, Any]:
     }
 
 def get_cpu_usage() -> Dict[str, Any]:
-    """Récupère les informations d'utilisation du CPU"""
+    """Utilisation du CPU depuis l'appel précédent (non bloquant)"""
     return {
-        "percent": psutil.cpu_percent(interval=1),
-    # Removed load as it's not available on Windows
+        "percent": psutil.cpu_percent(interval=None),
     }
 
-def check_scraper_service() -> Dict[str, Any]:
-    """Vérifie l'état du service de scraping"""
-    try:
-        # Test avec une URL simple et rapide
-        test_url = "http://example.com"
-        response = requests.get(test_url, timeout=5)
-        
-        return {
-            "status": "healthy" if response.status_code == 200 else "unhealthy",
-            "last_check": datetime.utcnow().isoformat(),
-            "response_time": response.elapsed.total_seconds()
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "last_check": datetime.utcnow().isoformat(),
-            "error": str(e)
+def get_engine_health() -> Dict[str, Any]:
+    """État du moteur de crawl : boucle vivante, latence, files internes"""
+    engine = current_engine()
+    if engine is None:
+        # Démarré au premier scraping : rien à vérifier avant
+        return {"status": "idle", "fetches_in_flight": 0, "parse_backlog": 0, "crawls_in_flight": 0}
+    if not engine.is_alive():
+        return {"status": "unhealthy", "error": "crawl engine loop stopped", **engine.stats()}
+    lag = engine.ping(HEALTH_CHECK_TIMEOUT)
+    if lag is None:
+        return {"status": "unhealthy", "error": f"crawl engine loop unresponsive for {HEALTH_CHECK_TIMEOUT}s", **engine.stats()}
+    return {"status": "healthy", "loop_lag": round(lag, 4), **engine.stats()}
+
+def readiness_problems(snapshot: Dict[str, Any]) -> list:
+    """
+    Raisons pour lesquelles l'instance ne doit pas recevoir de nouvelles requêtes (liste vide = prête).
+    """
+    engine = snapshot["components"]["crawl_engine"]
+    memory = snapshot["components"]["system"]["memory"]
+    problems = []
+    if engine["status"] == "unhealthy":
+        problems.append(engine["error"])
+    elif engine.get("loop_lag", 0) > READY_MAX_LOOP_LAG:
+        problems.append(f"crawl engine loop lag {engine['loop_lag']}s")
+    if engine["crawls_in_flight"] >= READY_MAX_CRAWLS:
+        problems.append(f"{engine['crawls_in_flight']} crawls in flight")
+    if engine["parse_backlog"] >= READY_MAX_PARSE_BACKLOG:
+        problems.append(f"parse backlog {engine['parse_backlog']}")
+    if memory["percent"] > READY_MAX_MEMORY_PERCENT:
+        problems.append(f"memory {memory['percent']}%")
+    return problems
+
+class HealthSampler:
+    """
+    Sonde de santé en arrière-plan : toutes les interval secondes, un thread relève
+    CPU, mémoire et état du moteur de crawl dans un instantané. /livez et /readyz
+    répondent depuis cet instantané, sans attente ni requête sortante.
+    """
+    def __init__(self, interval=HEALTH_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._pid = os.getpid()
+        self._snapshot = None
+        self._sampled_at = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='health-sampler', daemon=True)
+
+    def start(self):
+        # Premier relevé de référence pour cpu_percent, puis instantané immédiat
+        psutil.cpu_percent(interval=None)
+        self.sample()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Health sampling failed: {str(e)}")
+
+    def sample(self):
+        snapshot = {
+            "components": {
+                "crawl_engine": get_engine_health(),
+                "system": {
+                    "memory": get_memory_usage(),
+                    "cpu": get_cpu_usage(),
+                    "process_rss": f"{psutil.Process().memory_info().rss / (1024 * 1024):.2f}MB",
+                },
+            },
+            "timestamp": datetime.utcnow().isoformat(),
         }
+        problems = readiness_problems(snapshot)
+        snapshot["status"] = "unhealthy" if problems else "healthy"
+        snapshot["problems"] = problems
+        # Remplacement atomique : les lecteurs voient l'ancien ou le nouvel instantané
+        self._snapshot, self._sampled_at = snapshot, time.monotonic()
+        return snapshot
+
+    def age(self):
+        return time.monotonic() - self._sampled_at
+
+    def is_stale(self):
+        return self._snapshot is None or self.age() > self.interval * STALE_SAMPLES
+
+    def live(self):
+        """
+        Vivacité : la sonde tourne et le moteur de crawl n'est pas bloqué.
+        """
+        if self.is_stale():
+            return False
+        return self._snapshot["components"]["crawl_engine"]["status"] != "unhealthy"
+
+    def ready(self):
+        """
+        Disponibilité : vivant, et files internes / crawls en cours / mémoire sous leurs seuils.
+        """
+        return self.live() and not self._snapshot["problems"]
+
+    def snapshot(self):
+        return {**self._snapshot, "age": round(self.age(), 3)}
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def get_health_sampler():
+    """
+    Sonde du processus, démarrée au premier appel (et de nouveau après un fork de gunicorn).
+    """
+    global _sampler
+    if _sampler is None or _sampler._pid != os.getpid():
+        with _sampler_lock:
+            if _sampler is None or _sampler._pid != os.getpid():
+                _sampler = HealthSampler().start()
+                logger.info(f"Health sampler started (every {_sampler.interval}s)")
+    return _sampler
 
 def get_system_health() -> Dict[str, Any]:
-    """Récupère l'état de santé complet du système"""
-    return {
-        "status": "healthy",
-        "components": {
-            "scraper_service": check_scraper_service(),
-            "system": {
-                "memory": get_memory_usage(),
-                "cpu": get_cpu_usage()
-            }
-        },
-        "timestamp": datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+    """Dernier état de santé relevé par la sonde"""
+    return get_health_sampler().snapshot()
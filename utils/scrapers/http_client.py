@@ -0,0 +1,44 @@
+import codecs
+import re
+import aiohttp
+from config.settings import REQUEST_TIMEOUT, CONNECT_TIMEOUT, FETCH_CONCURRENCY, FETCH_PER_HOST_LIMIT
+
+# Octets lus pour deviner l'encodage d'un corps sans charset (BOM, <meta charset>)
+CHARSET_SNIFF_SIZE = 4096
+BOMS = ((codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+# <meta charset="..."> et <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([a-zA-Z0-9_:.\-]+)', re.IGNORECASE)
+
+def detect_charset(response, body):
+    """
+    Encodage d'un corps dont le Content-Type n'a pas de charset (fallback_charset_resolver
+    d'aiohttp) : BOM, puis <meta charset> dans les premiers octets, puis utf-8 si le
+    début du corps est de l'UTF-8 valide, sinon windows-1252 (pages latin-1).
+    """
+    head = bytes(body[:CHARSET_SNIFF_SIZE])
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    match = META_CHARSET.search(head)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+    try:
+        # Décodeur incrémental : un caractère coupé en fin d'extrait n'est pas une erreur
+        codecs.getincrementaldecoder('utf-8')().decode(head)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+def create_async_session(concurrency=FETCH_CONCURRENCY, per_host=FETCH_PER_HOST_LIMIT):
+    """
+    Session aiohttp non bloquante pour le moteur de crawl.
+    Le connecteur plafonne les connexions simultanées globalement et par hôte,
+    et garde les connexions keep-alive. Doit être appelée dans la boucle d'événements
+    qui l'utilisera. Les corps sans charset sont décodés d'après detect_charset.
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=None, connect=CONNECT_TIMEOUT, sock_read=REQUEST_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, fallback_charset_resolver=detect_charset)
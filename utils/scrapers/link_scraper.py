@@ -1,9 +1,9 @@
-from bs4 import BeautifulSoup
 import requests
 from urllib.parse import urlparse
 import logging
-import json
-from utils.extractors.link_explorer import extract_links, is_same_domain, normalize_url
+from utils.extractors.link_explorer import extract_link_contexts, is_same_domain, normalize_url
+from utils.analyzers.link_scorer import rank_links
+from utils.scrapers.page_store import PageStore
 
 logger = logging.getLogger(__name__)
 
@@ -17,33 +17,33 @@ def is_valid_url(url):
     except Exception:
         return False
 
-def extract_links_jsonld(soup, base_url):
+def extract_links_jsonld(document, base_url):
     """
-    Extrait les liens du JSON-LD sans filtrage par domaine.
+    Extrait les liens sameAs du JSON-LD sans filtrage par domaine.
     """
     links = set()
-    scripts = soup.find_all("script", type="application/ld+json")
-    for script in scripts:
-        try:
-            if script.string:
-                data = json.loads(script.string)
-                if "sameAs" in data:
-                    for link in data["sameAs"]:
-                        if link:
-                            normalized_url = normalize_url(link, base_url)
-                            if normalized_url and is_valid_url(normalized_url):
-                                links.add(normalized_url)
-        except (json.JSONDecodeError, TypeError) as e:
-            logger.warning(f"Error parsing JSON-LD: {str(e)}")
+    for data in document.jsonld:
+        same_as = data.get("sameAs") if isinstance(data, dict) else None
+        if isinstance(same_as, str):
+            same_as = [same_as]
+        if not isinstance(same_as, list):
             continue
+        for link in same_as:
+            if link and isinstance(link, str):
+                normalized_url = normalize_url(link, base_url)
+                if normalized_url and is_valid_url(normalized_url):
+                    links.add(normalized_url)
     return links
 
-def link_scraper(url, headers, max_link=None):
+def link_scraper(url, headers, max_link=None, store=None, extra_links=None, robots=None):
     """
     Scrape les liens d'une page web.
     Retourne deux ensembles de liens :
     1. Les liens du même domaine pour l'exploration
     2. Tous les liens valides pour l'extraction des réseaux sociaux
+    La page est lue depuis le PageStore de la requête s'il est fourni.
+    extra_links (ex: liens des sitemaps) rejoignent les liens du domaine avant le classement ;
+    avec robots, les liens interdits par robots.txt sont écartés avant la troncature.
     """
     if not url or not is_valid_url(url):
         logger.error(f"Invalid URL provided: {url}")
@@ -53,29 +53,36 @@ def link_scraper(url, headers, max_link=None):
         # Extraire le domaine de l'URL
         domain = urlparse(url).netloc
         
-        # Faire la requête HTTP
+        # Faire la requête HTTP (ou relire la page déjà téléchargée)
         logger.info(f"Requesting URL: {url}")
-        response = requests.get(url, headers=headers, timeout=60)
-        response.raise_for_status()
+        if store is None:
+            store = PageStore(headers)
+        page = store.get(url)
+        page.raise_for_status()
         
         # Log de la réponse
-        logger.info(f"Response status: {response.status_code}")
-        if response.status_code == 200:
+        logger.info(f"Response status: {page.status_code}")
+        if page.status_code == 200:
             logger.info("HTML fetch successful")
             
-        # Parser le HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Document parsé une seule fois, partagé avec les autres étapes
+        document = page.document
         
         # Extraire tous les liens sans filtrage de domaine
-        all_links = extract_links(soup, url)
-        jsonld_links = extract_links_jsonld(soup, url)
+        link_contexts = extract_link_contexts(document, url)
+        all_links = set(link_contexts)
+        jsonld_links = extract_links_jsonld(document, url)
         all_links.update(jsonld_links)
         
         # Filtrer les liens par domaine pour l'exploration
         domain_links = {link for link in all_links if is_same_domain(link, domain)}
+        domain_links.update(link for link in extra_links or () if is_valid_url(link) and is_same_domain(link, domain))
+        if robots is not None:
+            domain_links = {link for link in domain_links if robots.can_fetch(link)}
         
-        # Convertir en liste et positionner l'URL racine en premier
-        domain_links = [url] + [link for link in domain_links if link != url]
+        # Positionner l'URL racine en premier, puis les pages les plus susceptibles
+        # de contenir des coordonnées (contact, mentions légales...) avant la troncature
+        domain_links = [url] + rank_links([link for link in domain_links if link != url], domain, link_contexts)
         
         # Limiter le nombre de liens si nécessaire
         if max_link and max_link > 0:
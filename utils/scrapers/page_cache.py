@@ -0,0 +1,284 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+import logging
+from collections import OrderedDict
+from config.settings import (
+    PAGE_CACHE_ENABLED, PAGE_CACHE_DIR, PAGE_CACHE_TTL,
+    PAGE_CACHE_MEMORY_ENTRIES, PAGE_CACHE_MEMORY_MB, PAGE_CACHE_DISK_ENTRIES, PAGE_CACHE_DISK_MB
+)
+from utils.metrics import CACHE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_EVENTS = {
+    name: CACHE_EVENTS.labels('page', name) for name in ("memory_hits", "disk_hits", "misses", "revalidated", "stores")
+}
+
+def get_header(headers, name):
+    """
+    Lecture insensible à la casse d'un en-tête dans un dict simple.
+    """
+    name = name.lower()
+    return next((value for key, value in headers.items() if key.lower() == name), None)
+
+class CacheEntry:
+    """
+    Page mise en cache avec ses validateurs HTTP (ETag / Last-Modified).
+    """
+    def __init__(self, final_url, status_code, headers, text, fetched_at=None, ttl=PAGE_CACHE_TTL):
+        self.final_url = final_url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.fetched_at = fetched_at or time.time()
+        self.ttl = ttl
+        # Taille en octets (UTF-8) du corps, pour le plafond PAGE_CACHE_MEMORY_MB :
+        # len(text) compte des caractères, jusqu'à 4 octets chacun
+        self.size = len(text.encode('utf-8'))
+
+    @property
+    def etag(self):
+        return get_header(self.headers, 'ETag')
+
+    @property
+    def last_modified(self):
+        return get_header(self.headers, 'Last-Modified')
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, max_age=None):
+        """
+        Fraîcheur selon le max_age demandé par l'appelant, sinon selon le TTL de l'entrée.
+        """
+        limit = self.ttl if max_age is None else max_age
+        return self.age() <= limit
+
+    def validation_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def as_response(self):
+        return self.final_url, self.status_code, self.headers, self.text
+
+def entry_ttl(headers, default=PAGE_CACHE_TTL):
+    """
+    TTL d'une réponse : Cache-Control max-age s'il est présent, sinon le TTL par défaut.
+    Retourne None si la réponse ne doit pas être stockée (no-store).
+    """
+    cache_control = (get_header(headers, 'Cache-Control') or '').lower()
+    if 'no-store' in cache_control:
+        return None
+    for directive in cache_control.split(','):
+        name, _, value = directive.strip().partition('=')
+        if name == 'max-age' and value.isdigit():
+            return int(value)
+    return default
+
+class MemoryTier:
+    """
+    Cache LRU en mémoire, borné en nombre d'entrées et en taille totale.
+    """
+    def __init__(self, max_entries=PAGE_CACHE_MEMORY_ENTRIES, max_bytes=PAGE_CACHE_MEMORY_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.size
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+class SqliteTier:
+    """
+    Cache sur disque (SQLite en mode WAL) partagé entre les workers gunicorn.
+    Les corps sont compressés ; l'éviction supprime les entrées les moins récemment lues.
+    """
+    EVICTION_INTERVAL = 32
+
+    def __init__(self, path, max_entries=PAGE_CACHE_DISK_ENTRIES, max_bytes=PAGE_CACHE_DISK_MB * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        connection = self._connection()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                final_url TEXT,
+                status_code INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                fetched_at REAL,
+                ttl REAL,
+                accessed_at REAL
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)")
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT final_url, status_code, headers, body, fetched_at, ttl FROM pages WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._connection().execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        final_url, status_code, headers, body, fetched_at, ttl = row
+        return CacheEntry(
+            final_url, status_code, json.loads(headers),
+            zlib.decompress(body).decode('utf-8'), fetched_at, ttl
+        )
+
+    def put(self, key, entry):
+        body = zlib.compress(entry.text.encode('utf-8'), 6)
+        if len(body) > self.max_bytes:
+            return
+        self._connection().execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, entry.final_url, entry.status_code, json.dumps(entry.headers), body,
+             len(body), entry.fetched_at, entry.ttl, time.time())
+        )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.EVICTION_INTERVAL == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """
+        Ramène le cache sous les limites de nombre d'entrées et de taille.
+        """
+        connection = self._connection()
+        count, total = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        while count > self.max_entries or total > self.max_bytes:
+            # Excédent d'entrées, ou ~10% des entrées si seule la taille dépasse
+            batch = count - self.max_entries if count > self.max_entries else max(1, count // 10)
+            deleted = connection.execute(
+                "DELETE FROM pages WHERE key IN (SELECT key FROM pages ORDER BY accessed_at LIMIT ?)", (batch,)
+            ).rowcount
+            if not deleted:
+                break
+            self.evictions += deleted
+            count, total = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+
+    def stats(self):
+        count, total = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        return {"entries": count, "bytes": total, "evictions": self.evictions}
+
+class PageCache:
+    """
+    Cache de pages à deux niveaux : LRU en mémoire puis SQLite sur disque.
+    Les compteurs permettent de dimensionner le cache (voir /cache/stats).
+    """
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory or MemoryTier()
+        self.disk = disk
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "revalidated": 0, "stores": 0}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+        PAGE_CACHE_EVENTS[name].inc()
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry, 'memory'
+        if self.disk is not None:
+            try:
+                entry = self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Page cache read failed for {key}: {str(e)}")
+                entry = None
+            if entry is not None:
+                self.memory.put(key, entry)
+                return entry, 'disk'
+        return None, None
+
+    def put(self, key, entry):
+        self.memory.put(key, entry)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, entry)
+            except sqlite3.Error as e:
+                logger.warning(f"Page cache write failed for {key}: {str(e)}")
+        self.count("stores")
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        hits = counters["memory_hits"] + counters["disk_hits"] + counters["revalidated"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory": {"entries": len(self.memory), "bytes": self.memory.bytes, "evictions": self.memory.evictions},
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_page_cache():
+    """
+    Cache de pages du processus, ou None si PAGE_CACHE_ENABLED est désactivé.
+    """
+    global _cache
+    if not PAGE_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                disk = None
+                if PAGE_CACHE_DIR:
+                    try:
+                        os.makedirs(PAGE_CACHE_DIR, exist_ok=True)
+                        disk = SqliteTier(os.path.join(PAGE_CACHE_DIR, 'pages.sqlite3'))
+                    except (OSError, sqlite3.Error) as e:
+                        logger.warning(f"Disk page cache unavailable, memory only: {str(e)}")
+                _cache = PageCache(disk=disk)
+    return _cache
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+import logging
+import requests
+from utils.extractors.link_explorer import canonicalize_url
+from utils.extractors.document import parse_document
+from utils.scrapers.crawl_engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+def _consume_exception(future):
+    # Les erreurs sont relevées aux appelants ; évite l'avertissement asyncio
+    # pour un téléchargement que plus personne n'attend.
+    if not future.cancelled():
+        future.exception()
+
+class Page:
+    """
+    Page téléchargée une seule fois et partagée entre les étapes d'un scraping
+    (découverte des liens, domaine racine, analyse des contacts).
+    """
+    def __init__(self, url, final_url, status_code, headers, text, truncated=False, skipped=None, document=None):
+        self.url = url
+        self.final_url = final_url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        # Corps coupé à MAX_PAGE_SIZE_MB / non téléchargé (raison), voir FetchDetails
+        self.truncated = truncated
+        self.skipped = skipped
+        self._document = document
+        self._document_lock = threading.Lock()
+
+    @property
+    def document(self):
+        """
+        Document (texte, liens, JSON-LD...) parsé à la demande, une seule fois par page.
+        """
+        if self._document is None:
+            with self._document_lock:
+                if self._document is None:
+                    self._document = parse_document(self.text)
+        return self._document
+
+    def raise_for_status(self):
+        """
+        Même contrat que requests.Response.raise_for_status.
+        """
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.final_url}")
+
+class PageStore:
+    """
+    Stockage des pages le temps d'une requête /scrape, indexé par URL canonique.
+    Chaque URL est téléchargée au plus une fois : les appels concurrents attendent
+    le même téléchargement sur la boucle du moteur de crawl.
+    trace: Trace optionnelle de la requête (timings=true), reprise par le crawler.
+    """
+    def __init__(self, headers, timeout=None, engine=None, max_age=None, trace=None):
+        self.headers = headers
+        self.timeout = timeout
+        # Âge max accepté pour une page du cache persistant (None = TTL de l'entrée)
+        self.max_age = max_age
+        self.engine = engine or get_engine()
+        self.trace = trace
+        self._pages = {}
+
+    async def fetch(self, url):
+        """
+        Retourne la page pour l'URL (coroutine, à exécuter sur la boucle du moteur).
+        Les erreurs réseau sont mémorisées et relevées à chaque appel.
+        """
+        key = canonicalize_url(url)
+        future = self._pages.get(key)
+        if future is None:
+            future = self._pages[key] = asyncio.ensure_future(self._download(url))
+            future.add_done_callback(_consume_exception)
+        # shield: l'annulation d'un appelant n'annule pas le téléchargement partagé
+        return await asyncio.shield(future)
+
+    def get(self, url):
+        """
+        Façade synchrone de fetch().
+        """
+        return self.engine.run(self.fetch(url))
+
+    def prefetch(self, url):
+        """
+        Lance le téléchargement de la page sans l'attendre ; get() et fetch() le réutilisent.
+        """
+        asyncio.run_coroutine_threadsafe(self.fetch(url), self.engine.loop)
+
+    def cancel_pending(self):
+        """
+        Annule les téléchargements encore en cours (arrêt anticipé du crawl).
+        À appeler depuis la boucle du moteur.
+        """
+        cancelled = 0
+        for future in self._pages.values():
+            if not future.done():
+                future.cancel()
+                cancelled += 1
+        return cancelled
+
+    def report(self):
+        """
+        Pages tronquées ou ignorées pendant la requête :
+        ([url, ...], [{"url", "reason"}, ...]), triées par URL.
+        """
+        pages = {}
+        for future in self._pages.values():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                page = future.result()
+                pages[page.url] = page
+        truncated = sorted(url for url, page in pages.items() if page.truncated)
+        skipped = [{"url": url, "reason": pages[url].skipped} for url in sorted(pages) if pages[url].skipped]
+        return truncated, skipped
+
+    def __contains__(self, url):
+        return canonicalize_url(url) in self._pages
+
+    def __len__(self):
+        return len(self._pages)
+
+    async def _download(self, url):
+        logger.info(f"Fetching page: {url}")
+        start = time.perf_counter()
+        final_url, status_code, headers, text, details = await self.engine.fetch(url, self.headers, self.timeout, self.max_age)
+        if self.trace is not None:
+            end = time.perf_counter()
+            self.trace.add('fetch', start, end, url=url, status=status_code, bytes=len(text))
+            if details.parse_time:
+                # Parsing entrelacé avec le téléchargement : durée cumulée, placée en fin de fetch
+                self.trace.add('parse', end - details.parse_time, end, url=url)
+        page = Page(
+            url=url, final_url=final_url, status_code=status_code, headers=headers, text=text,
+            truncated=details.truncated, skipped=details.skipped, document=details.document
+        )
+        # Après une redirection, la page est aussi accessible par son URL finale
+        final_key = canonicalize_url(final_url)
+        if final_key not in self._pages:
+            alias = asyncio.get_running_loop().create_future()
+            alias.set_result(page)
+            self._pages[final_key] = alias
+        return page
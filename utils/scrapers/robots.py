@@ -0,0 +1,163 @@
+import asyncio
+import os
+import re
+import time
+import logging
+from collections import OrderedDict
+from urllib.parse import urlsplit
+import aiohttp
+from config.settings import ROBOTS_CACHE_TTL, ROBOTS_MAX_CRAWL_DELAY, CONNECT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Taille lue au plus (la RFC 9309 impose d'en analyser au moins 500 Kio)
+ROBOTS_MAX_SIZE = 512 * 1024
+# robots.txt injoignable (5xx, réseau) : aucune règle, redemandé plus tôt
+ROBOTS_ERROR_TTL = 60
+ROBOTS_CACHE_SIZE = 1024
+ROBOTS_TIMEOUT = 10
+
+class RobotsRules:
+    """
+    Règles robots.txt d'un hôte pour notre agent (RFC 9309).
+    - rules: (chemin, autorisé) ; la règle la plus longue qui correspond l'emporte, Allow en cas d'égalité
+    - crawl_delay: délai demandé entre deux requêtes (secondes, plafonné à ROBOTS_MAX_CRAWL_DELAY) ou None
+    - sitemaps: URLs des directives Sitemap
+    """
+    def __init__(self, rules=(), crawl_delay=None, sitemaps=()):
+        self.crawl_delay = min(crawl_delay, ROBOTS_MAX_CRAWL_DELAY) if crawl_delay else None
+        self.sitemaps = list(sitemaps)
+        # Du plus long au plus court, Allow d'abord : la première règle qui correspond décide
+        ordered = sorted(rules, key=lambda rule: (-len(rule[0]), not rule[1]))
+        self._rules = [(_compile_rule(path), allowed) for path, allowed in ordered]
+
+    def can_fetch(self, url):
+        parts = urlsplit(url)
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        for matches, allowed in self._rules:
+            if matches(path):
+                return allowed
+        return True
+
+    def __len__(self):
+        return len(self._rules)
+
+def _compile_rule(path):
+    # Sans joker, un simple préfixe ; sinon '*' = n'importe quelle suite, '$' final = fin du chemin
+    if '*' not in path and not path.endswith('$'):
+        return lambda value: value.startswith(path)
+    anchored = path.endswith('$')
+    pattern = '.*'.join(re.escape(part) for part in path.rstrip('$').split('*'))
+    return re.compile(pattern + ('$' if anchored else '')).match
+
+def parse_robots(text, agent='*'):
+    """
+    Analyse un robots.txt : groupes de l'agent (nom contenu dans la ligne User-agent,
+    sans casse), à défaut ceux de '*'. Les groupes d'un même agent sont fusionnés.
+    """
+    agent = agent.lower()
+    groups, sitemaps = [], []
+    current, in_agents = None, False
+    for line in text.splitlines():
+        key, separator, value = line.split('#', 1)[0].partition(':')
+        if not separator:
+            continue
+        key, value = key.strip().lower(), value.strip()
+        if key == 'sitemap':
+            if value:
+                sitemaps.append(value)
+        elif key == 'user-agent':
+            # Plusieurs lignes User-agent consécutives partagent le même groupe
+            if not in_agents:
+                current = {"agents": [], "rules": [], "crawl_delay": None}
+                groups.append(current)
+                in_agents = True
+            current["agents"].append(value.lower())
+            continue
+        elif current is None:
+            continue
+        elif key in ('allow', 'disallow') and value:
+            current["rules"].append((value, key == 'allow'))
+        elif key == 'crawl-delay':
+            try:
+                current["crawl_delay"] = float(value)
+            except ValueError:
+                pass
+        in_agents = False
+
+    selected = [
+        group for group in groups
+        if agent != '*' and any(name not in ('', '*') and name in agent for name in group["agents"])
+    ] or [group for group in groups if '*' in group["agents"]]
+    rules = [rule for group in selected for rule in group["rules"]]
+    delays = [group["crawl_delay"] for group in selected if group["crawl_delay"]]
+    return RobotsRules(rules, max(delays) if delays else None, sitemaps)
+
+def robots_url(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/robots.txt"
+
+class RobotsCache:
+    """
+    robots.txt par origine (schéma + hôte), gardés ttl secondes (error_ttl si le serveur
+    ou le réseau est en erreur), au plus max_entries.
+    Utilisé depuis la boucle du moteur de crawl : les demandes simultanées d'une même
+    origine attendent le même téléchargement.
+    """
+    def __init__(self, ttl=ROBOTS_CACHE_TTL, max_entries=ROBOTS_CACHE_SIZE, error_ttl=ROBOTS_ERROR_TTL):
+        self._pid = os.getpid()
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    async def get(self, session, url, headers=None):
+        """
+        RobotsRules de l'hôte de l'URL. Ne lève pas d'erreur : sans robots.txt lisible, tout est autorisé.
+        """
+        key = robots_url(url)
+        entry = self._entries.get(key)
+        if entry is None or (entry.done() and entry.result()[1] <= time.monotonic()):
+            entry = self._entries[key] = asyncio.ensure_future(self._download(session, key, headers))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        rules, _ = await asyncio.shield(entry)
+        return rules
+
+    async def _download(self, session, url, headers):
+        timeout = aiohttp.ClientTimeout(total=ROBOTS_TIMEOUT, connect=CONNECT_TIMEOUT)
+        try:
+            async with session.get(url, headers=headers, allow_redirects=True, timeout=timeout) as response:
+                if 400 <= response.status < 500:
+                    # Pas de robots.txt : tout est autorisé
+                    return RobotsRules(), time.monotonic() + self.ttl
+                if response.status != 200:
+                    logger.warning(f"Unable to read {url}: HTTP {response.status}")
+                    return RobotsRules(), time.monotonic() + self.error_ttl
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    body.extend(chunk)
+                    if len(body) >= ROBOTS_MAX_SIZE:
+                        break
+                rules = parse_robots(bytes(body[:ROBOTS_MAX_SIZE]).decode(response.charset or 'utf-8', errors='replace'))
+                logger.info(f"Loaded {url}: {len(rules)} rules, crawl-delay {rules.crawl_delay}, {len(rules.sitemaps)} sitemaps")
+                return rules, time.monotonic() + self.ttl
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning(f"Unable to read {url}: {str(e)}")
+            return RobotsRules(), time.monotonic() + self.error_ttl
+
+    def __len__(self):
+        return len(self._entries)
+
+_robots_cache = None
+
+def get_robots_cache():
+    """
+    Cache robots.txt du processus (recréé après un fork, comme le moteur de crawl).
+    """
+    global _robots_cache
+    if _robots_cache is None or _robots_cache._pid != os.getpid():
+        _robots_cache = RobotsCache()
+    return _robots_cache
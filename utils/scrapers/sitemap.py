@@ -0,0 +1,197 @@
+import asyncio
+import heapq
+import zlib
+import logging
+from urllib.parse import urlsplit
+import aiohttp
+from lxml import etree
+from config.settings import SITEMAP_MAX_URLS, SITEMAP_MAX_FILES, CONNECT_TIMEOUT, REQUEST_TIMEOUT
+from utils.analyzers.link_scorer import link_priority
+from utils.extractors.link_explorer import canonicalize_url, is_same_domain
+from utils.scrapers.link_scraper import is_valid_url
+from utils.scrapers.robots import get_robots_cache
+
+logger = logging.getLogger(__name__)
+
+# Limite du protocole sitemaps (taille non compressée d'un fichier)
+SITEMAP_MAX_FILE_SIZE = 50 * 1024 * 1024
+SITEMAP_CHUNK_SIZE = 64 * 1024
+# Durée max de la découverte (robots.txt et sitemaps), tous fichiers confondus
+SITEMAP_TIME_LIMIT = 15
+GZIP_MAGIC = b'\x1f\x8b'
+# Sitemaps du catalogue (Shopify, WooCommerce, Yoast...) : lus après les pages du site
+CATALOG_SITEMAP_HINTS = ('product', 'collection', 'categor', 'tag', 'image', 'video', 'author')
+
+class SitemapParser:
+    """
+    Parser incrémental d'un fichier sitemap (urlset ou sitemapindex), compressé gzip ou non.
+    feed(morceau) retourne les entrées complètes du morceau : ('page', url) ou ('sitemap', url).
+    Les entrées lues sont retirées de l'arbre : la mémoire reste bornée quelle que soit la taille
+    du fichier. truncated passe à True au-delà de max_size octets décompressés.
+    """
+    def __init__(self, max_size=SITEMAP_MAX_FILE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.truncated = False
+        self._parser = etree.XMLPullParser(events=('end',), resolve_entities=False, no_network=True)
+        self._head = b''
+        self._gzip = None
+
+    def feed(self, chunk):
+        if self.truncated:
+            return []
+        if self._gzip is None:
+            # Compression détectée sur les premiers octets (.xml.gz servi sans Content-Encoding)
+            self._head += chunk
+            if len(self._head) < len(GZIP_MAGIC):
+                return []
+            chunk, self._head = self._head, b''
+            self._gzip = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk.startswith(GZIP_MAGIC) else False
+        remaining = self.max_size - self.size
+        if self._gzip:
+            # Décompression bornée : protège contre les archives piégées
+            chunk = self._gzip.decompress(chunk, remaining)
+        else:
+            chunk = chunk[:remaining]
+        self.size += len(chunk)
+        self.truncated = self.size >= self.max_size
+        if not chunk:
+            return []
+        self._parser.feed(chunk)
+        return self._entries()
+
+    def _entries(self):
+        entries = []
+        for _, element in self._parser.read_events():
+            tag = element.tag.rpartition('}')[2] if isinstance(element.tag, str) else ''
+            if tag == 'loc':
+                parent = element.getparent()
+                kind = parent.tag.rpartition('}')[2] if parent is not None else ''
+                location = (element.text or '').strip()
+                if location and kind in ('url', 'sitemap'):
+                    entries.append(('page' if kind == 'url' else 'sitemap', location))
+            elif tag in ('url', 'sitemap'):
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+        return entries
+
+class SitemapLinks:
+    """
+    Meilleurs liens lus dans les sitemaps, au plus max_links (tas borné) :
+    mémoire en O(max_links) quel que soit le nombre d'URLs lues.
+    - priority: fonction url -> clé, plus petit = plus prometteur
+    - seen: URLs canoniques déjà lues, pour ignorer les doublons entre fichiers
+    """
+    def __init__(self, max_links, priority):
+        self.max_links = max(0, max_links)
+        self.priority = priority
+        self.seen = set()
+        self._heap = []
+        self._counter = 0
+
+    def add(self, url):
+        key = canonicalize_url(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self._counter += 1
+        # Tas max sur la priorité : la racine est le pire lien gardé (le plus récent à égalité)
+        item = (-self.priority(url), -self._counter, url)
+        if len(self._heap) < self.max_links:
+            heapq.heappush(self._heap, item)
+        elif self._heap and item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+        return True
+
+    def links(self):
+        return [url for _, _, url in sorted(self._heap, key=lambda item: (-item[0], -item[1]))]
+
+    def __len__(self):
+        return len(self._heap)
+
+def _sitemap_order(url):
+    # Sitemaps des pages avant ceux du catalogue, puis ordre de découverte
+    path = urlsplit(url).path.lower()
+    return any(hint in path for hint in CATALOG_SITEMAP_HINTS)
+
+async def discover_sitemap_links(session, start_url, domain, robots=None, headers=None, max_links=None,
+                                 max_urls=SITEMAP_MAX_URLS, max_files=SITEMAP_MAX_FILES, time_limit=SITEMAP_TIME_LIMIT):
+    """
+    Liens du site lus dans ses sitemaps : ceux déclarés dans robots.txt, sinon /sitemap.xml.
+    Les index de sitemaps sont suivis (max_files fichiers au plus) et chaque fichier est lu
+    en flux, décompressé et parsé au fil du téléchargement. La lecture s'arrête après
+    max_urls URLs de pages ; seuls les max_links meilleurs liens du domaine, autorisés
+    par robots.txt, sont gardés (classés par link_scorer).
+    Après time_limit secondes, le téléchargement en cours est annulé et les liens
+    déjà lus sont retournés.
+    """
+    max_links = max_links or max_urls
+    parts = urlsplit(start_url)
+    sitemaps = (robots.sitemaps if robots else []) or [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+    queue = [(_sitemap_order(url), position, url) for position, url in enumerate(sitemaps)]
+    heapq.heapify(queue)
+    queued = {canonicalize_url(url) for url in sitemaps}
+    found = SitemapLinks(max_links, lambda url: link_priority(url, root_domain=domain))
+    timeout = aiohttp.ClientTimeout(total=None, connect=CONNECT_TIMEOUT, sock_read=REQUEST_TIMEOUT)
+    read = files = 0
+
+    try:
+        async with asyncio.timeout(time_limit):
+            while queue and files < max_files and read < max_urls:
+                _, _, sitemap_url = heapq.heappop(queue)
+                files += 1
+                parser = SitemapParser()
+                try:
+                    async with session.get(sitemap_url, headers=headers, allow_redirects=True, timeout=timeout) as response:
+                        if response.status != 200:
+                            logger.info(f"Sitemap {sitemap_url} unavailable: HTTP {response.status}")
+                            continue
+                        async for chunk in response.content.iter_chunked(SITEMAP_CHUNK_SIZE):
+                            for kind, location in parser.feed(chunk):
+                                if kind == 'sitemap':
+                                    key = canonicalize_url(location)
+                                    if key not in queued and len(queued) < max_files and is_valid_url(location):
+                                        queued.add(key)
+                                        heapq.heappush(queue, (_sitemap_order(location), len(queued), location))
+                                    continue
+                                read += 1
+                                if (is_valid_url(location) and is_same_domain(location, domain)
+                                        and (robots is None or robots.can_fetch(location))):
+                                    found.add(location)
+                                if read >= max_urls:
+                                    break
+                            # Budget atteint : la suite du fichier n'est pas téléchargée
+                            if read >= max_urls or parser.truncated:
+                                break
+                except etree.XMLSyntaxError as e:
+                    logger.warning(f"Invalid sitemap {sitemap_url}: {str(e)}")
+                except (aiohttp.ClientError, TimeoutError, ValueError, zlib.error) as e:
+                    logger.warning(f"Unable to read sitemap {sitemap_url}: {str(e)}")
+    except TimeoutError:
+        logger.warning(f"Sitemap discovery for {domain} stopped after {time_limit}s")
+
+    logger.info(f"Read {read} sitemap URLs from {files} files for {domain}, kept {len(found)}")
+    return found.links()
+
+async def discover_site(store, url, max_links, use_robots=True, use_sitemap=True, time_limit=SITEMAP_TIME_LIMIT):
+    """
+    Étape de découverte avant le crawl (sur la boucle du moteur) : robots.txt, gardé en cache
+    par hôte, puis sitemaps du domaine de l'URL, le tout en time_limit secondes au plus.
+    Retourne (RobotsRules ou None, [liens des sitemaps du plus au moins prometteur]).
+    """
+    session = store.engine.session
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + time_limit
+    robots, links = None, []
+    try:
+        async with asyncio.timeout_at(deadline):
+            if use_robots:
+                robots = await get_robots_cache().get(session, url, store.headers)
+            if use_sitemap:
+                # Temps restant : les sitemaps rendent les liens déjà lus avant l'échéance
+                links = await discover_sitemap_links(session, url, urlsplit(url).netloc, robots, store.headers,
+                                                     max_links, time_limit=max(0.0, deadline - loop.time()))
+    except TimeoutError:
+        logger.warning(f"Site discovery for {url} stopped after {time_limit}s")
+    return robots, links
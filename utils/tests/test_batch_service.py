@@ -0,0 +1,122 @@
+import threading
+import time
+import unittest
+from unittest import mock
+from services.batch_service import domain_key, parse_batch_request, run_batch
+from services.scrape_pipeline import ScrapeError, ResultPending, parse_scrape_options
+
+class StubScrape:
+    """
+    cached_scrape factice : durée par URL, suivi des scrapings simultanés par domaine
+    et de l'ordre de démarrage.
+    """
+    def __init__(self, delay=0.05, failures=(), pending=()):
+        self.delay = delay
+        self.failures = set(failures)
+        self.pending = set(pending)
+        self.started = []
+        self.running = {}
+        self.max_running = {}
+        self.max_total = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url, options, start_time=None):
+        domain = domain_key(url)
+        with self._lock:
+            self.started.append(url)
+            self.running[domain] = self.running.get(domain, 0) + 1
+            self.max_running[domain] = max(self.max_running.get(domain, 0), self.running[domain])
+            self.max_total = max(self.max_total, sum(self.running.values()))
+        try:
+            time.sleep(self.delay)
+            if url in self.failures:
+                raise ScrapeError(f"Unable to reach {url}")
+            if url in self.pending:
+                raise ResultPending(url, 20)
+            return {"url": url, "max_link": options["max_link"]}
+        finally:
+            with self._lock:
+                self.running[domain] -= 1
+
+    def run(self, items, **kwargs):
+        with mock.patch('services.batch_service.cached_scrape', self):
+            return list(run_batch(items, **kwargs))
+
+class TestParseBatchRequest(unittest.TestCase):
+    def test_valid(self):
+        items = parse_batch_request({
+            "urls": ["https://a.com", {"url": "https://b.com", "max_link": 5}],
+            "options": {"max_link": 20, "include_phones": "false"},
+        })
+        self.assertEqual([url for url, _ in items], ["https://a.com", "https://b.com"])
+        self.assertEqual([options["max_link"] for _, options in items], [20, 5])
+        # Les options communes s'appliquent aussi aux URLs détaillées
+        self.assertFalse(items[1][1]["include_phones"])
+        self.assertEqual(items[0][1], parse_scrape_options({"max_link": 20, "include_phones": "false"}))
+
+    def test_invalid(self):
+        cases = [
+            (None, "JSON object"),
+            ({"urls": "https://a.com"}, "JSON object"),
+            ({"urls": []}, "empty"),
+            ({"urls": ["https://a.com"] * 3}, "maximum is 2"),
+            ({"urls": ["https://a.com"], "options": ["max_link"]}, "'options'"),
+            ({"urls": ["https://a.com", {"max_link": 5}]}, "urls[1]: URL is required"),
+            ({"urls": [42]}, "urls[0]: URL is required"),
+            ({"urls": [{"url": "https://a.com", "max_link": "many"}]}, "urls[0]"),
+            ({"urls": [{"url": "https://a.com", "stop_when": "fax"}]}, "urls[0]"),
+        ]
+        for payload, message in cases:
+            with self.subTest(payload=payload):
+                with self.assertRaises(ValueError) as context:
+                    parse_batch_request(payload, max_urls=2)
+                self.assertIn(message, str(context.exception))
+
+class TestRunBatch(unittest.TestCase):
+    def items(self, urls):
+        return [(url, parse_scrape_options({"max_link": 10})) for url in urls]
+
+    def test_every_item_once(self):
+        """Une ligne par URL, avec son index dans la requête, puis le résumé"""
+        urls = [f"https://site{index % 4}.example.com/page-{index}" for index in range(12)]
+        stub = StubScrape()
+        lines = stub.run(self.items(urls), concurrency=4, per_domain=1)
+        results, summary = lines[:-1], lines[-1]
+        self.assertEqual(sorted(line["index"] for line in results), list(range(12)))
+        for line in results:
+            self.assertEqual(line["url"], urls[line["index"]])
+            self.assertEqual(line["result"]["url"], urls[line["index"]])
+        self.assertEqual((summary["done"], summary["total"], summary["errors"]), (True, 12, 0))
+
+    def test_domain_order(self):
+        """Les URLs d'un domaine partent dans l'ordre de la requête, les domaines à tour de rôle"""
+        urls = [f"https://big.example.com/{index}" for index in range(6)] + ["https://small.example.org/"]
+        stub = StubScrape()
+        stub.run(self.items(urls), concurrency=2, per_domain=1)
+        big = [url for url in stub.started if 'big' in url]
+        self.assertEqual(big, urls[:6])
+        # Le petit domaine n'attend pas la fin du gros
+        self.assertLessEqual(stub.started.index("https://small.example.org/"), 1)
+
+    def test_per_domain_limit(self):
+        """Jamais plus de per_domain scrapings simultanés d'un même domaine"""
+        urls = [f"https://{prefix}site{index % 3}.example.com/{index}" for index in range(18) for prefix in ('', 'www.')]
+        stub = StubScrape(delay=0.02)
+        stub.run(self.items(urls), concurrency=8, per_domain=2)
+        self.assertEqual(set(stub.max_running), {"site0.example.com", "site1.example.com", "site2.example.com"})
+        self.assertTrue(all(count <= 2 for count in stub.max_running.values()), stub.max_running)
+        self.assertLessEqual(stub.max_total, 6)
+
+    def test_errors(self):
+        urls = ["https://a.example.com/", "https://b.example.com/", "https://c.example.com/"]
+        stub = StubScrape(failures={urls[1]}, pending={urls[2]})
+        lines = stub.run(self.items(urls), concurrency=3, per_domain=1)
+        by_index = {line["index"]: line for line in lines[:-1]}
+        self.assertEqual(by_index[0]["status"], "OK")
+        self.assertEqual(by_index[1], {"index": 1, "url": urls[1], "error": f"Unable to reach {urls[1]}", "status": "ERROR"})
+        # Scraping identique en cours ailleurs : à redemander, pas une erreur
+        self.assertEqual(by_index[2]["status"], "PENDING")
+        self.assertEqual(lines[-1]["errors"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
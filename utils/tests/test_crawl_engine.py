@@ -0,0 +1,128 @@
+import socket
+import unittest
+from aiohttp import web
+from utils.scrapers.crawl_engine import CrawlEngine
+from utils.scrapers.http_client import detect_charset
+from utils.scrapers.page_cache import PageCache
+
+MAX_BYTES = 100 * 1024
+LINKS = ''.join(f'<li><a href="/products/item-{index}">Produit {index}</a></li>' for index in range(5000))
+BIG_PAGE = f'<html><body><a href="/pages/contact">Contact</a><ul>{LINKS}</ul></body></html>'
+LATIN1_PAGE = '<html><head><meta charset="iso-8859-1"><title>Défilé</title></head><body>Café à Orléans</body></html>'
+CP1252_PAGE = '<html><head><title>Défilé</title></head><body>Café à Orléans</body></html>'
+
+ETAG_PAGE = '<html><body><a href="/pages/contact">Contact</a> café</body></html>'
+
+def page(body, content_type='text/html'):
+    async def handler(request):
+        return web.Response(body=body, headers={'Content-Type': content_type, 'Cache-Control': 'no-store'})
+    return handler
+
+def revalidated_page(statuses):
+    """Page avec ETag : 304 sans corps si If-None-Match correspond ; statuts servis notés dans statuses"""
+    async def handler(request):
+        headers = {'ETag': '"v1"', 'Cache-Control': 'max-age=3600'}
+        if request.headers.get('If-None-Match') == '"v1"':
+            statuses.append(304)
+            return web.Response(status=304, headers=headers)
+        statuses.append(200)
+        return web.Response(body=ETAG_PAGE.encode(), content_type='text/html', headers=headers)
+    return handler
+
+class TestCrawlEngine(unittest.TestCase):
+    """Téléchargements réels sur un serveur aiohttp local, servi par la boucle du moteur"""
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = CrawlEngine(parse_workers=2, cache=PageCache(), max_bytes=MAX_BYTES)
+        app = web.Application()
+        app.router.add_get('/big', page(BIG_PAGE.encode()))
+        app.router.add_get('/small', page(b'<html><body><a href="/a">A</a></body></html>'))
+        app.router.add_get('/image.png', page(b'\x89PNG' + b'\x00' * 4096, 'image/png'))
+        app.router.add_get('/latin1', page(LATIN1_PAGE.encode('latin-1')))
+        app.router.add_get('/cp1252', page(CP1252_PAGE.encode('cp1252')))
+        app.router.add_get('/utf8', page(CP1252_PAGE.encode('utf-8')))
+        app.router.add_get('/charset', page(CP1252_PAGE.encode('cp1252'), 'text/html; charset=windows-1252'))
+        cls.etag_statuses = []
+        app.router.add_get('/etag', revalidated_page(cls.etag_statuses))
+        cls.runner = web.AppRunner(app, access_log=None)
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+
+        async def start():
+            await cls.runner.setup()
+            await web.SockSite(cls.runner, sock).start()
+
+        cls.engine.run(start())
+        cls.base = f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.run(cls.runner.cleanup())
+        cls.engine.shutdown()
+
+    def fetch(self, path):
+        return self.engine.run(self.engine.fetch(f"{self.base}{path}", {}), timeout=10)
+
+    def test_truncated_at_max_bytes(self):
+        """MAX_PAGE_SIZE_MB : le corps est coupé, le début reste parsé"""
+        self.assertGreater(len(BIG_PAGE), MAX_BYTES)
+        _, status, _, text, details = self.fetch('/big')
+        self.assertEqual(status, 200)
+        self.assertTrue(details.truncated)
+        self.assertEqual(len(text), MAX_BYTES)
+        self.assertEqual(details.document.anchors[0]["href"], '/pages/contact')
+        self.assertLess(len(details.document.anchors), 5000)
+        self.assertGreater(details.parse_time, 0)
+
+    def test_small_page(self):
+        _, _, _, text, details = self.fetch('/small')
+        self.assertFalse(details.truncated)
+        self.assertIsNone(details.skipped)
+        self.assertEqual([anchor["href"] for anchor in details.document.anchors], ['/a'])
+
+    def test_skipped_content_type(self):
+        """Les types non analysés (images, PDF...) ne sont pas téléchargés"""
+        _, status, headers, text, details = self.fetch('/image.png')
+        self.assertEqual(status, 200)
+        self.assertEqual(text, '')
+        self.assertEqual(details.skipped, 'content type image/png')
+        self.assertEqual(details.document.anchors, [])
+
+    def test_charset_detection(self):
+        """Sans charset dans Content-Type : <meta charset>, puis UTF-8 valide, sinon windows-1252"""
+        for path in ('/latin1', '/cp1252', '/utf8', '/charset'):
+            with self.subTest(path=path):
+                _, _, _, text, details = self.fetch(path)
+                self.assertIn('Café à Orléans', text)
+                self.assertEqual(details.document.title, 'Défilé')
+
+    def test_conditional_revalidation(self):
+        """Entrée périmée avec ETag : If-None-Match, 304, corps réutilisé et fetched_at rafraîchi"""
+        url = f"{self.base}/etag"
+        cache = self.engine.cache
+        revalidated = cache.counters["revalidated"]
+        first = self.engine.run(self.engine.fetch(url, {}), timeout=10)
+        entry, _ = cache.get(f"{self.base}/etag")
+        entry.fetched_at -= 60
+        stale_at = entry.fetched_at
+        # max_age=0 : l'entrée stockée (max-age=3600) doit être revalidée
+        second = self.engine.run(self.engine.fetch(url, {}, max_age=0), timeout=10)
+        self.assertEqual(self.etag_statuses, [200, 304])
+        self.assertEqual(cache.counters["revalidated"], revalidated + 1)
+        self.assertEqual(second[1], 200)
+        self.assertEqual(second[3], first[3])
+        self.assertIn('café', second[3])
+        self.assertGreater(cache.get(f"{self.base}/etag")[0].fetched_at, stale_at)
+
+class TestDetectCharset(unittest.TestCase):
+    def test_detect_charset(self):
+        self.assertEqual(detect_charset(None, LATIN1_PAGE.encode('latin-1')), 'iso8859-1')
+        self.assertEqual(detect_charset(None, b'<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">'), 'shift_jis')
+        self.assertEqual(detect_charset(None, b'\xef\xbb\xbf<html>'), 'utf-8')
+        self.assertEqual(detect_charset(None, CP1252_PAGE.encode('cp1252')), 'cp1252')
+        # Caractère multi-octets coupé en fin d'extrait
+        self.assertEqual(detect_charset(None, 'é'.encode('utf-8') * 5000), 'utf-8')
+        self.assertEqual(detect_charset(None, b'<meta charset="unknown-charset">'), 'utf-8')
+
+if __name__ == '__main__':
+    unittest.main()
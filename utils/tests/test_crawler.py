@@ -0,0 +1,211 @@
+import asyncio
+import time
+import unittest
+import requests
+from formatters.response_formatter import format_scraping_response
+from services.crawler import Crawler, StopCondition
+from services.scrape_pipeline import parse_scrape_options
+from utils.scrapers.page_store import Page
+
+ROOT = "https://example.com"
+
+def html(links=(), body=''):
+    anchors = ''.join(f'<a href="{ROOT}{link}">{link}</a>' for link in links)
+    return f'<html><body><main>{body}{anchors}</main></body></html>'
+
+class StubEngine:
+    """Moteur minimal : le travail CPU est exécuté directement sur la boucle"""
+    def __init__(self):
+        self.crawls_in_flight = 0
+
+    async def run_cpu(self, func, *args):
+        return func(*args)
+
+class StubStore:
+    """
+    PageStore factice : site {chemin: (html, délai en secondes)}, téléchargements
+    simulés par asyncio.sleep, annulations comptées.
+    """
+    def __init__(self, site):
+        self.site = site
+        self.engine = StubEngine()
+        self.trace = None
+        self.fetched = []
+        self.cancelled = []
+        self.cancel_calls = 0
+
+    async def fetch(self, url):
+        path = url[len(ROOT):] or '/'
+        self.fetched.append(path)
+        if path not in self.site:
+            raise requests.HTTPError(f"404 Error for url: {url}")
+        text, delay = self.site[path]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(path)
+            raise
+        return Page(url, url, 200, {}, text)
+
+    def cancel_pending(self):
+        self.cancel_calls += 1
+
+    def __contains__(self, url):
+        return url[len(ROOT):] in self.fetched
+
+def crawl(site, seeds=('/',), **kwargs):
+    store = StubStore(site)
+    # Ordre alphabétique : visites déterministes au sein d'un niveau
+    crawler = Crawler(store, "example.com", priority=lambda url, context: url, **kwargs)
+    asyncio.run(crawler.run([f"{ROOT}{seed}" for seed in seeds]))
+    return crawler, store
+
+def visited_paths(crawler):
+    return [url[len(ROOT):] for url in crawler.visited]
+
+SITE = {
+    '/': (html(['/a', '/b']), 0),
+    '/a': (html(['/c', '/']), 0),
+    '/b': (html(['/d']), 0),
+    '/c': (html(['/e']), 0),
+    '/d': (html(), 0),
+    '/e': (html(), 0),
+}
+
+class TestCrawler(unittest.TestCase):
+    def test_breadth_first(self):
+        """Tous les liens d'un niveau sont visités avant ceux du niveau suivant"""
+        crawler, _ = crawl(SITE, depth=3, concurrency=1)
+        # En profondeur d'abord, /c suivrait directement /a
+        self.assertEqual(visited_paths(crawler), ['/', '/a', '/b', '/c', '/d'])
+        self.assertIsNone(crawler.stop_reason)
+        self.assertEqual(crawler.store.engine.crawls_in_flight, 0)
+
+    def test_depth_levels(self):
+        crawler, store = crawl(SITE, depth=1)
+        self.assertEqual(visited_paths(crawler), ['/'])
+        crawler, store = crawl(SITE, depth=2, concurrency=4)
+        self.assertEqual(sorted(visited_paths(crawler)), ['/', '/a', '/b'])
+        # Les liens du dernier niveau sont découverts mais pas visités
+        self.assertIn(f"{ROOT}/c", crawler.discovered_links)
+        self.assertNotIn('/c', store.fetched)
+
+    def test_seen_and_domain(self):
+        """Une URL déjà en file (même canonique) ou d'un autre domaine n'est pas revisitée"""
+        site = {
+            '/': (html(['/a', '/a#contact']) + '<a href="HTTPS://EXAMPLE.COM:443/a">a</a><a href="https://other.com/">ext</a>', 0),
+            '/a': (html(['/']), 0),
+        }
+        crawler, store = crawl(site, depth=3)
+        self.assertEqual(sorted(visited_paths(crawler)), ['/', '/a'])
+        self.assertEqual(sorted(store.fetched), ['/', '/a'])
+
+    def test_parsed_links(self):
+        """(url, hôte, chemin) de la canonicalisation, repris par format_scraping_response"""
+        site = {'/': (html(['/pages/contact', '/products/a']), 0)}
+        crawler, _ = crawl(site, depth=2)
+        self.assertEqual(crawler.parsed_links[f"{ROOT}/"], (f"{ROOT}/", "example.com", "/"))
+        self.assertEqual(crawler.parsed_links[f"{ROOT}/products/a"][1:], ("example.com", "/products/a"))
+        visited = set(crawler.visited) | {f"{ROOT}/blogs/news"}
+        links = format_scraping_response(ROOT, "example.com", visited, crawler.parsed_links)["data"][0]["unique_links"]
+        self.assertEqual(links["Home"], [f"{ROOT}/"])
+        self.assertEqual(links["Pages"], [f"{ROOT}/pages/contact"])
+        self.assertEqual(links["Products"], [f"{ROOT}/products/a"])
+        # URL hors crawl : découpée par le formateur
+        self.assertEqual(links["Blogs"], [f"{ROOT}/blogs/news"])
+
+    def test_max_pages_budget(self):
+        crawler, store = crawl(SITE, depth=3, max_pages=3, concurrency=1)
+        self.assertEqual(visited_paths(crawler), ['/', '/a', '/b'])
+        self.assertEqual(len(store.fetched), 3)
+        self.assertEqual(crawler.stop_reason, 'budget')
+
+    def test_failed_page(self):
+        """Une page en erreur compte dans le budget sans interrompre le crawl"""
+        site = {'/': (html(['/a', '/missing']), 0), '/a': (html(), 0)}
+        crawler, _ = crawl(site, depth=2)
+        self.assertEqual(sorted(visited_paths(crawler)), ['/', '/a', '/missing'])
+        self.assertEqual(len(crawler.results), 3)
+
+    def test_time_limit(self):
+        """À l'échéance les fetchs en cours sont annulés et le crawl rend ce qu'il a"""
+        site = {
+            '/': (html(['/fast', '/slow', '/slower']), 0),
+            '/fast': (html(), 0),
+            '/slow': (html(), 5),
+            '/slower': (html(), 10),
+        }
+        start = time.monotonic()
+        crawler, store = crawl(site, depth=2, time_limit=0.3)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(crawler.stop_reason, 'time_limit')
+        self.assertEqual(sorted(visited_paths(crawler)), ['/', '/fast'])
+        self.assertEqual(sorted(store.cancelled), ['/slow', '/slower'])
+        self.assertEqual(store.cancel_calls, 1)
+        self.assertEqual(crawler.store.engine.crawls_in_flight, 0)
+
+    def test_on_page(self):
+        pages = []
+        site = {'/': (html(['/a'], 'Contact : hello@example.com'), 0), '/a': (html(), 0)}
+        crawl(site, depth=2, on_page=lambda url, emails, phones, links: pages.append((url, set(emails))))
+        self.assertEqual(pages[0], (f"{ROOT}/", {'hello@example.com'}))
+        self.assertEqual(len(pages), 2)
+
+class TestStopCondition(unittest.TestCase):
+    def test_parse_options(self):
+        options = parse_scrape_options({"stop_when": "phones, emails,,emails", "min_results": "2"})
+        self.assertEqual((options["stop_when"], options["min_results"]), (['emails', 'phones'], 2))
+        # Liste JSON (/scrape/batch, /jobs)
+        self.assertEqual(parse_scrape_options({"stop_when": ["social_links"]})["stop_when"], ['social_links'])
+        options = parse_scrape_options({})
+        self.assertEqual((options["stop_when"], options["min_results"]), ([], 1))
+        with self.assertRaises(ValueError):
+            parse_scrape_options({"stop_when": "emails,fax"})
+        with self.assertRaises(ValueError):
+            parse_scrape_options({"stop_when": "emails", "min_results": "many"})
+
+    def test_fields(self):
+        with self.assertRaises(ValueError):
+            StopCondition(['emails', 'addresses'])
+        self.assertEqual(StopCondition(['emails'], min_results=0).min_results, 1)
+
+    def test_update(self):
+        condition = StopCondition(['emails', 'phones'], min_results=2)
+        self.assertFalse(condition.update({'a@example.com': 1}, {'+33123456789': 1}))
+        # Valeurs déjà vues : pas de progrès
+        self.assertFalse(condition.update({'a@example.com': 1}, {'+33123456789': 1}))
+        self.assertFalse(condition.update({'b@example.com': 1}))
+        self.assertTrue(condition.update(phones={'+33987654321': 1}))
+        self.assertTrue(condition.satisfied())
+
+    def test_social_platforms(self):
+        """Les réseaux sociaux comptent par plateforme, pas par lien"""
+        condition = StopCondition(['social_links'], min_results=2)
+        links = {"https://www.facebook.com/acme": {}, "https://facebook.com/acme.shop": {}, f"{ROOT}/contact": {}}
+        self.assertFalse(condition.update(links=links))
+        self.assertTrue(condition.update(links={"https://instagram.com/acme": {}}))
+
+    def test_early_termination(self):
+        """Le crawl s'arrête dès la condition remplie et annule les fetchs en cours"""
+        site = {
+            '/': (html(['/contact', '/slow']), 0),
+            '/contact': (html([], 'hello@example.com'), 0),
+            '/slow': (html(['/next']), 5),
+            '/next': (html(), 0),
+        }
+        start = time.monotonic()
+        crawler, store = crawl(site, depth=3, stop_condition=StopCondition(['emails']))
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(crawler.stop_reason, 'stop_condition')
+        self.assertEqual(sorted(visited_paths(crawler)), ['/', '/contact'])
+        self.assertEqual(store.cancelled, ['/slow'])
+        self.assertEqual(store.cancel_calls, 1)
+
+    def test_satisfied_by_start_page(self):
+        site = {'/': (html(['/a'], 'hello@example.com'), 0), '/a': (html(), 0)}
+        crawler, store = crawl(site, depth=2, concurrency=1, stop_condition=StopCondition(['emails']))
+        self.assertEqual(visited_paths(crawler), ['/'])
+        self.assertEqual(store.fetched, ['/'])
+
+if __name__ == '__main__':
+    unittest.main()
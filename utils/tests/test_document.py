@@ -0,0 +1,86 @@
+import unittest
+from utils.extractors.document import DocumentParser, parse_document
+from utils.extractors.link_explorer import extract_link_contexts
+
+PAGE = """<!DOCTYPE html>
+<html lang="fr-FR">
+<head>
+    <title> Boutique Exemple </title>
+    <meta name="Description" content="Contactez-nous">
+    <meta property="og:site_name" content="Exemple">
+    <style>.contact { color: red }</style>
+    <script>var email = "hidden@example.com";</script>
+    <script type="application/ld+json">{"@type": "Organization", "email": "info@example.com"}</script>
+    <script type="application/ld+json">{ invalide </script>
+</head>
+<body>
+    <nav><a href="/pages/about">À propos</a></nav>
+    <p>Écrivez-nous : contact@example.com<!-- commentaire@example.com --></p>
+    <div class="site-footer">
+        <a href="/pages/contact" title="Formulaire">Contact</a>
+        <a href="mailto:hello@example.com">Email</a>
+        <a href="tel:+33123456789">Téléphone</a>
+        <a href="">vide</a>
+    </div>
+</body>
+</html>"""
+
+class TestDocument(unittest.TestCase):
+    def setUp(self):
+        self.document = parse_document(PAGE)
+
+    def test_visible_text(self):
+        self.assertIn("contact@example.com", self.document.text)
+        self.assertNotIn("hidden@example.com", self.document.text)
+        self.assertNotIn("commentaire@example.com", self.document.text)
+        self.assertNotIn("color: red", self.document.text)
+
+    def test_jsonld_and_meta(self):
+        self.assertEqual(self.document.jsonld, [{"@type": "Organization", "email": "info@example.com"}])
+        self.assertEqual(self.document.meta["description"], "Contactez-nous")
+        self.assertEqual(self.document.meta["og:site_name"], "Exemple")
+        self.assertEqual(self.document.title, "Boutique Exemple")
+        self.assertEqual(self.document.lang, "fr-FR")
+
+    def test_anchors(self):
+        hrefs = [anchor["href"] for anchor in self.document.anchors]
+        self.assertEqual(hrefs, ["/pages/about", "/pages/contact", "mailto:hello@example.com", "tel:+33123456789"])
+        self.assertEqual(self.document.anchors[0]["region"], "header")
+        self.assertEqual(self.document.anchors[1]["region"], "footer")
+        self.assertEqual(self.document.anchors[1]["text"], "Contact Formulaire")
+        self.assertEqual(self.document.mailto_links, ["mailto:hello@example.com"])
+        self.assertEqual(self.document.tel_links, ["tel:+33123456789"])
+
+    def test_link_contexts(self):
+        contexts = extract_link_contexts(self.document, "https://example.com/")
+        self.assertEqual(set(contexts), {"https://example.com/pages/about", "https://example.com/pages/contact"})
+        self.assertEqual(contexts["https://example.com/pages/contact"]["region"], "footer")
+
+    def test_empty_and_declared_encoding(self):
+        self.assertEqual(parse_document("").text, "")
+        document = parse_document('<?xml version="1.0" encoding="utf-8"?><html><body>Été</body></html>')
+        self.assertIn("Été", document.text)
+
+    def test_incremental_feed(self):
+        # Découpage arbitraire, y compris au milieu d'une balise
+        parser = DocumentParser()
+        for start in range(0, len(PAGE), 37):
+            parser.feed(PAGE[start:start + 37])
+        document = parser.close()
+        self.assertEqual(document.text, self.document.text)
+        self.assertEqual(document.anchors, self.document.anchors)
+        self.assertEqual(document.jsonld, self.document.jsonld)
+
+    def test_incremental_long_text(self):
+        """Un long texte sans '>' découpé en petits morceaux est gardé en entier"""
+        text = ' '.join(f"mot{index}" for index in range(20000))
+        parser = DocumentParser()
+        html = f"<html><body><p>{text}</p><a href='/fin'>fin</a></body></html>"
+        for start in range(0, len(html), 50):
+            parser.feed(html[start:start + 50])
+        document = parser.close()
+        self.assertEqual(document.text, f"{text} fin")
+        self.assertEqual(document.anchors[0]["href"], '/fin')
+
+if __name__ == '__main__':
+    unittest.main()
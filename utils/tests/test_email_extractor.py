@@ -1,9 +1,15 @@
 import unittest
-from bs4 import BeautifulSoup
-from utils.email_extractor import (
+from utils.extractors.document import parse_document
+from utils.extractors.email_extractor import (
+    EMAIL_PATTERN,
+    email_windows,
     validate_and_normalize_email,
     extract_emails_html,
     extract_emails_jsonld,
+    extract_emails_mailto,
+    extract_emails_cloudflare,
+    decode_cfemail,
+    deobfuscate_emails,
     is_valid_tld
 )
 
@@ -65,6 +71,51 @@ class TestEmailExtractor(unittest.TestCase):
         self.assertNotIn("test@example.invalidtld", emails)
         self.assertNotIn("sales@company.comcontactus", emails)
 
+    def test_email_windows(self):
+        # Le scan par fenêtres trouve les mêmes candidats que le scan du texte complet
+        samples = [
+            "a@b.com",
+            "x a@b.com\ty@z.fr\nfin @ seul @@ a@b@c.com",
+            "@début et fin@",
+            "chaîne sans arobase",
+            "écrivez-nous:contact@example.com, ou(sales@example.fr).",
+        ]
+        for text in samples:
+            windows = [candidate for window in email_windows(text) for candidate in EMAIL_PATTERN.findall(window)]
+            self.assertEqual(windows, EMAIL_PATTERN.findall(text), text)
+
+    def test_extract_emails_mailto(self):
+        html = '''
+        <a href="mailto:Contact@Example.com?subject=Bonjour">Écrire</a>
+        <a href="mailto:sales%40example.com,support@example.fr">Équipes</a>
+        <a href="mailto:info[at]example(dot)com">Info</a>
+        <a href="mailto:invalid@example.invalidtld">Invalide</a>
+        '''
+        emails = extract_emails_mailto(parse_document(html))
+        self.assertEqual(emails, {
+            "contact@example.com", "sales@example.com", "support@example.fr", "info@example.com"
+        })
+
+    def test_deobfuscate_emails(self):
+        text = """
+        Écrivez à contact [at] example [dot] com ou jean.dupont(arobase)example.fr.
+        Support : support{at}help(point)example(point)io
+        Pas un email : rendez-vous [at] 18h, (at) seul
+        """
+        self.assertEqual(deobfuscate_emails(text), {
+            "contact@example.com", "jean.dupont@example.fr", "support@help.example.io"
+        })
+
+    def test_extract_emails_cloudflare(self):
+        # "contact@example.com" encodé avec la clé 0x42
+        encoded = '42' + bytes(byte ^ 0x42 for byte in b'contact@example.com').hex()
+        self.assertEqual(decode_cfemail(encoded), "contact@example.com")
+        self.assertIsNone(decode_cfemail("zz"))
+        html = f'''
+        <a href="/cdn-cgi/l/email-protection#{encoded}"><span class="__cf_email__" data-cfemail="{encoded}">[email&#160;protected]</span></a>
+        '''
+        self.assertEqual(extract_emails_cloudflare(parse_document(html)), {"contact@example.com"})
+
     def test_extract_emails_jsonld(self):
         json_ld = """
         <script type="application/ld+json">
@@ -81,8 +132,7 @@ class TestEmailExtractor(unittest.TestCase):
         }
         </script>
         """
-        soup = BeautifulSoup(json_ld, 'html.parser')
-        emails = extract_emails_jsonld(soup)
+        emails = extract_emails_jsonld(parse_document(json_ld))
         
         # Vérifier les emails valides extraits
         self.assertEqual(len(emails), 3)
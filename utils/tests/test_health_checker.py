@@ -0,0 +1,52 @@
+import time
+import unittest
+from utils.scrapers.crawl_engine import CrawlEngine
+from utils.scrapers.health_checker import HealthSampler, readiness_problems
+
+def make_snapshot(engine=None, memory_percent=20.0):
+    engine = {"status": "healthy", "loop_lag": 0.001, "fetches_in_flight": 0, "parse_backlog": 0,
+              "crawls_in_flight": 0, **(engine or {})}
+    return {"components": {"crawl_engine": engine, "system": {"memory": {"percent": memory_percent}}}}
+
+class TestHealthChecker(unittest.TestCase):
+    def test_readiness_problems(self):
+        self.assertEqual(readiness_problems(make_snapshot()), [])
+        self.assertEqual(len(readiness_problems(make_snapshot({"crawls_in_flight": 1000}))), 1)
+        self.assertEqual(len(readiness_problems(make_snapshot({"parse_backlog": 100000}))), 1)
+        self.assertEqual(len(readiness_problems(make_snapshot({"loop_lag": 60}))), 1)
+        self.assertEqual(len(readiness_problems(make_snapshot(memory_percent=99.5))), 1)
+        stopped = make_snapshot({"status": "unhealthy", "error": "crawl engine loop stopped"})
+        self.assertEqual(readiness_problems(stopped), ["crawl engine loop stopped"])
+
+    def test_sampler_snapshot(self):
+        sampler = HealthSampler(interval=60).start()
+        try:
+            start = time.perf_counter()
+            self.assertTrue(sampler.live())
+            self.assertTrue(sampler.ready())
+            snapshot = sampler.snapshot()
+            # Lecture de l'instantané, sans mesure ni requête
+            self.assertLess(time.perf_counter() - start, 0.05)
+            self.assertIn("crawl_engine", snapshot["components"])
+            self.assertEqual(snapshot["status"], "healthy")
+            # Sonde arrêtée : instantané périmé, le worker n'est plus vivant
+            sampler._sampled_at -= 60 * 4
+            self.assertTrue(sampler.is_stale())
+            self.assertFalse(sampler.live())
+            self.assertFalse(sampler.ready())
+        finally:
+            sampler.stop()
+
+    def test_engine_ping_and_stats(self):
+        engine = CrawlEngine(parse_workers=1, cache=None)
+        try:
+            self.assertTrue(engine.is_alive())
+            self.assertIsNotNone(engine.ping(1))
+            self.assertEqual(engine.run(engine.run_cpu(sum, [1, 2])), 3)
+            self.assertEqual(engine.stats(), {"fetches_in_flight": 0, "parse_backlog": 0, "crawls_in_flight": 0})
+        finally:
+            engine.shutdown()
+        self.assertFalse(engine.is_alive())
+
+if __name__ == '__main__':
+    unittest.main()
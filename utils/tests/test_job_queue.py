@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from services.job_queue import JobQueue
+
+OPTIONS = {"max_link": 20}
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "jobs.sqlite3")
+        self.queue = JobQueue(self.path, retention=3600, stale_after=60, max_attempts=2)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_stale(self, job_id):
+        self.queue._connection().execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time() - 120, job_id))
+
+    def test_claim_in_order(self):
+        first = self.queue.enqueue("https://a.example.com/", OPTIONS)
+        second = self.queue.enqueue("https://b.example.com/", OPTIONS)
+        self.assertEqual(self.queue.claim("w1"), (first, "https://a.example.com/", OPTIONS))
+        self.assertEqual(self.queue.claim("w1")[0], second)
+        self.assertIsNone(self.queue.claim("w1"))
+        job = self.queue.get(first)
+        self.assertEqual((job["status"], job["attempts"], job["progress"]), ('running', 1, {"pages": 0, "budget": 20}))
+
+    def test_claim_exclusive(self):
+        """Des workers concurrents (une connexion chacun) ne prennent jamais le même job"""
+        job_ids = {self.queue.enqueue(f"https://site{index}.example.com/", OPTIONS) for index in range(40)}
+        claimed = []
+        lock = threading.Lock()
+
+        def work(owner):
+            queue = JobQueue(self.path)
+            while True:
+                job = queue.claim(owner)
+                if job is None:
+                    return
+                with lock:
+                    claimed.append(job[0])
+
+        threads = [threading.Thread(target=work, args=(f"w{index}",)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(sorted(claimed), sorted(job_ids))
+        self.assertEqual(self.queue.counts()["running"], 40)
+
+    def test_stale_job_requeued_then_failed(self):
+        """Un job sans heartbeat est remis en file, puis en échec après max_attempts"""
+        job_id = self.queue.enqueue("https://example.com/", OPTIONS)
+        self.queue.claim("dead-worker")
+        self.make_stale(job_id)
+        self.queue.recover()
+        self.assertEqual(self.queue.get(job_id)["status"], 'queued')
+
+        self.assertEqual(self.queue.claim("w2")[0], job_id)
+        # Le worker mort ne peut plus terminer un job repris par un autre
+        self.queue.finish(job_id, "dead-worker", 3, result={"emails": []})
+        self.assertEqual(self.queue.get(job_id)["status"], 'running')
+
+        self.make_stale(job_id)
+        self.queue.recover()
+        job = self.queue.get(job_id)
+        self.assertEqual((job["status"], job["attempts"]), ('failed', 2))
+        self.assertEqual(job["error"], 'Job abandoned too many times')
+
+    def test_heartbeat_keeps_job(self):
+        job_id = self.queue.enqueue("https://example.com/", OPTIONS)
+        self.queue.claim("w1")
+        self.make_stale(job_id)
+        self.queue.progress({job_id: 7}, "w1")
+        self.queue.recover()
+        job = self.queue.get(job_id)
+        self.assertEqual((job["status"], job["progress"]["pages"]), ('running', 7))
+
+    def test_results_retained(self):
+        """Les résultats restent lisibles pendant retention secondes, puis sont purgés"""
+        done = self.queue.enqueue("https://example.com/", OPTIONS)
+        failed = self.queue.enqueue("https://example.org/", OPTIONS)
+        self.queue.claim("w1")
+        self.queue.claim("w1")
+        self.queue.finish(done, "w1", 12, result={"emails": ["contact@example.com"]})
+        self.queue.finish(failed, "w1", 0, error="Unable to reach the site")
+        self.queue.recover()
+        job = self.queue.get(done)
+        self.assertEqual((job["status"], job["result"], job["progress"]["pages"]), ('done', {"emails": ["contact@example.com"]}, 12))
+        self.assertEqual(self.queue.get(failed)["error"], "Unable to reach the site")
+        # Une nouvelle instance (redémarrage) relit les mêmes résultats
+        self.assertEqual(JobQueue(self.path).get(done)["result"], {"emails": ["contact@example.com"]})
+
+        self.queue._connection().execute("UPDATE jobs SET finished_at = ? WHERE id = ?", (time.time() - 7200, done))
+        self.queue.recover()
+        self.assertIsNone(self.queue.get(done))
+        self.assertIsNotNone(self.queue.get(failed))
+
+if __name__ == '__main__':
+    unittest.main()
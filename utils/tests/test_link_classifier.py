@@ -1,5 +1,7 @@
 import unittest
-from utils.link_classifier import classify_links
+from utils.analyzers.link_classifier import (
+    LinkClassifier, classify_links, classify_url, get_link_classifier, split_url
+)
 
 class TestLinkClassifier(unittest.TestCase):
     def test_classify_links(self):
@@ -119,5 +121,37 @@ class TestLinkClassifier(unittest.TestCase):
         }
         self.assertEqual(classify_links(urls, "example.com"), expected)
 
+    def test_locale_prefixes(self):
+        result = classify_links([
+            "https://example.com/fr",
+            "https://example.com/fr/pages/about",
+            "https://example.com/en-us/products/shirt",
+            "https://EXAMPLE.com/fr/blogs/news",
+            "https://example.com/fr/unknown",
+        ], "example.com")
+        self.assertEqual(result["Home"], ["https://example.com/fr"])
+        self.assertEqual(result["Pages"], ["https://example.com/fr/pages/about"])
+        self.assertEqual(result["Products"], ["https://example.com/en-us/products/shirt"])
+        self.assertEqual(result["Blogs"], ["https://EXAMPLE.com/fr/blogs/news"])
+        self.assertEqual(result["Others"], ["https://example.com/fr/unknown"])
+
+    def test_custom_rules(self):
+        classifier = LinkClassifier({
+            "Legal": {"prefixes": ["legal/privacy"], "patterns": [r"/mentions-legales$"]},
+            "Shop": {"prefixes": ["shop"]},
+        })
+        self.assertEqual(classifier.categories, ["Home", "Legal", "Shop", "Others"])
+        self.assertEqual(classifier.classify_path("/legal/privacy/cookies"), "Legal")
+        self.assertEqual(classifier.classify_path("/legal/terms"), "Others")
+        self.assertEqual(classifier.classify_path("/de/mentions-legales"), "Legal")
+        self.assertEqual(classifier.classify_path("/shop/item"), "Shop")
+
+    def test_classify_parsed(self):
+        urls = ["https://example.com/pages/about?x=1", "https://shop.example.com/products/a", "/pages/about"]
+        parsed = [(url, *split_url(url)) for url in urls]
+        self.assertEqual(parsed[0][1:], ("example.com", "/pages/about"))
+        self.assertEqual(get_link_classifier().classify_parsed(parsed, "example.com"), classify_links(urls, "example.com"))
+        self.assertEqual(classify_url(urls[1], "example.com"), "Products")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from utils.analyzers.link_scorer import score_link, rank_links
+
+class TestLinkScorer(unittest.TestCase):
+    def test_contact_pages_first(self):
+        urls = [
+            "https://example.com/products/shirt",
+            "https://example.com/collections/summer",
+            "https://example.com/blogs/news/post",
+            "https://example.com/pages/contact",
+            "https://example.com/pages/about-us",
+            "https://example.com/policies/privacy-policy",
+        ]
+        ranked = rank_links(urls, "example.com")
+        self.assertEqual(ranked[0], "https://example.com/pages/contact")
+        self.assertEqual(ranked[1], "https://example.com/pages/about-us")
+        self.assertEqual(ranked[-1], "https://example.com/products/shirt")
+
+    def test_anchor_text_and_region(self):
+        # Même catégorie : le texte d'ancre et le footer départagent
+        plain = score_link("https://example.com/pages/xyz", "Pages")
+        with_text = score_link("https://example.com/pages/xyz", "Pages", {"text": "Nous contacter", "region": None})
+        in_footer = score_link("https://example.com/pages/xyz", "Pages", {"text": "", "region": "footer"})
+        self.assertGreater(with_text, plain)
+        self.assertGreater(in_footer, plain)
+
+    def test_localized_keywords(self):
+        self.assertGreater(
+            score_link("https://example.de/impressum"),
+            score_link("https://example.de/produkte")
+        )
+        self.assertGreater(
+            score_link("https://example.fr/mentions-legales"),
+            score_link("https://example.fr/nouveautes")
+        )
+
+    def test_binary_files_last(self):
+        ranked = rank_links([
+            "https://example.com/files/contact.pdf",
+            "https://example.com/products/a",
+        ], "example.com")
+        self.assertEqual(ranked[-1], "https://example.com/files/contact.pdf")
+
+    def test_deterministic_order(self):
+        urls = [f"https://example.com/products/item-{i}" for i in range(50)]
+        self.assertEqual(rank_links(urls, "example.com"), rank_links(list(reversed(urls)), "example.com"))
+
+if __name__ == '__main__':
+    unittest.main()
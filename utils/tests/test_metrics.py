@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from utils.metrics import MetricsRegistry
+
+DEAD_PID = 4194000
+
+class TestMetrics(unittest.TestCase):
+    def make_registry(self, directory=None):
+        registry = MetricsRegistry(directory=directory)
+        requests = registry.counter('test_requests_total', 'Requests.', labels=('path',))
+        latency = registry.histogram('test_latency_seconds', 'Latency.', buckets=(0.1, 1))
+        in_flight = registry.gauge('test_in_flight', 'In flight.')
+        return registry, requests, latency, in_flight
+
+    def test_render(self):
+        registry, requests, latency, _ = self.make_registry()
+        requests.labels('/a').inc()
+        requests.labels('/a').inc(2)
+        requests.labels('say "hi"\n').inc()
+        for value in (0.05, 0.5, 5):
+            latency.observe(value)
+        text = registry.render()
+        self.assertIn('# TYPE test_requests_total counter', text)
+        self.assertIn('test_requests_total{path="/a"} 3', text)
+        self.assertIn('test_requests_total{path="say \\"hi\\"\\n"} 1', text)
+        # Buckets cumulés, +Inf = nombre total d'observations
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_sum 5.55', text)
+        self.assertIn('test_latency_seconds_count 3', text)
+        with self.assertRaises(ValueError):
+            requests.labels('/a', 'extra')
+
+    def test_threads(self):
+        registry, requests, _, in_flight = self.make_registry()
+        child = requests.labels('/a')
+
+        def work():
+            for _ in range(1000):
+                child.inc()
+            in_flight.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        in_flight.dec(3)
+        # Les valeurs des threads terminés sont gardées dans le cumul
+        self.assertEqual(registry.collect()[('test_requests_total', ('/a',))], 8000)
+        self.assertEqual(registry.collect()[('test_requests_total', ('/a',))], 8000)
+        self.assertEqual(registry.collect()[('test_in_flight', ())], 5)
+
+    def test_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            registry, requests, _, in_flight = self.make_registry(directory)
+            registry.gauge_function('test_pool_size', 'Pool size.', lambda: 4)
+            requests.labels('/a').inc()
+            in_flight.inc(2)
+            # Worker terminé : ses compteurs restent, ses jauges disparaissent
+            with open(os.path.join(directory, f"metrics-{os.getppid()}-{DEAD_PID}.json"), 'w') as file:
+                json.dump({"pid": DEAD_PID, "values": [
+                    ['test_requests_total', ['/a'], 5], ['test_in_flight', [], 7], ['test_pool_size', [], 4],
+                ]}, file)
+            # Fichier d'une autre instance du serveur : ignoré
+            with open(os.path.join(directory, f"metrics-1-{DEAD_PID}.json"), 'w') as file:
+                json.dump({"pid": DEAD_PID, "values": [['test_requests_total', ['/a'], 100]]}, file)
+            text = registry.render()
+            self.assertIn('test_requests_total{path="/a"} 6', text)
+            self.assertIn('test_in_flight 2', text)
+            self.assertIn('test_pool_size 4', text)
+
+if __name__ == '__main__':
+    unittest.main()
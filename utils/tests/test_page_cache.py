@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+import unittest
+from utils.scrapers.page_cache import CacheEntry, MemoryTier, SqliteTier, PageCache, entry_ttl
+
+def make_entry(text="<html>page</html>", headers=None, ttl=60):
+    return CacheEntry("https://example.com/", 200, headers or {}, text, ttl=ttl)
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "pages.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_memory_lru_eviction(self):
+        """L'entrée la moins récemment lue est évincée en premier"""
+        tier = MemoryTier(max_entries=2, max_bytes=1024)
+        tier.put("a", make_entry())
+        tier.put("b", make_entry())
+        tier.get("a")
+        tier.put("c", make_entry())
+        self.assertIsNotNone(tier.get("a"))
+        self.assertIsNone(tier.get("b"))
+        self.assertEqual(tier.evictions, 1)
+
+    def test_memory_size_cap(self):
+        tier = MemoryTier(max_entries=100, max_bytes=25)
+        tier.put("a", make_entry("x" * 20))
+        tier.put("b", make_entry("y" * 20))
+        self.assertIsNone(tier.get("a"))
+        self.assertLessEqual(tier.bytes, 25)
+        # Une entrée plus grande que le cache n'est pas stockée
+        tier.put("c", make_entry("z" * 30))
+        self.assertIsNone(tier.get("c"))
+
+    def test_memory_size_in_bytes(self):
+        """Le plafond porte sur les octets UTF-8, pas sur les caractères"""
+        self.assertEqual(make_entry("é" * 10).size, 20)
+        self.assertEqual(make_entry("漢" * 10).size, 30)
+        tier = MemoryTier(max_entries=100, max_bytes=50)
+        tier.put("a", make_entry("漢" * 10))
+        tier.put("b", make_entry("漢" * 10))
+        self.assertIsNone(tier.get("a"))
+        self.assertEqual(tier.bytes, 30)
+
+    def test_disk_roundtrip_shared(self):
+        """Deux instances (deux workers) partagent le même fichier"""
+        SqliteTier(self.path).put("k", make_entry("<p>é</p>", {"ETag": '"v1"'}))
+        entry = SqliteTier(self.path).get("k")
+        self.assertEqual(entry.text, "<p>é</p>")
+        self.assertEqual(entry.validation_headers(), {"If-None-Match": '"v1"'})
+
+    def test_disk_eviction(self):
+        tier = SqliteTier(self.path, max_entries=5)
+        for i in range(40):
+            tier.put(f"k{i}", make_entry())
+        tier.evict()
+        self.assertLessEqual(tier.stats()["entries"], 5)
+        self.assertIsNotNone(tier.get("k39"))
+
+    def test_freshness(self):
+        entry = make_entry(ttl=60)
+        self.assertTrue(entry.is_fresh())
+        # max_age de l'appelant prioritaire sur le TTL de l'entrée
+        entry.fetched_at = time.time() - 30
+        self.assertIs(entry.is_fresh(max_age=0), False)
+        self.assertIs(entry.is_fresh(max_age=3600), True)
+        entry.fetched_at = time.time() - 120
+        self.assertFalse(entry.is_fresh())
+        self.assertTrue(entry.is_fresh(max_age=300))
+
+    def test_entry_ttl(self):
+        self.assertEqual(entry_ttl({"cache-control": "public, max-age=120"}), 120)
+        self.assertIsNone(entry_ttl({"Cache-Control": "no-store"}))
+        self.assertEqual(entry_ttl({}, default=42), 42)
+
+    def test_counters(self):
+        cache = PageCache(memory=MemoryTier(), disk=SqliteTier(self.path))
+        cache.put("k", make_entry())
+        cache.memory = MemoryTier()
+        entry, tier = cache.get("k")
+        self.assertEqual(tier, "disk")
+        entry, tier = cache.get("k")
+        self.assertEqual(tier, "memory")
+        self.assertEqual(cache.get("missing"), (None, None))
+        self.assertEqual(cache.stats()["stores"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
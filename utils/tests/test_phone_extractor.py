@@ -1,11 +1,47 @@
 import unittest
-from .phone_extractor import (
+from unittest import mock
+import phonenumbers
+from phonenumbers import PhoneNumberMatcher
+from utils.extractors.phone_extractor import (
+    find_phone_numbers,
+    format_phone,
+    infer_phone_region,
+    phone_cache_stats,
+    phone_output_format,
+    phone_windows,
     parse_phone,
     validate_phone,
     extract_phones_html,
-    extract_phones_jsonld
+    extract_phones_jsonld,
+    extract_phones_tel
 )
-from bs4 import BeautifulSoup
+from utils.extractors import phone_extractor
+from utils.extractors.document import parse_document
+from utils.analyzers.link_analyzer import analyze_page
+from utils.scrapers.page_store import Page
+
+# Corpus de non-régression du préfiltre : (texte, région par défaut)
+PHONE_CORPUS = [
+    ("Contactez-nous au +33 1 23 45 67 89 ou au 01 23 45 67 89", "FR"),
+    ("Service client : 04.72.00.00.00 (appel non surtaxé), fax 04 72 00 00 01", "FR"),
+    ("Call (415) 555-2671 ext. 12 or 1-800-555-0199, fax: +1 415 555 2672", "US"),
+    ("Tél. +212 5 22 22 22 22 / 0522-222223 - Casablanca 20000", "MA"),
+    ("Telefon: +49 30 901820, Fax +49 (0)30 9018 2111; Öffnungszeiten 9-17 Uhr", "DE"),
+    ("London office 020 7946 0018, international +44 20 7946 0019", "GB"),
+    ("Niue +683 4002, Vienne +43 1 5880, Tokyo +81 3-1234-5678", "US"),
+    ("Numéro collé au texte:+33123456789,puis www.site.fr/0123456789", "FR"),
+    ("Chiffres pleine chasse ＋３３ １ ２３ ４５ ６７ ８９ et arabes +٣٣ ١ ٢٣ ٤٥ ٦٧ ٨٩", "FR"),
+    ("\n".join(
+        f"Réf. SKU-{index:05d} Prix {index % 97},90 € le {index % 28 + 1:02d}/03/2024 EAN 3{index:012d}"
+        for index in range(200)
+    ) + "\nSAV : 09 70 80 90 00", "FR"),
+    ("Commande n°20240312-4421, suivi 1Z999AA10123456784, tél 0970809001", "FR"),
+]
+
+def full_scan(text, country_code):
+    # Référence : PhoneNumberMatcher sur tout le texte, sans préfiltre
+    return {phonenumbers.format_number(match.number, phonenumbers.PhoneNumberFormat.E164)
+            for match in PhoneNumberMatcher(text, country_code)}
 
 class TestPhoneExtractor(unittest.TestCase):
     def test_parse_phone_cache(self):
@@ -52,10 +88,106 @@ class TestPhoneExtractor(unittest.TestCase):
         {"telephone": "+33123456789"}
         </script>
         '''
-        soup = BeautifulSoup(html, 'html.parser')
-        phones = extract_phones_jsonld(soup, "FR")
+        phones = extract_phones_jsonld(parse_document(html), "FR")
         
         self.assertIn("+33123456789", phones)
 
+    def test_prefilter_recall(self):
+        """Le préfiltre trouve les mêmes numéros que le scan complet"""
+        for text, country_code in PHONE_CORPUS:
+            found = {phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+                     for number in find_phone_numbers(text, country_code)}
+            self.assertEqual(found, full_scan(text, country_code), text[:60])
+            self.assertTrue(found, text[:60])
+
+    def test_prefilter_skips_noise(self):
+        """Prix, dates et références courtes ne passent pas par PhoneNumberMatcher"""
+        text = "Prix 12,90 € au lieu de 15,00 € - livraison le 12/03 - réf 4512 - lot de 3"
+        self.assertEqual(list(phone_windows(text, "US")), [])
+        self.assertEqual(list(phone_windows("", "FR")), [])
+
+    def test_extract_phones_tel(self):
+        """Test l'extraction depuis les liens tel:"""
+        html = '''
+        <a href="tel:+1-415-555-2671">Appeler</a>
+        <a href="tel:%2B14155552671;ext=12">Poste 12</a>
+        <a href="tel:123">Invalide</a>
+        '''
+        phones = extract_phones_tel(parse_document(html), "US")
+
+        self.assertEqual(phones, {"+14155552671"})
+
+    def test_format_phone(self):
+        """Test le formatage d'après les métadonnées de libphonenumber"""
+        parsed = parse_phone("01 23 45 67 89", "FR")
+        self.assertEqual(format_phone(parsed), "+33123456789")
+        self.assertEqual(format_phone(parsed, "international"), "+33 1 23 45 67 89")
+        self.assertEqual(format_phone(parsed, "national"), "01 23 45 67 89")
+        self.assertEqual(format_phone(parse_phone("0522-222222", "MA"), "international"), "+212 5 22 22 22 22")
+        self.assertIsNone(format_phone(parse_phone("123", "FR")))
+
+    def test_phone_output_format(self):
+        """PHONE_FORMAT inconnu : E.164, avec un avertissement"""
+        self.assertEqual(phone_output_format("national"), "national")
+        with self.assertLogs(level='WARNING') as logs:
+            self.assertEqual(phone_output_format("e.164"), "e164")
+        self.assertIn("Unknown PHONE_FORMAT 'e.164'", logs.output[0])
+
+    def test_infer_phone_region(self):
+        """Test la déduction de la région : JSON-LD, région de <html lang>, TLD, puis langue"""
+        jsonld = parse_document('''<html lang="fr-FR"><script type="application/ld+json">
+            {"address": {"@type": "PostalAddress", "addressCountry": "MA"}}</script></html>''')
+        self.assertEqual(infer_phone_region("https://www.example.fr/", jsonld), "MA")
+        self.assertEqual(infer_phone_region("https://www.example.fr/", parse_document("<html></html>")), "FR")
+        self.assertEqual(infer_phone_region("https://shop.example.co.uk/"), "GB")
+        self.assertEqual(infer_phone_region("https://example.com/", parse_document('<html lang="fr-BE"></html>')), "BE")
+        self.assertEqual(infer_phone_region("https://example.com/", parse_document('<html lang="de"></html>')), "DE")
+        self.assertEqual(infer_phone_region("https://example.com/", parse_document('<html lang="en"></html>'), "US"), "US")
+
+    def test_infer_phone_region_generic_tld(self):
+        """Test que les ccTLD génériques (.io, .co...) ne fixent pas la région"""
+        self.assertEqual(infer_phone_region("https://acme.io/", None, "FR"), "FR")
+        self.assertEqual(infer_phone_region("https://acme.co/", parse_document('<html lang="de"></html>')), "DE")
+        self.assertEqual(infer_phone_region("https://acme.ai/", parse_document('<html lang="en"></html>'), "US"), "US")
+        region = infer_phone_region("https://acme.io/", parse_document('<html lang="en-US"></html>'))
+        self.assertEqual(region, "US")
+        self.assertEqual(extract_phones_html("Call us (415) 555-2671", region), {"+14155552671"})
+
+    def test_infer_phone_region_lang_subtag(self):
+        """Test que le sous-tag de région de <html lang> l'emporte sur le TLD"""
+        self.assertEqual(infer_phone_region("https://www.example.fr/", parse_document('<html lang="fr-BE"></html>')), "BE")
+        self.assertEqual(infer_phone_region("https://www.example.de/", parse_document('<html lang="de-CH"></html>')), "CH")
+        # Langue seule : le TLD national reste prioritaire
+        self.assertEqual(infer_phone_region("https://www.example.be/", parse_document('<html lang="fr"></html>')), "BE")
+
+    def test_phone_cache_stats(self):
+        """Test les compteurs du cache partagé"""
+        validate_phone("+33 4 72 00 00 07", "FR")
+        before = phone_cache_stats()
+        validate_phone("+33 4 72 00 00 07", "FR")
+        after = phone_cache_stats()
+        self.assertEqual(after["hits"], before["hits"] + 1)
+        self.assertGreater(after["hit_rate"], 0)
+
+class TestAnalyzePagePhones(unittest.TestCase):
+    PAGE = '''<html><body>
+        <a href="tel:+14155552671">Appeler</a>
+        <p>Service client : 01 23 45 67 89, États-Unis : +1 415 555 2672</p>
+    </body></html>'''
+
+    def analyze(self, phone_format):
+        # Les formats sont mémorisés par lookup_phone : cache vidé avant et après
+        phone_extractor.lookup_phone.cache_clear()
+        self.addCleanup(phone_extractor.lookup_phone.cache_clear)
+        page = Page("https://example.fr/", "https://example.fr/", 200, {}, self.PAGE)
+        with mock.patch.object(phone_extractor, 'OUTPUT_FORMAT', phone_format):
+            return set(analyze_page(page, "https://example.fr/", country_code="FR")[1])
+
+    def test_output_formats(self):
+        """Les numéros étrangers sont gardés quel que soit PHONE_FORMAT"""
+        self.assertEqual(self.analyze('e164'), {"+14155552671", "+14155552672", "+33123456789"})
+        self.assertEqual(self.analyze('national'), {"(415) 555-2671", "(415) 555-2672", "01 23 45 67 89"})
+        self.assertEqual(self.analyze('international'), {"+1 415-555-2671", "+1 415-555-2672", "+33 1 23 45 67 89"})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,153 @@
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from services.result_cache import LEASE_MARGIN, ResultCache, ResultPending
+from services.scrape_pipeline import cached_scrape, parse_scrape_options
+
+class SlowScrape:
+    """Scraping factice qui bloque jusqu'à release() et compte ses exécutions"""
+    def __init__(self, result=None):
+        self.result = result or {"emails": ["contact@example.com"]}
+        self.calls = 0
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.released.wait(5)
+        return self.result
+
+def run_in_threads(function, count):
+    results = [None] * count
+
+    def target(index):
+        try:
+            results[index] = function()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=target, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "results.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_coalesced_in_process(self):
+        """Appels simultanés d'une même clé : une seule exécution, les autres sont regroupés"""
+        cache = ResultCache(self.path)
+        scrape = SlowScrape()
+        threads, results = run_in_threads(lambda: cache.get_or_run("key", scrape), 5)
+        self.assertTrue(scrape.started.wait(5))
+        # Laisse les autres appelants rejoindre le calcul en cours
+        time.sleep(0.2)
+        scrape.released.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(scrape.calls, 1)
+        self.assertEqual(sorted(status for _, status in results), ['coalesced'] * 4 + ['miss'])
+        self.assertTrue(all(result == scrape.result for result, _ in results))
+        self.assertEqual(cache.get_or_run("key", scrape), (scrape.result, 'hit'))
+        self.assertEqual(cache.stats()["coalesced"], 4)
+
+    def test_coalesced_across_workers(self):
+        """Deux instances sur la même base (deux workers) : le second attend le résultat du premier"""
+        owner, waiter = ResultCache(self.path), ResultCache(self.path)
+        scrape, other = SlowScrape(), SlowScrape()
+        threads, results = run_in_threads(lambda: owner.get_or_run("key", scrape), 1)
+        self.assertTrue(scrape.started.wait(5))
+        waiting, waiting_results = run_in_threads(lambda: waiter.get_or_run("key", other), 1)
+        time.sleep(0.3)
+        scrape.released.set()
+        for thread in threads + waiting:
+            thread.join(5)
+        self.assertEqual(results[0], (scrape.result, 'miss'))
+        self.assertEqual(waiting_results[0], (scrape.result, 'coalesced'))
+        self.assertEqual(other.calls, 0)
+
+    def test_pending_after_wait(self):
+        """Un calcul identique plus long que wait lève ResultPending au lieu de bloquer"""
+        owner, waiter = ResultCache(self.path), ResultCache(self.path, wait=0.3)
+        scrape = SlowScrape()
+        threads, _ = run_in_threads(lambda: owner.get_or_run("key", scrape), 1)
+        self.assertTrue(scrape.started.wait(5))
+        start = time.monotonic()
+        with self.assertRaises(ResultPending) as context:
+            waiter.get_or_run("key", SlowScrape())
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(context.exception.retry_after, 1)
+        # Même borne pour les appelants regroupés dans le processus
+        with self.assertRaises(ResultPending):
+            owner.get_or_run("key", SlowScrape(), wait=0.1)
+        scrape.released.set()
+        threads[0].join(5)
+
+    def test_lease_covers_long_run(self):
+        """Un calcul plus long que le bail par défaut garde son bail : pas de seconde exécution"""
+        owner, waiter = ResultCache(self.path, lease=0.2), ResultCache(self.path, lease=0.2, wait=0.8)
+        scrape, other = SlowScrape(), SlowScrape()
+        threads, results = run_in_threads(lambda: owner.get_or_run("key", scrape, lease=30), 1)
+        self.assertTrue(scrape.started.wait(5))
+        time.sleep(0.4)
+        with self.assertRaises(ResultPending):
+            waiter.get_or_run("key", other)
+        self.assertEqual(other.calls, 0)
+        scrape.released.set()
+        threads[0].join(5)
+        self.assertEqual(results[0], (scrape.result, 'miss'))
+
+    def test_lease_from_time_limit(self):
+        """cached_scrape : bail = time_limit de la requête + marge, même au-delà de CRAWL_TIME_LIMIT"""
+        cache = mock.Mock()
+        cache.get_or_run.return_value = ({"status": "OK"}, 'miss')
+        with mock.patch('services.scrape_pipeline.get_result_cache', return_value=cache):
+            cached_scrape("https://example.com/", parse_scrape_options({"time_limit": "600"}))
+        self.assertEqual(cache.get_or_run.call_args.kwargs["lease"], 600 + LEASE_MARGIN)
+
+    def test_dead_owner_lease(self):
+        """Le bail d'un worker mort est repris sans attendre son expiration"""
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        connection = sqlite3.connect(self.path)
+        cache = ResultCache(self.path, wait=30)
+        with connection:
+            connection.execute(
+                "INSERT INTO inflight VALUES (?, ?, ?)",
+                ("key", f"{socket.gethostname()}:{process.pid}:dead", time.time() + 3600)
+            )
+        connection.close()
+        scrape = SlowScrape()
+        scrape.released.set()
+        start = time.monotonic()
+        self.assertEqual(cache.get_or_run("key", scrape), (scrape.result, 'miss'))
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(cache.stats()["inflight"], 0)
+
+    def test_errors_not_cached(self):
+        cache = ResultCache(self.path)
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_run("key", fail)
+        scrape = SlowScrape()
+        scrape.released.set()
+        self.assertEqual(cache.get_or_run("key", scrape), (scrape.result, 'miss'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import socket
+import unittest
+import aiohttp
+from aiohttp import web
+from utils.scrapers.robots import RobotsCache, RobotsRules, parse_robots, robots_url
+
+ROBOTS = """
+# Commentaire
+User-agent: Googlebot
+Disallow: /
+
+User-agent: *
+User-agent: OtherBot
+Disallow: /account
+Disallow: /*?sort=
+Disallow: /*.pdf$
+Allow: /account/contact
+Crawl-delay: 2
+
+Sitemap: https://example.com/sitemap.xml
+sitemap: https://example.com/sitemap-pages.xml.gz
+"""
+
+class TestRobots(unittest.TestCase):
+    def setUp(self):
+        self.rules = parse_robots(ROBOTS)
+
+    def test_longest_match(self):
+        self.assertTrue(self.rules.can_fetch("https://example.com/pages/contact"))
+        self.assertFalse(self.rules.can_fetch("https://example.com/account/login"))
+        self.assertTrue(self.rules.can_fetch("https://example.com/account/contact"))
+        self.assertTrue(self.rules.can_fetch("https://example.com/"))
+
+    def test_wildcards(self):
+        self.assertFalse(self.rules.can_fetch("https://example.com/collections/all?sort=price"))
+        self.assertTrue(self.rules.can_fetch("https://example.com/collections/all?page=2"))
+        self.assertFalse(self.rules.can_fetch("https://example.com/docs/cgv.pdf"))
+        self.assertTrue(self.rules.can_fetch("https://example.com/docs/cgv.pdf?download=1"))
+
+    def test_groups_and_directives(self):
+        self.assertEqual(self.rules.crawl_delay, 2)
+        self.assertEqual(self.rules.sitemaps, [
+            "https://example.com/sitemap.xml", "https://example.com/sitemap-pages.xml.gz"
+        ])
+        # Groupe spécifique à l'agent
+        googlebot = parse_robots(ROBOTS, agent="Mozilla/5.0 (compatible; Googlebot/2.1)")
+        self.assertFalse(googlebot.can_fetch("https://example.com/pages/contact"))
+        self.assertIsNone(googlebot.crawl_delay)
+
+    def test_empty_and_capped(self):
+        self.assertTrue(parse_robots("").can_fetch("https://example.com/anything"))
+        self.assertTrue(parse_robots("User-agent: *\nDisallow:\n").can_fetch("https://example.com/"))
+        self.assertEqual(RobotsRules(crawl_delay=3600).crawl_delay, 5)
+        self.assertEqual(robots_url("https://example.com:8443/pages/about?x=1"), "https://example.com:8443/robots.txt")
+
+class TestRobotsCache(unittest.IsolatedAsyncioTestCase):
+    """RobotsCache sur un serveur local : /robots.txt répond ROBOTS avec le statut self.status"""
+    async def asyncSetUp(self):
+        self.status = 200
+        self.hits = 0
+        self.delay = 0
+
+        async def robots(request):
+            self.hits += 1
+            await asyncio.sleep(self.delay)
+            return web.Response(status=self.status, text=ROBOTS)
+
+        app = web.Application()
+        app.router.add_get('/robots.txt', robots)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        await web.SockSite(runner, sock).start()
+        self.url = f"http://127.0.0.1:{sock.getsockname()[1]}/pages/contact"
+        self.session = aiohttp.ClientSession()
+        self.addAsyncCleanup(runner.cleanup)
+        self.addAsyncCleanup(self.session.close)
+
+    async def test_ttl(self):
+        cache = RobotsCache(ttl=0.2)
+        rules = await cache.get(self.session, self.url)
+        self.assertEqual(rules.crawl_delay, 2)
+        await cache.get(self.session, self.url.replace('/pages/contact', '/account'))
+        self.assertEqual(self.hits, 1)
+        await asyncio.sleep(0.3)
+        await cache.get(self.session, self.url)
+        self.assertEqual(self.hits, 2)
+
+    async def test_error_ttl(self):
+        """5xx : tout est autorisé et redemandé après error_ttl ; 4xx : absent pour tout le ttl"""
+        cache = RobotsCache(ttl=60, error_ttl=0.2)
+        self.status = 503
+        rules = await cache.get(self.session, self.url)
+        self.assertTrue(rules.can_fetch(self.url.replace('/pages/contact', '/account')))
+        await cache.get(self.session, self.url)
+        self.assertEqual(self.hits, 1)
+        await asyncio.sleep(0.3)
+        self.status = 404
+        await cache.get(self.session, self.url)
+        self.assertEqual(self.hits, 2)
+        await asyncio.sleep(0.3)
+        self.assertTrue((await cache.get(self.session, self.url)).can_fetch(self.url))
+        self.assertEqual(self.hits, 2)
+
+    async def test_shared_download(self):
+        """Les demandes simultanées d'une même origine attendent le même téléchargement"""
+        cache = RobotsCache()
+        self.delay = 0.2
+        results = await asyncio.gather(*(cache.get(self.session, self.url) for _ in range(5)))
+        self.assertEqual(self.hits, 1)
+        self.assertTrue(all(rules is results[0] for rules in results))
+        self.assertEqual(len(cache), 1)
+
+    async def test_unreachable(self):
+        cache = RobotsCache()
+        rules = await cache.get(self.session, "http://127.0.0.1:1/pages/contact")
+        self.assertTrue(rules.can_fetch("http://127.0.0.1:1/account"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import time
+import unittest
+from unittest import mock
+from formatters.response_formatter import format_stream_event
+from services.scrape_pipeline import ScrapeError, ResultPending, parse_scrape_options
+from services.scrape_stream import stream_scrape
+
+URL = "https://example.com/"
+
+def make_result(emails=(), phones=(), social_links=None):
+    return {
+        "status": "OK",
+        "data": [{
+            "emails": [{"value": value, "sources": [URL]} for value in emails],
+            "phone_numbers": [{"value": value, "sources": [URL]} for value in phones],
+            "social_links": social_links or {},
+        }],
+    }
+
+class StubScrape:
+    """cached_scrape factice : pages [(url, emails, phones, liens)] annoncées à on_page, puis le résultat"""
+    def __init__(self, pages=(), result=None, error=None, delay=0):
+        self.pages = pages
+        self.result = result or make_result()
+        self.error = error
+        self.delay = delay
+
+    def __call__(self, url, options, start_time=None, on_page=None):
+        for page in self.pages:
+            time.sleep(self.delay)
+            on_page(*page)
+        if self.error:
+            raise self.error
+        return self.result
+
+def events_of(stub, args=None):
+    with mock.patch('services.scrape_stream.cached_scrape', stub):
+        return list(stream_scrape(URL, parse_scrape_options(args or {})))
+
+class TestStreamScrape(unittest.TestCase):
+    def test_event_order(self):
+        """Événements de page et nouvelles valeurs au fil du crawl, résumé en dernier"""
+        pages = [
+            (URL, {"a@example.com": [URL]}, {}, {"https://www.facebook.com/acme": {}}),
+            (f"{URL}contact", {"a@example.com": [URL], "b@example.com": [URL]}, {"+33123456789": [URL]}, {}),
+        ]
+        result = make_result(["a@example.com", "b@example.com"], ["+33123456789"],
+                             {"facebook": "https://www.facebook.com/acme", "instagram": None})
+        events = events_of(StubScrape(pages, result))
+        self.assertEqual([event for event, _ in events], [
+            'page', 'email', 'social_link', 'page', 'email', 'phone', 'summary',
+        ])
+        self.assertEqual(events[0][1], {"url": URL, "pages": 1, "emails": 1, "phones": 0})
+        self.assertEqual(events[4][1], {"value": "b@example.com", "source": f"{URL}contact"})
+        self.assertEqual(events[2][1], {"platform": "facebook", "url": "https://www.facebook.com/acme"})
+        self.assertIs(events[-1][1], result)
+
+    def test_cached_result(self):
+        """Résultat du cache : pas de page, les valeurs viennent du résumé"""
+        result = make_result(["a@example.com"], ["+33123456789"], {"instagram": "https://instagram.com/acme"})
+        events = events_of(StubScrape(result=result))
+        self.assertEqual(events, [
+            ('email', {"value": "a@example.com", "source": URL}),
+            ('phone', {"value": "+33123456789", "source": URL}),
+            ('social_link', {"platform": "instagram", "url": "https://instagram.com/acme"}),
+            ('summary', result),
+        ])
+
+    def test_include_flags(self):
+        pages = [(URL, {"a@example.com": [URL]}, {"+33123456789": [URL]}, {})]
+        events = events_of(StubScrape(pages), {"include_emails": "false"})
+        self.assertEqual([event for event, _ in events], ['page', 'phone', 'summary'])
+
+    def test_errors(self):
+        pages = [(URL, {}, {}, {})]
+        events = events_of(StubScrape(pages, error=ScrapeError("Unable to reach the site")))
+        self.assertEqual(events, [
+            ('page', {"url": URL, "pages": 1, "emails": 0, "phones": 0}),
+            ('error', {"error": "Unable to reach the site", "status": "ERROR"}),
+        ])
+        events = events_of(StubScrape(error=ResultPending("key", 20)))
+        self.assertEqual(events[-1][0], 'error')
+        self.assertEqual(events[-1][1]["status"], "PENDING")
+
+    def test_keepalive(self):
+        pages = [(URL, {}, {}, {})]
+        with mock.patch('services.scrape_stream.KEEPALIVE_INTERVAL', 0.05):
+            events = events_of(StubScrape(pages, delay=0.3))
+        self.assertEqual(events[0], ('keepalive', None))
+        self.assertEqual([event for event, _ in events if event != 'keepalive'], ['page', 'summary'])
+
+class TestStreamFraming(unittest.TestCase):
+    def test_ndjson(self):
+        line = format_stream_event('email', {"value": "a@example.com", "source": URL})
+        self.assertTrue(line.endswith('\n'))
+        self.assertEqual(line.count('\n'), 1)
+        self.assertEqual(json.loads(line), {"event": "email", "data": {"value": "a@example.com", "source": URL}})
+        self.assertEqual(format_stream_event('keepalive', None), '')
+
+    def test_sse(self):
+        message = format_stream_event('page', {"url": URL, "pages": 1}, 'sse')
+        self.assertEqual(message, f'event: page\ndata: {json.dumps({"url": URL, "pages": 1})}\n\n')
+        self.assertEqual(format_stream_event('keepalive', None, 'sse'), ': keepalive\n\n')
+
+    def test_route(self):
+        """/scrape?stream=... : type de contenu et découpage de bout en bout"""
+        from main import app
+        pages = [(URL, {"a@example.com": [URL]}, {}, {})]
+        client = app.test_client()
+        with mock.patch('services.scrape_stream.cached_scrape', StubScrape(pages, make_result(["a@example.com"]))):
+            ndjson = client.get('/scrape', query_string={"url": URL, "stream": "ndjson"})
+            sse = client.get('/scrape', query_string={"url": URL, "stream": "sse"})
+        self.assertEqual(ndjson.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in ndjson.get_data(as_text=True).splitlines()]
+        self.assertEqual([line["event"] for line in lines], ['page', 'email', 'summary'])
+        self.assertEqual(sse.mimetype, 'text/event-stream')
+        messages = sse.get_data(as_text=True).split('\n\n')
+        self.assertEqual([message.split('\n')[0] for message in messages if message],
+                         ['event: page', 'event: email', 'event: summary'])
+        self.assertEqual(client.get('/scrape', query_string={"url": URL, "stream": "xml"}).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+import asyncio
+import gzip
+import socket
+import time
+import unittest
+import aiohttp
+from aiohttp import web
+from utils.scrapers.robots import RobotsCache, parse_robots
+from utils.scrapers.sitemap import SitemapLinks, SitemapParser, _sitemap_order, discover_site, discover_sitemap_links
+
+URLSET = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+""" + ''.join(
+    f"<url><loc>https://example.com/products/item-{index}</loc><lastmod>2024-01-01</lastmod></url>\n"
+    for index in range(500)
+) + """<url><loc> https://example.com/pages/contact </loc></url>
+</urlset>"""
+
+INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap_products_1.xml</loc></sitemap>
+  <sitemap><loc>https://example.com/sitemap_pages_1.xml</loc></sitemap>
+</sitemapindex>"""
+
+def feed_all(parser, data, size=97):
+    entries = []
+    for start in range(0, len(data), size):
+        entries.extend(parser.feed(data[start:start + size]))
+    return entries
+
+class TestSitemap(unittest.TestCase):
+    def test_urlset_incremental(self):
+        parser = SitemapParser()
+        entries = feed_all(parser, URLSET.encode())
+        self.assertEqual(len(entries), 501)
+        self.assertEqual(entries[0], ('page', "https://example.com/products/item-0"))
+        self.assertEqual(entries[-1], ('page', "https://example.com/pages/contact"))
+        # Les entrées lues sont retirées de l'arbre au fil du parsing
+        self.assertLessEqual(len(parser._parser.close()), 1)
+
+    def test_gzip_and_index(self):
+        entries = feed_all(SitemapParser(), gzip.compress(INDEX.encode()), size=1)
+        self.assertEqual(entries, [
+            ('sitemap', "https://example.com/sitemap_products_1.xml"),
+            ('sitemap', "https://example.com/sitemap_pages_1.xml"),
+        ])
+        self.assertLess(_sitemap_order("https://example.com/sitemap_pages_1.xml"),
+                        _sitemap_order("https://example.com/sitemap_products_1.xml"))
+
+    def test_size_limit(self):
+        parser = SitemapParser(max_size=1000)
+        entries = feed_all(parser, gzip.compress(URLSET.encode()))
+        self.assertTrue(parser.truncated)
+        self.assertEqual(parser.size, 1000)
+        self.assertLess(len(entries), 20)
+
+    def test_bounded_best_links(self):
+        priorities = {"https://example.com/pages/contact": -10, "https://example.com/pages/about": -5}
+        links = SitemapLinks(3, lambda url: priorities.get(url, 0))
+        for index in range(100):
+            links.add(f"https://example.com/products/item-{index}")
+        links.add("https://example.com/pages/about")
+        links.add("https://example.com/pages/contact")
+        self.assertFalse(links.add("https://EXAMPLE.com/pages/contact"))
+        self.assertEqual(links.links(), [
+            "https://example.com/pages/contact",
+            "https://example.com/pages/about",
+            "https://example.com/products/item-0",
+        ])
+
+def urlset(paths):
+    locations = ''.join(f"<url><loc>{location}</loc></url>" for location in paths)
+    return f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locations}</urlset>'
+
+def sitemapindex(paths):
+    locations = ''.join(f"<sitemap><loc>{location}</loc></sitemap>" for location in paths)
+    return f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locations}</sitemapindex>'
+
+class SiteServer:
+    """Site local : {chemin: corps ou coroutine}, requêtes comptées par chemin"""
+    def __init__(self, routes):
+        self.routes = routes
+        self.hits = {}
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.netloc = f"127.0.0.1:{self.sock.getsockname()[1]}"
+        self.base = f"http://{self.netloc}"
+        self.runner = None
+
+    async def handle(self, request):
+        self.hits[request.path] = self.hits.get(request.path, 0) + 1
+        body = self.routes.get(request.path)
+        if body is None:
+            return web.Response(status=404)
+        if callable(body):
+            return await body(request)
+        return web.Response(text=body.replace('{base}', self.base), content_type='application/xml')
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self.handle)
+        self.runner = web.AppRunner(app, access_log=None, shutdown_timeout=0.1)
+        await self.runner.setup()
+        await web.SockSite(self.runner, self.sock).start()
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+async def hang(request):
+    await asyncio.sleep(10)
+    return web.Response(text='')
+
+class TestSitemapDiscovery(unittest.IsolatedAsyncioTestCase):
+    async def serve(self, routes):
+        server = await SiteServer(routes).start()
+        session = aiohttp.ClientSession()
+        self.addAsyncCleanup(server.stop)
+        self.addAsyncCleanup(session.close)
+        return server, session
+
+    async def test_budget_stop(self):
+        """La lecture s'arrête après max_urls URLs, les meilleurs liens sont gardés"""
+        pages = [f"{{base}}/products/item-{index}" for index in range(20000)]
+        server, session = await self.serve({'/sitemap.xml': urlset(["{base}/pages/contact", *pages])})
+        links = await discover_sitemap_links(session, f"{server.base}/", server.netloc, max_links=5, max_urls=100)
+        self.assertEqual(len(links), 5)
+        self.assertEqual(links[0], f"{server.base}/pages/contact")
+        first = {f"{server.base}/products/item-{index}" for index in range(99)}
+        self.assertTrue(set(links[1:]) <= first)
+
+    async def test_index_following(self):
+        """Les index sont suivis, sitemaps des pages d'abord, au plus max_files fichiers"""
+        server, session = await self.serve({
+            '/sitemap.xml': sitemapindex(["{base}/sitemap_products_1.xml", "{base}/sitemap_pages_1.xml",
+                                          "{base}/sitemap_blogs_1.xml"]),
+            '/sitemap_products_1.xml': urlset(["{base}/products/a"]),
+            '/sitemap_pages_1.xml': urlset(["{base}/pages/contact", "https://other.com/pages/contact"]),
+            '/sitemap_blogs_1.xml': urlset(["{base}/blogs/news"]),
+        })
+        links = await discover_sitemap_links(session, f"{server.base}/", server.netloc, max_files=3)
+        self.assertEqual(sorted(links), [f"{server.base}/pages/contact", f"{server.base}/products/a"])
+        # Index compris : le troisième sitemap de l'index dépasse max_files
+        self.assertEqual(list(server.hits), ['/sitemap.xml', '/sitemap_pages_1.xml', '/sitemap_products_1.xml'])
+
+    async def test_robots_filtering(self):
+        """Sitemaps déclarés par robots.txt, URLs interdites ignorées"""
+        server, session = await self.serve({
+            '/custom-sitemap.xml': urlset(["{base}/pages/contact", "{base}/account/login", "{base}/products/a"]),
+        })
+        robots = parse_robots(f"User-agent: *\nDisallow: /account\nSitemap: {server.base}/custom-sitemap.xml\n")
+        links = await discover_sitemap_links(session, f"{server.base}/", server.netloc, robots)
+        self.assertEqual(sorted(links), [f"{server.base}/pages/contact", f"{server.base}/products/a"])
+        self.assertNotIn('/sitemap.xml', server.hits)
+
+    async def test_time_limit(self):
+        """Un sitemap qui ne répond pas n'empêche pas de rendre les liens déjà lus"""
+        server, session = await self.serve({
+            '/sitemap.xml': sitemapindex(["{base}/sitemap_pages_1.xml", "{base}/sitemap_products_1.xml"]),
+            '/sitemap_pages_1.xml': urlset(["{base}/pages/contact"]),
+            '/sitemap_products_1.xml': hang,
+        })
+        start = time.monotonic()
+        links = await discover_sitemap_links(session, f"{server.base}/", server.netloc, time_limit=0.5)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(links, [f"{server.base}/pages/contact"])
+
+    async def test_discover_site_time_limit(self):
+        """robots.txt bloqué : la découverte rend la main à l'échéance, sans règles ni liens"""
+        server, session = await self.serve({'/robots.txt': hang})
+
+        class Store:
+            headers = {}
+
+            class engine:
+                pass
+
+        Store.engine.session = session
+        start = time.monotonic()
+        robots, links = await discover_site(Store, f"{server.base}/", 10, time_limit=0.5)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual((robots, links), (None, []))
+
+if __name__ == '__main__':
+    unittest.main()
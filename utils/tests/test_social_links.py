@@ -1,5 +1,5 @@
 import unittest
-from utils.social_links import extract_social_links
+from utils.extractors.social_links import extract_social_links, extract_social_profiles, parse_social_link
 
 class TestSocialLinks(unittest.TestCase):
     def test_extract_social_links(self):
@@ -101,5 +101,47 @@ class TestSocialLinks(unittest.TestCase):
         for platform in result.values():
             self.assertIsNone(platform)
 
+    def test_share_and_intent_links(self):
+        # Les boutons de partage et les publications ne sont pas des profils
+        test_links = [
+            "https://www.facebook.com/sharer/sharer.php?u=https://example.com",
+            "https://twitter.com/intent/tweet?text=hello",
+            "https://www.linkedin.com/shareArticle?url=https://example.com",
+            "https://pinterest.com/pin/create/button/?url=https://example.com",
+            "https://www.instagram.com/p/Cabc123/",
+            "https://www.youtube.com/watch?v=abc",
+            "https://facebook.com.attacker.net/example",
+            "https://instagram.attacker.net/example",
+        ]
+        result = extract_social_links(test_links)
+        for platform in result.values():
+            self.assertIsNone(platform)
+
+    def test_ranked_profiles(self):
+        # Tous les profils par plateforme, ceux au nom du site d'abord
+        test_links = [
+            "https://www.facebook.com/OtherBrand",
+            "https://facebook.com/shopfr/posts/123",
+            "https://www.facebook.com/shopfr",
+            "https://fr.linkedin.com/company/shop-fr/",
+            "https://www.youtube.com/channel/UCxxxxxxxx",
+            "https://youtu.be/dQw4w9WgXcQ",
+        ]
+        profiles = extract_social_profiles(test_links, "www.shop.fr")
+        self.assertEqual(profiles["facebook"], ["https://www.facebook.com/shopfr", "https://www.facebook.com/OtherBrand"])
+        self.assertEqual(profiles["linkedin"], ["https://fr.linkedin.com/company/shop-fr/"])
+        self.assertEqual(profiles["youtube"], ["https://www.youtube.com/channel/UCxxxxxxxx", "https://youtu.be/dQw4w9WgXcQ"])
+        self.assertEqual(profiles["twitter"], [])
+
+        result = extract_social_links(test_links, "www.shop.fr")
+        self.assertEqual(result["facebook"], "https://www.facebook.com/shopfr")
+
+    def test_parse_social_link(self):
+        self.assertEqual(parse_social_link("https://www.tiktok.com/@shop")[:2], ("tiktok", "@shop"))
+        self.assertEqual(parse_social_link("https://pinterest.co.uk/shop/")[:2], ("pinterest", "shop"))
+        self.assertEqual(parse_social_link("https://m.facebook.com/profile.php?id=42")[:2], ("facebook", "profile.php?id=42"))
+        self.assertIsNone(parse_social_link("https://www.linkedin.com/feed/"))
+        self.assertIsNone(parse_social_link("mailto:contact@facebook.com"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
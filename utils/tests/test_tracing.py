@@ -0,0 +1,66 @@
+import json
+import tempfile
+import threading
+import unittest
+from utils.tracing import NO_SPAN, Trace, span
+
+class TestTracing(unittest.TestCase):
+    def make_trace(self):
+        trace = Trace()
+        start = trace.started
+        trace.add('fetch', start, start + 0.200, url='https://example.com/slow')
+        trace.add('analyze_page', start + 0.200, start + 0.250, url='https://example.com/slow')
+        trace.add('fetch', start, start + 0.010, url='https://example.com/fast')
+        trace.add('analyze_page', start + 0.010, start + 0.030, url='https://example.com/fast')
+        trace.add('link_scraper', start, start + 0.100, url='https://example.com/')
+        return trace
+
+    def test_disabled(self):
+        self.assertIs(span(None, 'fetch', url='https://example.com/'), NO_SPAN)
+        with span(None, 'fetch'):
+            pass
+
+    def test_span(self):
+        trace = Trace()
+        with span(trace, 'classify_links', links=3):
+            pass
+
+        def extract():
+            with span(trace, 'extract_emails'):
+                pass
+
+        thread = threading.Thread(target=extract, name='cpu-0')
+        thread.start()
+        thread.join()
+        self.assertEqual([name for name, *_ in trace.spans], ['classify_links', 'extract_emails'])
+        self.assertEqual(trace.spans[0][5], {"links": 3})
+        self.assertEqual(trace.spans[1][4], 'cpu-0')
+
+    def test_breakdown(self):
+        timings = self.make_trace().breakdown(top=1)
+        self.assertEqual(timings["stages"]["fetch"]["count"], 2)
+        self.assertAlmostEqual(timings["stages"]["fetch"]["total_ms"], 210, places=1)
+        self.assertAlmostEqual(timings["stages"]["fetch"]["max_ms"], 200, places=1)
+        # Seules les étapes des pages comptent dans le classement des URLs
+        self.assertEqual(len(timings["slowest_urls"]), 1)
+        slowest = timings["slowest_urls"][0]
+        self.assertEqual(slowest["url"], 'https://example.com/slow')
+        self.assertAlmostEqual(slowest["total_ms"], 250, places=1)
+        self.assertAlmostEqual(slowest["analyze_page_ms"], 50, places=1)
+        self.assertEqual(len(timings["spans"]), 5)
+        self.assertEqual(timings["spans"][0]["start_ms"], 0)
+
+    def test_chrome_trace(self):
+        trace = self.make_trace()
+        with tempfile.TemporaryDirectory() as directory:
+            with open(trace.export(directory, 'request')) as file:
+                data = json.load(file)
+        complete = [event for event in data["traceEvents"] if event["ph"] == "X"]
+        metadata = [event for event in data["traceEvents"] if event["ph"] == "M"]
+        self.assertEqual(len(complete), 5)
+        self.assertEqual(complete[0]["dur"], 200000)
+        self.assertEqual(complete[0]["args"], {"url": 'https://example.com/slow'})
+        self.assertEqual(metadata[0]["args"]["name"], threading.current_thread().name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+import logging
+from config.settings import TIMINGS_TOP_URLS
+
+logger = logging.getLogger(__name__)
+
+# Étapes d'une page, additionnées par URL pour le classement des pages les plus lentes
+PAGE_STAGES = ('fetch', 'analyze_page')
+
+class _NoSpan:
+    """
+    Span vide utilisé quand le mode timings est désactivé : aucune mesure.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NO_SPAN = _NoSpan()
+
+class _Span:
+    __slots__ = ('trace', 'name', 'args', 'start')
+
+    def __init__(self, trace, name, args):
+        self.trace = trace
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.name, self.start, time.perf_counter(), **self.args)
+        return False
+
+class Trace:
+    """
+    Spans d'un scraping (mode timings=true) : (nom, début, fin, thread, arguments).
+    Alimentée depuis le thread de la requête, la boucle du moteur et le pool CPU ;
+    list.append est atomique, pas de verrou.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+
+    def span(self, name, **args):
+        return _Span(self, name, args)
+
+    def add(self, name, start, end, **args):
+        """
+        Ajoute un span mesuré par l'appelant (horloge time.perf_counter).
+        """
+        thread = threading.current_thread()
+        self.spans.append((name, start, end, thread.native_id, thread.name, args))
+
+    def breakdown(self, top=TIMINGS_TOP_URLS):
+        """
+        Résumé pour la réponse /scrape : durée par étape (nombre, total, max en ms),
+        les top pages les plus lentes (fetch + analyse) et la liste des spans.
+        Les étapes des pages se chevauchent (crawl concurrent) : leurs totaux peuvent
+        dépasser la durée de la requête.
+        """
+        stages, pages = {}, {}
+        for name, start, end, _, _, args in self.spans:
+            duration = end - start
+            stage = stages.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stage["count"] += 1
+            stage["total_ms"] += duration * 1000
+            stage["max_ms"] = max(stage["max_ms"], duration * 1000)
+            if name in PAGE_STAGES and 'url' in args:
+                page = pages.setdefault(args['url'], {"url": args['url'], "total_ms": 0.0, "fetch_ms": 0.0, "analyze_page_ms": 0.0})
+                page["total_ms"] += duration * 1000
+                page[f"{name}_ms"] += duration * 1000
+
+        slowest = sorted(pages.values(), key=lambda page: page["total_ms"], reverse=True)[:top]
+        return {
+            "total_ms": _ms(time.perf_counter() - self.started),
+            "stages": {name: {**stage, "total_ms": round(stage["total_ms"], 2), "max_ms": round(stage["max_ms"], 2)}
+                       for name, stage in stages.items()},
+            "slowest_urls": [{key: round(value, 2) if key != "url" else value for key, value in page.items()} for page in slowest],
+            "spans": [
+                {"name": name, "start_ms": _ms(start - self.started), "duration_ms": _ms(end - start), "thread": thread_name, **args}
+                for name, start, end, _, thread_name, args in sorted(self.spans, key=lambda span: span[1])
+            ],
+        }
+
+    def chrome_trace(self):
+        """
+        Spans au format Trace Event de Chrome (chrome://tracing, Perfetto) :
+        un événement complet ("X") par span, en microsecondes, un fil par thread.
+        """
+        pid = os.getpid()
+        events, threads = [], {}
+        for name, start, end, thread_id, thread_name, args in self.spans:
+            threads[thread_id] = thread_name
+            events.append({
+                "name": name, "cat": "scrape", "ph": "X", "pid": pid, "tid": thread_id,
+                "ts": round((start - self.started) * 1e6, 1), "dur": round((end - start) * 1e6, 1), "args": args,
+            })
+        for thread_id, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, directory, name):
+        """
+        Écrit la trace Chrome dans directory/name.json et retourne le chemin.
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.json")
+        with open(path, 'w') as file:
+            json.dump(self.chrome_trace(), file)
+        return path
+
+def span(trace, name, **args):
+    """
+    Span de la trace si elle existe, sinon NO_SPAN : quasi gratuit hors mode timings.
+    """
+    return trace.span(name, **args) if trace is not None else NO_SPAN
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)